@@ -1,9 +1,16 @@
 # app.py
 import streamlit as st
-import halaman.home
-import halaman.upload
-import halaman.c45_model
-import halaman.predict
+import importlib
+from core import profiling
+
+# Modul halaman diimpor saat pertama kali halaman dibuka (bukan saat aplikasi dimulai),
+# sehingga membuka "Beranda" tidak ikut memuat scikit-learn/matplotlib
+PAGES = {
+    "Beranda": "halaman.home",
+    "Upload Data": "halaman.upload",
+    "Penerapan Algoritma C4.5": "halaman.c45_model",
+    "Prediksi Kualitas Udara": "halaman.predict",
+}
 
 # Load CSS
 def load_css():
@@ -15,20 +22,53 @@ def init_session_state():
     # Inisialisasi semua state yang diperlukan
     if 'page' not in st.session_state:
         st.session_state.page = "Beranda"
-    if 'normalized_data' not in st.session_state:
-        st.session_state.normalized_data = None
-    if 'scaler' not in st.session_state:
-        st.session_state.scaler = None
-    if 'model' not in st.session_state:
-        st.session_state.model = None
-    if 'label_encoder' not in st.session_state:
-        st.session_state.label_encoder = None
-    if 'model_trained' not in st.session_state:
-        st.session_state.model_trained = False
-    if 'feature_names' not in st.session_state:
-        st.session_state.feature_names = None
-    if 'class_names' not in st.session_state:
-        st.session_state.class_names = None
+    # Dataset dan model tidak disalin ke setiap sesi: sesi hanya memegang referensi
+    # ke penyimpanan bersama tingkat proses (lihat core/shared_store.py)
+    if 'dataset_ref' not in st.session_state:
+        st.session_state.dataset_ref = None
+    if 'model_ref' not in st.session_state:
+        st.session_state.model_ref = None
+
+def show_profiling_panel(panel):
+    """Panel sidebar berisi waktu per tahap (p50/p95) ketika profiling dinyalakan."""
+    if not profiling.is_enabled():
+        return
+    with panel.expander("⏱️ Waktu per Tahap", expanded=True):
+        rows = profiling.summary()
+        if not rows:
+            st.caption("Belum ada pengukuran.")
+            return
+        import pandas as pd
+        st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, use_container_width=True)
+        st.caption("Pengukuran terbaru")
+        st.dataframe(
+            pd.DataFrame(profiling.recent(10))[["page", "stage", "ms"]],
+            hide_index=True, use_container_width=True
+        )
+        if st.button("Reset Pengukuran", use_container_width=True):
+            profiling.reset()
+
+def show_shared_memory_panel(panel):
+    """Panel sidebar berisi entri penyimpanan bersama (jumlah sesi pemegang dan memori per entri)."""
+    if not profiling.is_enabled():
+        return
+    from core import shared_store
+
+    with panel.expander("🧠 Memori Bersama Antar Sesi", expanded=False):
+        rows = shared_store.stats()
+        if not rows:
+            st.caption("Belum ada dataset atau model yang dimuat.")
+            return
+        import pandas as pd
+        st.dataframe(pd.DataFrame([{
+            'Entri': row['key'][:24],
+            'Jenis': row['kind'],
+            'Sesi': row['refs'],
+            'Memori (MB)': row['resident_bytes'] / 2**20,
+            'Dipetakan (MB)': row['mapped_bytes'] / 2**20,
+        } for row in rows]).round(2), hide_index=True, use_container_width=True)
+        counters = shared_store.counters()
+        st.caption(f"Dipakai ulang {counters['hits']} kali, dimuat {counters['misses']} kali.")
 
 # Function to change page
 def change_page(page_name):
@@ -77,16 +117,25 @@ def main():
     Sistem Prediksi Kategori Kualitas Udara
     © 2025
     """)
+    # Sakelar berlaku untuk seluruh proses dan hanya diubah saat diklik (bukan di setiap run sesi lain).
+    # Panel diisi setelah halaman dijalankan agar memuat pengukuran dari run ini.
+    st.sidebar.toggle(
+        "⏱️ Profiling", value=profiling.is_enabled(), key="profiling_toggle",
+        on_change=lambda: profiling.set_enabled(st.session_state.profiling_toggle),
+        help="Catat waktu setiap tahap halaman (berlaku untuk seluruh proses)"
+    )
+    profiling_panel = st.sidebar.container()
     
     # Page routing
-    if st.session_state.page == "Beranda":
-        halaman.home.show()
-    elif st.session_state.page == "Upload Data":
-        halaman.upload.show()
-    elif st.session_state.page == "Penerapan Algoritma C4.5":
-        halaman.c45_model.show()
-    elif st.session_state.page == "Prediksi Kualitas Udara":
-        halaman.predict.show()
+    page = st.session_state.page
+    if page in PAGES:
+        with profiling.stage(page, "impor modul"):
+            module = importlib.import_module(PAGES[page])
+        with profiling.stage(page, "total halaman"):
+            module.show()
+
+    show_profiling_panel(profiling_panel)
+    show_shared_memory_panel(profiling_panel)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+# benchmarks/bench_forest.py
+"""
+Benchmark mode ensemble: satu pohon C4.5 vs C45Forest dengan beberapa jumlah pohon.
+
+Untuk setiap model diukur throughput pelatihan (baris/detik dan pohon/detik),
+latensi prediksi batch per baris, dan latensi prediksi satu baris. Untuk ensemble
+juga dibandingkan inferensi tervektorisasi CompiledForest dengan loop per pohon.
+Data dibangkitkan dengan generator sintetis.
+
+Contoh:
+    python benchmarks/bench_forest.py
+    python benchmarks/bench_forest.py --rows 200000 --trees 10 50 --n-jobs 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.schema import FEATURE_COLUMNS, LABEL_COLUMN  # noqa: E402
+from core.training import build_model  # noqa: E402
+from core.tree_engine import CompiledTree, compile_model  # noqa: E402
+from synthetic import generate_chunks  # noqa: E402
+
+
+def timeit(fn, repeat):
+    """Mengembalikan waktu terbaik (detik) dari beberapa kali pemanggilan."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_tree_predict(model, X):
+    """Referensi: setiap pohon dijalankan terpisah lalu probabilitasnya dirata-rata."""
+    proba = np.zeros((len(X), len(model.classes_)))
+    for tree in model.trees_:
+        compiled = CompiledTree(tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                                np.arange(tree.node_count), tree.missing_go_to_left)
+        proba += tree.value[compiled.predict(X), 0, :]
+    return model.classes_.take(proba.argmax(axis=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=lambda v: int(float(v)), default=50_000, help="Jumlah baris data latih")
+    parser.add_argument('--trees', nargs='+', type=int, default=[10, 25, 50], help="Jumlah pohon ensemble")
+    parser.add_argument('--max-features', type=float, default=1.0, help="Fraksi fitur per pohon")
+    parser.add_argument('--no-bootstrap', dest='bootstrap', action='store_false')
+    parser.add_argument('--max-depth', type=int, default=7)
+    parser.add_argument('--n-jobs', type=int, default=None, help="Jumlah proses pelatihan (bawaan: semua CPU)")
+    parser.add_argument('--predict-rows', type=int, default=100_000, help="Jumlah baris untuk jalur batch")
+    parser.add_argument('--single', type=int, default=500, help="Jumlah prediksi satu baris yang diukur")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = next(generate_chunks(args.rows, chunksize=args.rows))
+    scaler = MinMaxScaler().fit(df[FEATURE_COLUMNS])
+    X = pd.DataFrame(scaler.transform(df[FEATURE_COLUMNS]), columns=FEATURE_COLUMNS)
+    y = LabelEncoder().fit_transform(df[LABEL_COLUMN])
+
+    raw = df[FEATURE_COLUMNS].to_numpy()
+    rng = np.random.default_rng(0)
+    batch = raw[rng.integers(0, len(raw), args.predict_rows)]
+    rows = [raw[i % len(raw)].tolist() for i in range(args.single)]
+
+    print(f"Data: {args.rows} baris, {os.cpu_count()} CPU")
+    print(f"{'Model':<14}{'Latih (s)':>11}{'Baris/s':>13}{'Pohon/s':>10}"
+          f"{'Batch/baris':>14}{'Satu baris':>13}{'Loop per pohon':>17}")
+    for n_trees in [1, *args.trees]:
+        params = {'max_depth': args.max_depth}
+        if n_trees > 1:
+            params.update(n_estimators=n_trees, bootstrap=args.bootstrap, max_features=args.max_features)
+        model = build_model(**params)
+        if n_trees > 1 and args.n_jobs:
+            model.set_params(n_jobs=args.n_jobs)
+
+        start = time.perf_counter()
+        model.fit(X, y)
+        train_time = time.perf_counter() - start
+        compiled = compile_model(model, scaler)
+
+        batch_seconds = timeit(lambda: compiled.predict_raw(batch), args.repeat) / args.predict_rows
+        single_seconds = timeit(lambda: [compiled.predict_raw_row(r) for r in rows], args.repeat) / args.single
+        loop = "-"
+        if n_trees > 1:
+            normalized = compiled.transform(batch)
+            # Hasil harus identik sebelum latensi dibandingkan
+            assert np.array_equal(compiled.predict(normalized), per_tree_predict(model, normalized))
+            loop_seconds = timeit(lambda: per_tree_predict(model, normalized), args.repeat) / args.predict_rows
+            loop = f"{loop_seconds * 1e6:.3f} µs"
+
+        label = "satu pohon" if n_trees == 1 else f"{n_trees} pohon"
+        print(f"{label:<14}{train_time:>11.3f}{args.rows / train_time:>13,.0f}{n_trees / train_time:>10.2f}"
+              f"{batch_seconds * 1e6:>11.3f} µs{single_seconds * 1e6:>10.1f} µs{loop:>17}")
+
+
+if __name__ == '__main__':
+    main()
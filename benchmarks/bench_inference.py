@@ -0,0 +1,92 @@
+# benchmarks/bench_inference.py
+"""
+Microbenchmark latensi prediksi per baris: scikit-learn vs CompiledTree.
+
+Contoh:
+    python benchmarks/bench_inference.py
+    python benchmarks/bench_inference.py --max-depth 20 --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.schema import FEATURE_COLUMNS, LABEL_COLUMN  # noqa: E402
+from core.tree_engine import CompiledTree  # noqa: E402
+
+
+def timeit(fn, repeat):
+    """Mengembalikan waktu terbaik (detik) dari beberapa kali pemanggilan."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='data/data_bersih.csv')
+    parser.add_argument('--max-depth', type=int, default=7)
+    parser.add_argument('--single', type=int, default=2000, help="Jumlah prediksi satu baris yang diukur")
+    parser.add_argument('--rows', type=int, default=100_000, help="Jumlah baris untuk jalur batch")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    scaler = MinMaxScaler().fit(df[FEATURE_COLUMNS])
+    X = pd.DataFrame(scaler.transform(df[FEATURE_COLUMNS]), columns=FEATURE_COLUMNS)
+    y = LabelEncoder().fit_transform(df[LABEL_COLUMN])
+    model = DecisionTreeClassifier(criterion='entropy', max_depth=args.max_depth, random_state=42).fit(X, y)
+    compiled = CompiledTree.from_model(model, scaler)
+
+    raw = df[FEATURE_COLUMNS].to_numpy()
+    rng = np.random.default_rng(0)
+    batch = raw[rng.integers(0, len(raw), args.rows)]
+    rows = [raw[i % len(raw)].tolist() for i in range(args.single)]
+
+    # Hasil harus identik sebelum latensi dibandingkan
+    expected = model.predict(pd.DataFrame(scaler.transform(pd.DataFrame(batch, columns=FEATURE_COLUMNS)), columns=FEATURE_COLUMNS))
+    assert np.array_equal(compiled.predict_raw(batch), expected)
+    single_expected = model.predict(scaler.transform(pd.DataFrame(rows, columns=FEATURE_COLUMNS)))
+    assert [compiled.predict_raw_row(r) for r in rows] == single_expected.tolist()
+
+    def sklearn_single():
+        # Meniru alur halaman prediksi: DataFrame satu baris -> transform -> predict
+        for r in rows:
+            frame = pd.DataFrame([r], columns=FEATURE_COLUMNS)
+            model.predict(scaler.transform(frame))
+
+    def compiled_single():
+        for r in rows:
+            compiled.predict_raw_row(r)
+
+    def sklearn_batch():
+        model.predict(scaler.transform(pd.DataFrame(batch, columns=FEATURE_COLUMNS)))
+
+    def compiled_batch():
+        compiled.predict_raw(batch)
+
+    results = [
+        ("satu baris", "scikit-learn", timeit(sklearn_single, args.repeat) / args.single),
+        ("satu baris", "CompiledTree", timeit(compiled_single, args.repeat) / args.single),
+        ("batch", "scikit-learn", timeit(sklearn_batch, args.repeat) / args.rows),
+        ("batch", "CompiledTree", timeit(compiled_batch, args.repeat) / args.rows),
+    ]
+
+    print(f"Pohon: {compiled.node_count} node, kedalaman {compiled.max_depth}")
+    print(f"{'Jalur':<12}{'Mesin':<15}{'Latensi/baris':>16}")
+    for path, engine, seconds in results:
+        print(f"{path:<12}{engine:<15}{seconds * 1e6:>13.3f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmark skala seluruh pipeline pada dataset sintetis berbagai ukuran.
+
+Tahap yang diukur per ukuran data: pembangkitan CSV, ingest streaming,
+normalisasi di memori, pemuatan dataset, pelatihan C4.5, ekstraksi aturan,
+render pohon, dan prediksi massal. Setiap tahap mencatat waktu dan memori
+puncak (alokasi yang dilacak tracemalloc, termasuk array numpy). Hasil ditulis
+ke JSON agar bisa dibandingkan antar commit dengan --compare.
+
+Contoh:
+    python benchmarks/bench_pipeline.py --sizes 1e3 1e4 1e5 --json hasil.json
+    python benchmarks/bench_pipeline.py --sizes 1e6 --skip render --compare hasil_lama.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.schema import FEATURE_COLUMNS  # noqa: E402
+import synthetic  # noqa: E402
+
+STAGES = ["generate", "ingest", "normalize", "load", "train", "rules", "render", "predict"]
+# Tahap yang hasilnya dibutuhkan oleh tahap lain
+DEPENDS = {
+    "ingest": ["generate"], "normalize": ["ingest"], "load": ["ingest"], "train": ["load"],
+    "rules": ["train"], "render": ["train"], "predict": ["generate", "train"],
+}
+DEFAULT_PARAMS = {
+    'criterion': 'gain_ratio', 'max_depth': 7, 'min_samples_leaf': 2, 'pruning': True, 'confidence_factor': 0.25,
+}
+
+
+def stage_generate(ctx):
+    synthetic.write_csv(ctx['csv'], ctx['rows'])
+    return {'csv_mb': os.path.getsize(ctx['csv']) / 2**20}
+
+
+def stage_ingest(ctx):
+    from core.ingest import ingest_csv
+    meta, _ = ingest_csv(ctx['csv'], ctx['store_dir'])
+    return {'n_rows': meta['n_rows']}
+
+
+def stage_normalize(ctx):
+    from core.dataset_store import load_dataset
+    from sklearn.preprocessing import MinMaxScaler
+    df, _ = load_dataset(ctx['store_dir'])
+    MinMaxScaler().fit_transform(np.asarray(df[FEATURE_COLUMNS]))
+    return {}
+
+
+def stage_load(ctx):
+    from core.dataset_store import load_dataset
+    from core.training import prepare_data
+    df, _ = load_dataset(ctx['store_dir'])
+    ctx['X'], ctx['y'], ctx['label_encoder'] = prepare_data(df)
+    return {}
+
+
+def stage_train(ctx):
+    from core.training import split_data, train_model
+    X, y = ctx['X'], ctx['y']
+    if len(X) > ctx['max_train_rows']:
+        # Subsampel acak (deterministik) agar ukuran besar tetap bisa diukur
+        keep = np.random.default_rng(0).choice(len(X), ctx['max_train_rows'], replace=False)
+        X, y = X.iloc[np.sort(keep)], y[np.sort(keep)]
+    X_train, X_test, y_train, y_test = split_data(X, y, 0.2)
+    model, train_time = train_model(DEFAULT_PARAMS, X_train, y_train)
+    ctx['model'] = model
+    return {
+        'train_rows': len(X_train),
+        'fit_seconds': train_time,
+        'node_count': int(model.tree_.node_count),
+        'accuracy': float((model.predict(X_test) == y_test).mean()),
+    }
+
+
+def stage_rules(ctx):
+    from core.rules import RuleIndex
+    index = RuleIndex(ctx['model'].tree_, FEATURE_COLUMNS, ctx['label_encoder'].classes_.tolist(),
+                      ctx['model'].classes_)
+    index.texts()
+    index.page(0)
+    return {'n_rules': len(index)}
+
+
+def stage_render(ctx):
+    from halaman.c45_model import get_tree_image, PREVIEW_DPI
+    image = get_tree_image(ctx['model'], FEATURE_COLUMNS, ctx['label_encoder'].classes_.tolist(), dpi=PREVIEW_DPI)
+    return {'png_kb': len(image) * 3 / 4 / 1024}
+
+
+def stage_predict(ctx):
+    from core.batch_predict import predict_csv
+    from core.dataset_store import load_meta, scaler_from_meta
+    from core.tree_engine import CompiledTree
+    scaler = scaler_from_meta(load_meta(ctx['store_dir']))
+    compiled = CompiledTree.from_model(ctx['model'], scaler)
+    summary = predict_csv(
+        ctx['csv'], os.path.join(ctx['workdir'], 'prediksi.csv'), ctx['model'], scaler, FEATURE_COLUMNS,
+        ctx['label_encoder'].classes_.tolist(), predict_fn=compiled.predict, apply_fn=compiled.apply,
+    )
+    return {'valid': summary['valid']}
+
+
+STAGE_FUNCTIONS = {name: globals()[f"stage_{name}"] for name in STAGES}
+
+
+def warm_imports(skip):
+    """Modul diimpor sebelum pengukuran agar waktu impor tidak masuk ke tahap pertama."""
+    import core.batch_predict, core.dataset_store, core.ingest, core.rules, core.training, core.tree_engine  # noqa: E401,F401
+    if "render" not in skip:
+        import halaman.c45_model  # noqa: F401
+
+
+def run_stage(name, ctx):
+    """
+    Menjalankan satu tahap; mengembalikan waktu, memori puncak, dan info tambahan.
+    Memori puncak dihitung relatif terhadap memori yang sudah terpakai saat tahap dimulai.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    extra = STAGE_FUNCTIONS[name](ctx)
+    seconds = time.perf_counter() - start
+    peak = (tracemalloc.get_traced_memory()[1] - baseline) if tracing else None
+    return {
+        'rows': ctx['rows'],
+        'stage': name,
+        'seconds': seconds,
+        'peak_mb': None if peak is None else peak / 2**20,
+        'rows_per_second': ctx['rows'] / seconds if seconds > 0 else None,
+        **extra,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import pandas
+    import sklearn
+    return {
+        'commit': commit,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    """Mencetak rasio waktu terhadap hasil sebelumnya untuk setiap (ukuran, tahap)."""
+    with open(baseline_path) as f:
+        baseline = {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\nPerbandingan dengan {baseline_path} (rasio > 1 berarti lebih lambat):")
+    for r in results:
+        old = baseline.get((r['rows'], r['stage']))
+        if old:
+            line = f"{r['rows']:>12,} {r['stage']:<10} {r['seconds'] / old['seconds']:>7.2f}x waktu"
+            if r['peak_mb'] is not None and old['peak_mb'] is not None:
+                line += f"  {r['peak_mb'] / max(old['peak_mb'], 1e-9):>7.2f}x memori"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=lambda v: int(float(v)), default=[1_000, 10_000, 100_000],
+                        help="Ukuran dataset (10^3 sampai 10^8, boleh notasi 1e6)")
+    parser.add_argument("--skip", nargs="*", default=[], choices=STAGES, help="Tahap yang dilewati")
+    parser.add_argument("--max-train-rows", type=int, default=1_000_000,
+                        help="Batas baris untuk tahap train (subsampel jika lebih besar)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Tanpa tracemalloc (waktu lebih akurat, memori puncak tidak dicatat)")
+    parser.add_argument("--workdir", help="Direktori kerja (bawaan: direktori sementara yang dihapus di akhir)")
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+    for name in STAGES:
+        blocked = [dep for dep in DEPENDS.get(name, []) if dep in args.skip]
+        if name not in args.skip and blocked:
+            parser.error(f"tahap '{name}' membutuhkan {', '.join(blocked)}; lewati juga '{name}'")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    warm_imports(args.skip)
+    if not args.no_memory:
+        tracemalloc.start()
+    try:
+        print(f"{'Baris':>12} {'Tahap':<10} {'Waktu':>10} {'Memori puncak':>14}")
+        for rows in args.sizes:
+            ctx = {
+                'rows': rows,
+                'workdir': workdir,
+                'csv': os.path.join(workdir, f"sintetis_{rows}.csv"),
+                'store_dir': os.path.join(workdir, f"dataset_{rows}"),
+                'max_train_rows': args.max_train_rows,
+            }
+            for name in STAGES:
+                if name in args.skip:
+                    continue
+                result = run_stage(name, ctx)
+                results.append(result)
+                memory = "-" if result['peak_mb'] is None else f"{result['peak_mb']:.1f} MB"
+                print(f"{rows:>12,} {name:<10} {result['seconds']:>9.3f}s {memory:>14}", flush=True)
+            if os.path.exists(ctx['csv']):
+                os.remove(ctx['csv'])
+            shutil.rmtree(ctx['store_dir'], ignore_errors=True)
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    max_rss_mb = None
+    if resource is not None:
+        # ru_maxrss dalam KB di Linux (byte di macOS)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        max_rss_mb = max_rss / 2**20 if sys.platform == "darwin" else max_rss / 1024
+        print(f"\nRSS puncak proses: {max_rss_mb:.1f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'environment': environment(), 'max_rss_mb': max_rss_mb, 'results': results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_startup.py
+"""
+Laporan waktu impor (cold start) aplikasi dan setiap modul halaman.
+
+Setiap modul diimpor di proses Python baru agar cache impor tidak ikut terukur.
+Laporan juga mencatat library berat yang ikut termuat, sehingga regresi
+(misalnya halaman Beranda yang tiba-tiba memuat scikit-learn) mudah terlihat.
+
+Contoh:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget halaman.home=0.8 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["app", "halaman.home", "halaman.upload", "halaman.c45_model", "halaman.predict"]
+HEAVY_LIBRARIES = ["sklearn", "matplotlib", "seaborn", "scipy", "pandas"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module, repeat):
+    """Waktu impor terbaik dari beberapa proses baru."""
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_LIBRARIES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def parse_budgets(items):
+    budgets = {}
+    for item in items:
+        module, seconds = item.split("=", 1)
+        budgets[module] = float(seconds)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODUL=DETIK",
+                        help="Batas waktu impor; skrip keluar dengan kode 1 jika terlampaui")
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+    budgets = parse_budgets(args.budget)
+
+    results = {}
+    failed = False
+    print(f"{'Modul':<22}{'Waktu impor':>12}  Library berat yang termuat")
+    for module in MODULES:
+        result = measure(module, args.repeat)
+        results[module] = result
+        over = module in budgets and result["seconds"] > budgets[module]
+        failed |= over
+        mark = "  <-- melebihi batas" if over else ""
+        print(f"{module:<22}{result['seconds'] * 1000:>9.0f} ms  {', '.join(result['heavy']) or '-'}{mark}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/synthetic.py
+"""
+Generator dataset kualitas udara sintetis untuk benchmark.
+
+Statistik per kategori (proporsi kelas, rata-rata, dan kovarians antar fitur)
+diambil dari data contoh, lalu baris baru dibangkitkan dari distribusi normal
+multivariat per kategori. Hasilnya memiliki tujuh kolom dan keseimbangan kelas
+yang sama dengan data contoh. File ditulis per potongan sehingga ukuran 10^8
+baris tetap bisa dibuat dengan memori yang kecil.
+
+Contoh:
+    python benchmarks/synthetic.py 1000000 /tmp/sintetis_1e6.csv
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.schema import FEATURE_COLUMNS, LABEL_COLUMN  # noqa: E402
+
+SAMPLE_FILE = os.path.join(ROOT, "data", "data_bersih.csv")
+DEFAULT_CHUNKSIZE = 1_000_000
+DECIMALS = 1
+
+
+def class_profiles(sample_path=SAMPLE_FILE):
+    """Proporsi, rata-rata, dan kovarians fitur per kategori dari data contoh."""
+    sample = pd.read_csv(sample_path)
+    profiles = []
+    for category, group in sample.groupby(LABEL_COLUMN, observed=True):
+        values = group[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        profiles.append({
+            "category": category,
+            "weight": len(group) / len(sample),
+            "mean": values.mean(axis=0),
+            # Kovarians kecil ditambahkan ke diagonal agar tetap positive definite untuk kelas yang sedikit
+            "cov": np.cov(values, rowvar=False) + np.eye(len(FEATURE_COLUMNS)) * 1e-6,
+        })
+    bounds = sample[FEATURE_COLUMNS].agg(["min", "max"]).to_numpy()
+    # Nilai fisik tidak negatif; batas atas diberi ruang agar rentang tetap realistis
+    lower = np.zeros(len(FEATURE_COLUMNS))
+    upper = bounds[1] * 1.5
+    return profiles, lower, upper
+
+
+def generate_chunks(n_rows, chunksize=DEFAULT_CHUNKSIZE, seed=42, sample_path=SAMPLE_FILE):
+    """Menghasilkan DataFrame sintetis per potongan (jumlah total tepat `n_rows`)."""
+    profiles, lower, upper = class_profiles(sample_path)
+    rng = np.random.default_rng(seed)
+    weights = np.array([p["weight"] for p in profiles])
+    categories = pd.CategoricalDtype([p["category"] for p in profiles])
+
+    for start in range(0, n_rows, chunksize):
+        size = min(chunksize, n_rows - start)
+        labels = rng.choice(len(profiles), size=size, p=weights)
+        features = np.empty((size, len(FEATURE_COLUMNS)))
+        for i, profile in enumerate(profiles):
+            mask = labels == i
+            features[mask] = rng.multivariate_normal(profile["mean"], profile["cov"], size=int(mask.sum()))
+        np.clip(features, lower, upper, out=features)
+
+        chunk = pd.DataFrame(np.round(features, DECIMALS), columns=FEATURE_COLUMNS)
+        chunk[LABEL_COLUMN] = pd.Categorical.from_codes(labels, dtype=categories)
+        yield chunk
+
+
+def write_csv(path, n_rows, chunksize=DEFAULT_CHUNKSIZE, seed=42, sample_path=SAMPLE_FILE):
+    """Menulis dataset sintetis ke CSV per potongan. Mengembalikan path."""
+    for i, chunk in enumerate(generate_chunks(n_rows, chunksize, seed, sample_path)):
+        chunk.to_csv(path, index=False, header=(i == 0), mode="w" if i == 0 else "a")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("rows", type=lambda v: int(float(v)), help="Jumlah baris (boleh notasi 1e6)")
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--sample", default=SAMPLE_FILE, help="Data contoh sumber statistik per kategori")
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.chunksize, args.seed, args.sample)
+    print(f"{args.rows} baris ditulis ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# cli.py
+"""
+Antarmuka baris perintah untuk operasi yang sama dengan aplikasi Streamlit,
+tanpa memuat Streamlit atau matplotlib (cocok untuk cron / batch job).
+
+Contoh:
+    python cli.py ingest data/data_bersih.csv
+    python cli.py ingest data_baru.csv --append
+    python cli.py train --criterion gain_ratio --max-depth 7
+    python cli.py predict input.csv hasil.csv --rules
+    python cli.py stream replay --rate 500 --duration 30
+    python cli.py bench inference --rows 10000
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+
+
+def cmd_ingest(args):
+    """Membaca CSV per potongan, menormalisasi, dan menyimpannya ke penyimpanan dataset."""
+    from core.ingest import ingest_csv, append_csv
+
+    progress = (lambda n: print(f"\r{n} baris diproses...", end="", file=sys.stderr)) if args.progress else None
+    if args.append:
+        meta, _, summary = append_csv(args.csv, args.store_dir, args.chunksize, progress)
+        print(
+            f"{summary['added']} baris ditambahkan dari {summary['read']} "
+            f"({summary['duplicates']} duplikat, {summary['invalid']} tidak lengkap)."
+        )
+        if summary['rescaled_columns']:
+            print(f"Rentang normalisasi diperbarui: {', '.join(summary['rescaled_columns'])}")
+    else:
+        meta, _ = ingest_csv(args.csv, args.store_dir, args.chunksize, progress)
+    if progress is not None:
+        print(file=sys.stderr)
+    print(f"Dataset: {meta['n_rows']} baris, hash {meta['content_hash'][:16]}")
+
+
+def cmd_train(args):
+    """Melatih model dengan parameter yang sama seperti halaman C4.5 lalu menyimpannya ke registry."""
+    from core.dataset_store import load_dataset, scaler_from_meta
+    from core.evaluation import evaluate_model
+    from core.model_registry import save_model
+    from core.training import default_min_samples_leaf, prepare_data, split_data, train_model
+
+    # Kombinasi yang juga tidak bisa dipilih di halaman C4.5
+    if args.pruning_path and args.n_estimators > 1:
+        sys.exit("Jalur pemangkasan hanya tersedia untuk satu pohon; gunakan --n-estimators 1.")
+    if args.pruning_path == "pessimistic" and args.criterion != "gain_ratio":
+        sys.exit("Jalur pemangkasan pessimistic hanya untuk kriteria gain_ratio; gunakan --pruning-path ccp.")
+
+    df, meta = load_dataset(args.store_dir)
+    scaler = scaler_from_meta(meta)
+    if scaler is None:
+        sys.exit("Rentang data asli tidak tersimpan; jalankan `cli.py ingest` terlebih dahulu.")
+
+    params = {
+        'criterion': args.criterion,
+        'max_depth': args.max_depth,
+        'min_samples_leaf': args.min_samples_leaf or default_min_samples_leaf(args.criterion),
+        'pruning': args.pruning and args.criterion == "gain_ratio",
+        'confidence_factor': args.confidence_factor,
+    }
+    if args.n_estimators > 1:
+        params.update(n_estimators=args.n_estimators, bootstrap=args.bootstrap, max_features=args.max_features)
+    X, y_encoded, label_encoder = prepare_data(df)
+    X_train, X_test, y_train, y_test = split_data(X, y_encoded, args.test_size)
+    pruning = None
+    if args.pruning_path:
+        from core.pruning import select_step, train_with_path
+
+        pruning, train_time = train_with_path(params, args.pruning_path, X_train, y_train, X_test, y_test)
+        model, step_params, pruning, y_test, y_pred = select_step(pruning, pruning['step'])
+        params.update(step_params)
+        print(f"Jalur pemangkasan: {pruning['path'].n_steps} langkah, pohon penuh "
+              f"{pruning['path'].node_count[0]} node")
+    else:
+        model, train_time = train_model(params, X_train, y_train)
+        y_pred = model.predict(X_test)
+
+    feature_names = X.columns.tolist()
+    class_names = label_encoder.classes_.tolist()
+    metrics = evaluate_model(model, feature_names, class_names, y_test, y_pred)
+    version = save_model(
+        model, scaler, feature_names, class_names, params, metrics,
+        test_size=args.test_size, train_time=train_time, data_hash=meta['content_hash'],
+        activate=not args.no_activate, pruning=pruning,
+    )
+    print(
+        f"Versi {version}: akurasi {metrics['accuracy']*100:.2f}% pada {metrics['n_test']} data uji, "
+        f"{model.tree_.node_count} node"
+        + (f" (pohon perwakilan dari {args.n_estimators} pohon)" if args.n_estimators > 1 else "")
+        + f", dilatih dalam {train_time:.3f} s"
+        + ("" if not args.no_activate else " (tidak diaktifkan)")
+    )
+
+
+def cmd_predict(args):
+    """
+    Prediksi massal dari CSV ke CSV memakai versi model aktif (atau versi tertentu).
+    Model dibaca dari file portabel versi tersebut, tanpa mengimpor scikit-learn.
+    """
+    from core import model_registry
+    from core.batch_predict import predict_csv
+    from core.rules import RuleIndex
+    from core.tree_engine import compile_model
+
+    version = args.version or model_registry.active_version()
+    if version is None:
+        sys.exit("Model belum tersedia; jalankan `cli.py train` terlebih dahulu.")
+    data = model_registry.load_portable_version(version)
+    compiled = compile_model(data['model'], data['scaler'])
+    rule_index = RuleIndex(data['model'].tree_, data['feature_names'], data['class_names'],
+                           data['model'].classes_) if args.rules else None
+
+    summary = predict_csv(
+        args.input, args.output, data['model'], data['scaler'], data['feature_names'], data['class_names'],
+        chunksize=args.chunksize, predict_fn=compiled.predict, rule_index=rule_index, apply_fn=compiled.apply,
+    )
+    print(f"Versi {version}: {summary['valid']} dari {summary['rows']} baris diprediksi ({summary['invalid']} tidak valid).")
+    for name, count in summary['counts'].items():
+        print(f"  {name}: {count}")
+
+
+def cmd_stream(args):
+    """Prediksi streaming dari sumber lokal; ringkasan throughput dan latensi dicetak berkala."""
+    from core import streaming
+    from core.service import ModelHandle
+
+    handle = ModelHandle()
+    try:
+        _, data, _ = handle.current()
+    except LookupError as e:
+        sys.exit(str(e))
+    if args.source == "tail" and not args.path:
+        sys.exit("Sumber tail membutuhkan --path.")
+    tail_dir = None if args.allow_any_path else streaming.TAIL_DIR
+    try:
+        if args.source == "tail":
+            streaming.resolve_tail_path(args.path, tail_dir)
+        elif args.source == "socket":
+            streaming.check_host(args.host, args.allow_remote)
+    except ValueError as e:
+        sys.exit(str(e))
+    feature_names = data['feature_names']
+    factory = {
+        "replay": lambda: streaming.replay_source(feature_names, data['scaler'], path=args.path,
+                                                  rate=args.rate, n_stations=args.stations, loop=not args.once),
+        "tail": lambda: streaming.tail_csv_source(feature_names, args.path, from_start=args.from_start,
+                                                  base_dir=tail_dir),
+        "socket": lambda: streaming.socket_source(feature_names, args.host, args.port, allow_remote=args.allow_remote),
+    }[args.source]
+
+    processor = streaming.StreamProcessor(handle.current, window_seconds=args.window, max_batch=args.max_batch,
+                                          max_wait=args.max_wait / 1000)
+    runner = streaming.StreamRunner(processor, factory)
+    start = time.monotonic()
+    try:
+        while runner.running and (args.duration is None or time.monotonic() - start < args.duration):
+            time.sleep(args.interval)
+            s = runner.snapshot()
+            latency = "-" if s['latency_ms_p50'] is None else f"{s['latency_ms_p50']:.1f}/{s['latency_ms_p95']:.1f} ms"
+            print(f"{s['rows']:>10} baris  {s['throughput']:>9,.0f} baris/s  latensi p50/p95 {latency}  "
+                  f"batch rata-rata {s['mean_batch_rows']:.1f}  tidak valid {s['invalid']}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop(timeout=5)
+
+    s = runner.snapshot()
+    if s['error']:
+        sys.exit(f"Stream berhenti karena kesalahan: {s['error']}")
+    print(f"Jumlah kategori per stasiun ({args.window:g} detik terakhir):")
+    for station, counts in s['stations'].items():
+        print(f"  {station}: " + ", ".join(f"{name}={count}" for name, count in zip(s['class_names'], counts)))
+
+
+def available_benchmarks():
+    return sorted(os.path.basename(path)[len("bench_"):-len(".py")]
+                  for path in glob.glob(os.path.join(BENCH_DIR, "bench_*.py")))
+
+
+def cmd_bench(args):
+    """Menjalankan skrip benchmark di proses terpisah dengan argumen tambahan diteruskan apa adanya."""
+    names = available_benchmarks() if args.name == "all" else [args.name]
+    status = 0
+    for name in names:
+        print(f"== {name} ==", flush=True)
+        script = os.path.join(BENCH_DIR, f"bench_{name}.py")
+        status |= subprocess.run([sys.executable, script, *args.bench_args], cwd=ROOT).returncode
+    sys.exit(status)
+
+
+def build_parser():
+    from core.dataset_store import STORE_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Normalisasi CSV dan simpan sebagai dataset")
+    ingest.add_argument("csv")
+    ingest.add_argument("--append", action="store_true", help="Tambahkan ke dataset yang ada (dengan deduplikasi)")
+    ingest.add_argument("--store-dir", default=STORE_DIR)
+    ingest.add_argument("--chunksize", type=int, default=100_000)
+    ingest.add_argument("--progress", action="store_true")
+    ingest.set_defaults(func=cmd_ingest)
+
+    train = subparsers.add_parser("train", help="Latih model dan simpan sebagai versi baru")
+    train.add_argument("--criterion", choices=["gain_ratio", "entropy", "gini"], default="gain_ratio")
+    train.add_argument("--max-depth", type=int, default=7)
+    train.add_argument("--min-samples-leaf", type=int,
+                       help="Minimum sampel per daun (bawaan: 2 untuk gain_ratio, 1 untuk entropy/gini)")
+    train.add_argument("--no-pruning", dest="pruning", action="store_false")
+    train.add_argument("--confidence-factor", type=float, default=0.25)
+    train.add_argument("--test-size", type=float, default=0.2)
+    train.add_argument("--n-estimators", type=int, default=1, help="Jumlah pohon ensemble (1 = satu pohon)")
+    train.add_argument("--no-bootstrap", dest="bootstrap", action="store_false",
+                       help="Tanpa sampel bootstrap (random subspace saja)")
+    train.add_argument("--max-features", type=float, default=1.0, help="Fraksi fitur per pohon ensemble")
+    train.add_argument("--pruning-path", choices=["ccp", "pessimistic"],
+                       help="Tumbuhkan pohon penuh sekali, hitung jalur pemangkasan, dan simpan ukuran terbaik")
+    train.add_argument("--store-dir", default=STORE_DIR)
+    train.add_argument("--no-activate", action="store_true", help="Simpan versi tanpa menjadikannya aktif")
+    train.set_defaults(func=cmd_train)
+
+    predict = subparsers.add_parser("predict", help="Prediksi massal file CSV")
+    predict.add_argument("input")
+    predict.add_argument("output")
+    predict.add_argument("--version", help="Versi model (bawaan: versi aktif)")
+    predict.add_argument("--chunksize", type=int, default=50_000)
+    predict.add_argument("--rules", action="store_true", help="Tambahkan nomor dan teks aturan yang dipakai")
+    predict.set_defaults(func=cmd_predict)
+
+    stream = subparsers.add_parser("stream", help="Prediksi streaming pembacaan sensor dari sumber lokal")
+    stream.add_argument("source", choices=["replay", "tail", "socket"])
+    stream.add_argument("--path", help="File CSV (tail) atau data replay (bawaan: dataset tersimpan)")
+    stream.add_argument("--allow-any-path", action="store_true",
+                        help="Tail: izinkan file di luar folder upload/")
+    stream.add_argument("--rate", type=float, default=50.0, help="Laju replay (pembacaan/detik)")
+    stream.add_argument("--stations", type=int, default=3, help="Jumlah stasiun replay tanpa kolom stasiun")
+    stream.add_argument("--once", action="store_true", help="Replay satu kali tanpa diulang")
+    stream.add_argument("--from-start", action="store_true", help="Tail: baca juga isi file yang sudah ada")
+    stream.add_argument("--host", default="127.0.0.1")
+    stream.add_argument("--port", type=int, default=9009)
+    stream.add_argument("--allow-remote", action="store_true",
+                        help="Socket: izinkan host selain loopback (menerima koneksi dari jaringan)")
+    stream.add_argument("--window", type=float, default=60.0, help="Jendela bergulir per stasiun (detik)")
+    stream.add_argument("--max-batch", type=int, default=256)
+    stream.add_argument("--max-wait", type=float, default=20.0, help="Maks. tunggu micro-batch (ms)")
+    stream.add_argument("--interval", type=float, default=1.0, help="Interval cetak ringkasan (detik)")
+    stream.add_argument("--duration", type=float, help="Berhenti setelah sekian detik (bawaan: sampai Ctrl+C)")
+    stream.set_defaults(func=cmd_stream)
+
+    bench = subparsers.add_parser("bench", help="Jalankan benchmark")
+    bench.add_argument("name", nargs="?", default="all", choices=["all", *available_benchmarks()])
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER, help="Argumen yang diteruskan ke skrip benchmark")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# core/batch_predict.py
+import numpy as np
+import pandas as pd
+
+from core.schema import PREDICTION_COLUMN, RULE_NUMBER_COLUMN, RULE_COLUMN
+
+# Jumlah baris per potongan; memori puncak ditentukan oleh nilai ini, bukan ukuran file
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def read_header(source):
+    """Membaca nama kolom saja, lalu mengembalikan posisi baca ke awal file."""
+    columns = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return columns
+
+
+def validate_columns(columns, feature_names):
+    """Memunculkan ValueError jika ada kolom fitur yang tidak ditemukan."""
+    missing = [col for col in feature_names if col not in columns]
+    if missing:
+        raise ValueError(
+            f"Kolom yang hilang dari file: {', '.join(missing)}. "
+            f"Kolom yang dibutuhkan: {', '.join(feature_names)}"
+        )
+
+
+def predict_frame(chunk, model, scaler, feature_names, class_names, predict_fn=None,
+                  rule_index=None, apply_fn=None):
+    """
+    Memprediksi satu potongan data secara tervektorisasi.
+    Baris dengan nilai kosong / non-numerik diberi label kosong.
+    Jika `rule_index` diberikan, nomor dan teks aturan yang dipakai ikut ditambahkan; untuk
+    pohon tunggal label juga dibaca dari daun yang sama, sehingga pohon hanya ditelusuri sekali.
+    Mengembalikan (chunk dengan kolom prediksi, jumlah baris valid).
+    """
+    features = chunk[feature_names].apply(pd.to_numeric, errors='coerce')
+    valid = features.notna().all(axis=1).to_numpy()
+
+    labels = np.full(len(chunk), "", dtype=object)
+    rule_numbers = np.full(len(chunk), "", dtype=object)
+    rule_texts = np.full(len(chunk), "", dtype=object)
+    if valid.any():
+        # Satu kali transform dan satu kali predict untuk seluruh potongan
+        X = scaler.transform(features[valid])
+        leaves = None
+        if rule_index is not None:
+            # Id daun -> aturan lewat pencarian array, tanpa menyusun ulang daftar aturan
+            leaves = (apply_fn or model.apply)(X)
+            rule_numbers[valid] = rule_index.rule_number[leaves]
+            rule_texts[valid] = rule_index.texts()[leaves]
+        if leaves is not None and getattr(model, 'trees_', None) is None:
+            labels[valid] = rule_index.node_class[leaves]
+        else:
+            # Ensemble memakai voting semua pohon; daun di atas hanya milik pohon perwakilan
+            if predict_fn is None:
+                predict_fn = model.predict
+            labels[valid] = np.asarray(class_names, dtype=object)[predict_fn(X)]
+
+    chunk = chunk.copy()
+    chunk[PREDICTION_COLUMN] = labels
+    if rule_index is not None:
+        chunk[RULE_NUMBER_COLUMN] = rule_numbers
+        chunk[RULE_COLUMN] = rule_texts
+    return chunk, int(valid.sum())
+
+
+def iter_predictions(source, model, scaler, feature_names, class_names,
+                     chunksize=DEFAULT_CHUNKSIZE, predict_fn=None, rule_index=None, apply_fn=None):
+    """Membaca CSV per potongan dan menghasilkan potongan yang sudah diprediksi."""
+    # Header divalidasi lebih dulu agar file tanpa baris data pun tetap diperiksa kolomnya
+    validate_columns(read_header(source), feature_names)
+    with pd.read_csv(source, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield predict_frame(chunk, model, scaler, feature_names, class_names, predict_fn, rule_index, apply_fn)
+
+
+def predict_csv(source, dest, model, scaler, feature_names, class_names,
+                chunksize=DEFAULT_CHUNKSIZE, predict_fn=None, progress=None, rule_index=None, apply_fn=None):
+    """
+    Prediksi massal dari file CSV ke file CSV tanpa memuat seluruh file ke memori.
+    `source`/`dest` boleh berupa path atau objek file. Mengembalikan ringkasan hasil.
+    """
+    summary = {'rows': 0, 'valid': 0, 'invalid': 0, 'counts': {}}
+    counts = pd.Series(0, index=pd.Index(class_names), dtype='int64')
+
+    chunks = iter_predictions(source, model, scaler, feature_names, class_names, chunksize, predict_fn,
+                              rule_index, apply_fn)
+    for i, (chunk, n_valid) in enumerate(chunks):
+        chunk.to_csv(dest, index=False, header=(i == 0), mode='w' if i == 0 else 'a')
+        summary['rows'] += len(chunk)
+        summary['valid'] += n_valid
+        counts = counts.add(chunk.loc[chunk[PREDICTION_COLUMN] != "", PREDICTION_COLUMN].value_counts(), fill_value=0)
+        if progress is not None:
+            progress(summary['rows'])
+
+    summary['invalid'] = summary['rows'] - summary['valid']
+    summary['counts'] = {name: int(n) for name, n in counts.items()}
+    return summary
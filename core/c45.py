@@ -0,0 +1,388 @@
+# core/c45.py
+from statistics import NormalDist
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+
+def entropy_rows(counts, totals):
+    """Entropi (bit) untuk setiap baris matriks jumlah kelas."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = counts / totals[:, None]
+        terms = np.where(p > 0, p * np.log2(p), 0.0)
+    return -terms.sum(axis=1)
+
+
+def entropy(dist):
+    total = dist.sum()
+    if total <= 0:
+        return 0.0
+    p = dist[dist > 0] / total
+    return float(-(p * np.log2(p)).sum())
+
+
+def add_errors(n, e, cf):
+    """
+    Tambahan error pesimistis C4.5: batas atas interval kepercayaan binomial
+    untuk `e` kesalahan dari `n` kasus pada tingkat kepercayaan `cf`.
+    """
+    if e < 1:
+        base = n * (1 - cf ** (1 / n))
+        if e == 0:
+            return base
+        return base + e * (add_errors(n, 1, cf) - base)
+    if e + 0.5 >= n:
+        return max(n - e, 0.0)
+    z = NormalDist().inv_cdf(1 - cf)
+    f = (e + 0.5) / n
+    r = (f + z * z / (2 * n) + z * np.sqrt(f / n - f * f / n + z * z / (4 * n * n))) / (1 + z * z / n)
+    return r * n - e
+
+
+class TreeStructure:
+    """
+    Struktur pohon berbentuk array dengan atribut yang sama seperti
+    `sklearn.tree._tree.Tree`, sehingga fungsi aturan, visualisasi
+    (`plot_tree`) dan CompiledTree dapat dipakai tanpa perubahan.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, value,
+                 n_node_samples, weighted_n_node_samples, impurity, missing_go_to_left, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.n_node_samples = n_node_samples
+        self.weighted_n_node_samples = weighted_n_node_samples
+        self.impurity = impurity
+        self.missing_go_to_left = missing_go_to_left
+        self.n_features = n_features
+        self.n_outputs = 1
+        self.n_classes = np.array([value.shape[2]], dtype=np.intp)
+        self.node_count = len(feature)
+        self.capacity = self.node_count
+
+        depth = np.zeros(self.node_count, dtype=np.intp)
+        for node in range(self.node_count):
+            if feature[node] >= 0:
+                depth[children_left[node]] = depth[node] + 1
+                depth[children_right[node]] = depth[node] + 1
+        self.node_depth = depth
+        self.max_depth = int(depth.max()) if self.node_count else 0
+        self.n_leaves = int((feature < 0).sum())
+
+
+def extract_subtree(tree_, root, collapsed=None):
+    """
+    Menyalin subpohon yang berakar di node `root` menjadi TreeStructure baru
+    (id node dinomori ulang secara preorder). Node dengan `collapsed[node]` True
+    dijadikan daun (pemangkasan). Mengembalikan (subpohon, id asli per node).
+    """
+    is_split = np.asarray(tree_.feature) >= 0
+    if collapsed is not None:
+        is_split = is_split & ~np.asarray(collapsed, dtype=bool)
+    order, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if is_split[node]:
+            stack.append(tree_.children_right[node])
+            stack.append(tree_.children_left[node])
+    original = np.array(order, dtype=np.intp)
+    remap = np.full(tree_.node_count, -1, dtype=np.intp)
+    remap[original] = np.arange(len(original))
+
+    split = is_split[original]
+    left = tree_.children_left[original]
+    right = tree_.children_right[original]
+    missing_left = getattr(tree_, 'missing_go_to_left', None)
+    subtree = TreeStructure(
+        feature=np.where(split, tree_.feature[original], -2),
+        threshold=np.where(split, tree_.threshold[original], -2.0),
+        children_left=np.where(split, remap[left], -1),
+        children_right=np.where(split, remap[right], -1),
+        value=tree_.value[original],
+        n_node_samples=tree_.n_node_samples[original],
+        weighted_n_node_samples=tree_.weighted_n_node_samples[original],
+        impurity=tree_.impurity[original],
+        missing_go_to_left=np.zeros(len(original), dtype=bool) if missing_left is None else np.asarray(missing_left)[original],
+        n_features=tree_.n_features,
+    )
+    return subtree, original
+
+
+def impurity_importances(tree_, n_features):
+    """Feature importance: penurunan impurity berbobot per fitur, dinormalisasi seperti scikit-learn."""
+    feature = np.asarray(tree_.feature)
+    weighted = np.asarray(tree_.weighted_n_node_samples, dtype=np.float64)
+    impurity = np.asarray(tree_.impurity, dtype=np.float64)
+    importances = np.zeros(n_features)
+    for node_id in np.nonzero(feature >= 0)[0]:
+        left, right = tree_.children_left[node_id], tree_.children_right[node_id]
+        importances[feature[node_id]] += (
+            weighted[node_id] * impurity[node_id]
+            - weighted[left] * impurity[left]
+            - weighted[right] * impurity[right]
+        )
+    importances = np.maximum(importances, 0)
+    if importances.sum() > 0:
+        importances /= importances.sum()
+    return importances
+
+
+class C45Classifier(ClassifierMixin, BaseEstimator):
+    """
+    Pohon keputusan C4.5 untuk fitur kontinu.
+
+    - Pemilihan split dengan gain ratio (hanya di antara kandidat dengan
+      information gain di atas rata-rata, disertai koreksi MDL untuk threshold).
+    - Setiap fitur diurutkan sekali di akar; urutan tersebut dipartisi secara
+      stabil ke node anak sehingga pencarian split cukup memakai jumlah kelas
+      kumulatif (np.cumsum) tanpa mengurutkan ulang di setiap node.
+    - Nilai hilang (NaN) ditangani seperti C4.5 saat pelatihan: kasus dibagi secara
+      fraksional ke kedua cabang. Saat prediksi, nilai hilang mengikuti cabang yang
+      lebih berat (`missing_go_to_left`), aturan yang sama dengan CompiledTree sehingga
+      prediksi model, halaman, dan prediksi massal selalu identik.
+    - Pemangkasan pessimistic error (confidence factor) setelah pohon tumbuh,
+      dan opsional cost-complexity (`ccp_alpha`) seperti pada scikit-learn.
+    """
+
+    # Dibaca oleh sklearn.tree.plot_tree
+    criterion = "gain_ratio"
+
+    def __init__(self, max_depth=None, min_samples_leaf=2, confidence_factor=0.25, pruning=True, ccp_alpha=0.0):
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.confidence_factor = confidence_factor
+        self.pruning = pruning
+        self.ccp_alpha = ccp_alpha
+
+    # --- Pelatihan ---
+
+    def fit(self, X, y, sample_weight=None):
+        if hasattr(X, 'columns'):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X = np.asarray(X, dtype=np.float32)
+        self.classes_, y_enc = np.unique(np.asarray(y), return_inverse=True)
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = X.shape[1]
+        self.n_outputs_ = 1
+
+        weights = np.ones(len(X)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        nodes = self._grow(X, y_enc.astype(np.intp), weights)
+        if self.pruning:
+            nodes = self._prune(nodes)
+        self.tree_ = self._build_structure(nodes)
+        if self.ccp_alpha > 0:
+            from core.pruning import cost_complexity_path
+
+            path = cost_complexity_path(self.tree_)
+            self.tree_, _ = extract_subtree(self.tree_, 0, path.collapsed(path.step_for_alpha(self.ccp_alpha)))
+        self.feature_importances_ = impurity_importances(self.tree_, self.n_features_in_)
+        self.max_features_ = self.n_features_in_
+        return self
+
+    def _grow(self, X, y, weights):
+        n, n_features = X.shape
+        max_depth = np.inf if self.max_depth is None else self.max_depth
+        missing = np.isnan(X)
+
+        # Presort sekali: posisi baris terurut per fitur, tanpa nilai hilang
+        orders = []
+        for f in range(n_features):
+            order = np.argsort(X[:, f], kind='stable')
+            orders.append(order[:n - int(missing[:, f].sum())])
+
+        nodes = []
+        stack = [(np.arange(n), weights, orders, 0, -1, False)]
+        while stack:
+            rows, w, node_orders, depth, parent, is_left = stack.pop()
+            node_id = len(nodes)
+            if parent >= 0:
+                nodes[parent]['left' if is_left else 'right'] = node_id
+
+            dist = np.bincount(y[rows], weights=w, minlength=self.n_classes_)
+            node = {
+                'dist': dist, 'n_samples': len(rows), 'feature': -2, 'threshold': -2.0,
+                'left': -1, 'right': -1, 'missing_left': False,
+            }
+            nodes.append(node)
+
+            total = dist.sum()
+            if depth >= max_depth or dist.max() >= total - 1e-9 or total < 2 * self.min_samples_leaf:
+                continue
+
+            split = self._best_split(X, y, rows, w, node_orders, total)
+            if split is None:
+                continue
+            f, threshold, left_w, right_w = split
+
+            values = X[rows, f]
+            is_missing = missing[rows, f]
+            p_left = left_w / (left_w + right_w)
+            node.update(feature=f, threshold=threshold, missing_left=bool(left_w >= right_w))
+
+            children = []
+            for go, share in ((values <= threshold, p_left), (values > threshold, 1 - p_left)):
+                pos = np.nonzero(go | is_missing)[0]
+                child_w = w[pos] * np.where(is_missing[pos], share, 1.0)
+                # Memetakan urutan terurut induk ke posisi di anak (tetap terurut)
+                new_pos = np.full(len(rows), -1, dtype=np.intp)
+                new_pos[pos] = np.arange(len(pos))
+                child_orders = []
+                for order in node_orders:
+                    mapped = new_pos[order]
+                    child_orders.append(mapped[mapped >= 0])
+                children.append((rows[pos], child_w, child_orders))
+
+            # Kanan didorong lebih dulu agar anak kiri diproses (dan diberi id) lebih awal
+            stack.append((*children[1], depth + 1, node_id, False))
+            stack.append((*children[0], depth + 1, node_id, True))
+        return nodes
+
+    def _best_split(self, X, y, rows, w, node_orders, total):
+        """Mencari split terbaik (gain ratio) dari semua fitur pada satu node."""
+        min_leaf = self.min_samples_leaf
+        candidates = []
+        for f, order in enumerate(node_orders):
+            m = len(order)
+            if m < 2 * min_leaf:
+                continue
+            values = X[rows[order], f]
+            ww = w[order]
+            counts = np.zeros((m, self.n_classes_))
+            counts[np.arange(m), y[rows[order]]] = ww
+            np.cumsum(counts, axis=0, out=counts)
+
+            known = counts[-1]
+            known_total = known.sum()
+            left_total = counts.sum(axis=1)
+            right_total = known_total - left_total
+
+            # Threshold hanya di antara dua nilai berbeda yang berurutan
+            cut = np.nonzero(
+                (values[:-1] < values[1:])
+                & (left_total[:-1] >= min_leaf)
+                & (right_total[:-1] >= min_leaf)
+            )[0]
+            if cut.size == 0:
+                continue
+
+            left_counts = counts[cut]
+            right_counts = known - left_counts
+            lt, rt = left_total[cut], right_total[cut]
+            info = entropy(known) - (lt * entropy_rows(left_counts, lt) + rt * entropy_rows(right_counts, rt)) / known_total
+            best = int(np.argmax(info))
+
+            # Koreksi MDL untuk pemilihan threshold lalu kalikan fraksi data yang diketahui
+            gain = (known_total / total) * (info[best] - np.log2(cut.size) / known_total)
+            if gain <= 0:
+                continue
+            shares = np.array([lt[best], rt[best], total - known_total]) / total
+            shares = shares[shares > 0]
+            split_info = float(-(shares * np.log2(shares)).sum())
+            if split_info <= 1e-12:
+                continue
+
+            i = cut[best]
+            threshold = (float(values[i]) + float(values[i + 1])) / 2.0
+            candidates.append((gain, gain / split_info, f, threshold, lt[best], rt[best]))
+
+        if not candidates:
+            return None
+        avg_gain = np.mean([c[0] for c in candidates])
+        eligible = [c for c in candidates if c[0] >= avg_gain - 1e-12]
+        _, _, f, threshold, left_w, right_w = max(eligible, key=lambda c: c[1])
+        return f, threshold, left_w, right_w
+
+    # --- Pemangkasan ---
+
+    def _prune(self, nodes):
+        """Pessimistic error pruning (subtree replacement) dari bawah ke atas."""
+        estimate = np.zeros(len(nodes))
+        keep = np.ones(len(nodes), dtype=bool)
+        # Id anak selalu lebih besar dari induknya, jadi urutan terbalik = bottom-up
+        for node_id in range(len(nodes) - 1, -1, -1):
+            node = nodes[node_id]
+            n = node['dist'].sum()
+            errors = n - node['dist'].max()
+            leaf_estimate = errors + add_errors(n, errors, self.confidence_factor) if n > 0 else 0.0
+            if node['feature'] < 0:
+                estimate[node_id] = leaf_estimate
+                continue
+            subtree_estimate = estimate[node['left']] + estimate[node['right']]
+            if leaf_estimate <= subtree_estimate + 0.1:
+                node.update(feature=-2, threshold=-2.0)
+                estimate[node_id] = leaf_estimate
+            else:
+                estimate[node_id] = subtree_estimate
+
+        # Susun ulang node yang tersisa dalam urutan preorder
+        kept, remap, stack = [], {}, [0]
+        while stack:
+            node_id = stack.pop()
+            remap[node_id] = len(kept)
+            kept.append(nodes[node_id])
+            node = nodes[node_id]
+            if node['feature'] >= 0:
+                stack.append(node['right'])
+                stack.append(node['left'])
+        for node in kept:
+            if node['feature'] >= 0:
+                node['left'], node['right'] = remap[node['left']], remap[node['right']]
+            else:
+                node['left'] = node['right'] = -1
+        return kept
+
+    def _build_structure(self, nodes):
+        n_nodes = len(nodes)
+        dist = np.array([node['dist'] for node in nodes])
+        weighted = dist.sum(axis=1)
+        value = (dist / np.where(weighted > 0, weighted, 1)[:, None]).reshape(n_nodes, 1, self.n_classes_)
+        impurity = entropy_rows(dist, np.where(weighted > 0, weighted, 1))
+        children_left = np.array([node['left'] for node in nodes], dtype=np.intp)
+        children_right = np.array([node['right'] for node in nodes], dtype=np.intp)
+        feature = np.array([node['feature'] for node in nodes], dtype=np.intp)
+
+        return TreeStructure(
+            feature=feature,
+            threshold=np.array([node['threshold'] for node in nodes], dtype=np.float64),
+            children_left=children_left,
+            children_right=children_right,
+            value=value,
+            n_node_samples=np.array([node['n_samples'] for node in nodes], dtype=np.intp),
+            weighted_n_node_samples=weighted,
+            impurity=impurity,
+            missing_go_to_left=np.array([node['missing_left'] for node in nodes], dtype=bool),
+            n_features=self.n_features_in_,
+        )
+
+    # --- Prediksi ---
+
+    def apply(self, X):
+        """Id daun untuk setiap baris (nilai hilang mengikuti cabang terberat)."""
+        X = np.asarray(X, dtype=np.float32)
+        tree_ = self.tree_
+        node = np.zeros(len(X), dtype=np.intp)
+        active = np.nonzero(tree_.feature[node] >= 0)[0]
+        while active.size:
+            current = node[active]
+            values = X[active, tree_.feature[current]]
+            go_left = (values <= tree_.threshold[current]) | (np.isnan(values) & tree_.missing_go_to_left[current])
+            nxt = np.where(go_left, tree_.children_left[current], tree_.children_right[current])
+            node[active] = nxt
+            active = active[tree_.feature[nxt] >= 0]
+        return node
+
+    def predict_proba(self, X):
+        return self.tree_.value[self.apply(X), 0, :].copy()
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+    def get_depth(self):
+        return self.tree_.max_depth
+
+    def get_n_leaves(self):
+        return self.tree_.n_leaves
@@ -0,0 +1,218 @@
+# core/dataset_stats.py
+"""
+Statistik ringkas dataset yang dihitung sekali jalan dan diperbarui bertahap.
+
+Per kolom fitur disimpan jumlah nilai, min/max, rata-rata dan M2 (jumlah kuadrat
+simpangan, gabungan Welford/Chan per potongan), serta sketch kuantil berupa
+centroid (nilai rata-rata, bobot) berukuran tetap. Per kategori label disimpan
+jumlah barisnya. Statistik ditulis ke `stats.json` di samping dataset bersama
+hash isi dataset, sehingga halaman cukup membaca ringkasan kecil ini alih-alih
+memindai ulang semua baris.
+
+Saat data ditambahkan, kolom yang rentang normalisasinya berubah cukup
+ditransformasikan secara affine (x * a + b) sebelum baris baru digabungkan.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from core import dataset_store
+
+STATS_FILE = "stats.json"
+SKETCH_SIZE = 512
+DEFAULT_CHUNKSIZE = 100_000
+QUANTILES = (0.25, 0.50, 0.75)
+
+
+def _compress(values, weights, size):
+    """Meringkas pasangan (nilai, bobot) menjadi paling banyak `size` centroid berbobot kuantil setara."""
+    order = np.argsort(values, kind="stable")
+    values, weights = values[order], weights[order]
+    if len(values) <= size:
+        return values, weights
+    cumulative = np.cumsum(weights)
+    bins = np.minimum(((cumulative - weights / 2) / cumulative[-1] * size).astype(np.int64), size - 1)
+    total = np.bincount(bins, weights, size)
+    mean = np.bincount(bins, weights * values, size)
+    used = total > 0
+    return mean[used] / total[used], total[used]
+
+
+class DatasetStats:
+    """Statistik per kolom (count, min/max, mean/M2, sketch kuantil) dan jumlah baris per kategori."""
+
+    def __init__(self, columns, sketch_size=SKETCH_SIZE):
+        self.columns = list(columns)
+        self.sketch_size = sketch_size
+        k = len(self.columns)
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.sketches = [(np.empty(0), np.empty(0)) for _ in range(k)]
+        self.class_counts = {}
+        self.content_hash = None
+
+    def update_features(self, X):
+        """Menggabungkan satu potongan nilai fitur (n x k); NaN dilewati per kolom."""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+        valid = ~np.isnan(X)
+        n_b = valid.sum(axis=0)
+        has = n_b > 0
+        safe_n = np.maximum(n_b, 1)
+        mean_b = np.where(valid, X, 0.0).sum(axis=0) / safe_n
+        m2_b = np.where(valid, (X - mean_b) ** 2, 0.0).sum(axis=0)
+
+        # Gabungan paralel Welford (Chan dkk.): rata-rata dan M2 dua kelompok
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        safe_total = np.maximum(n, 1)
+        self.mean = np.where(has, self.mean + delta * n_b / safe_total, self.mean)
+        self.m2 = np.where(has, self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_total, self.m2)
+        self.count = n
+        self.min = np.minimum(self.min, np.where(valid, X, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(valid, X, -np.inf).max(axis=0))
+
+        for i in np.flatnonzero(has):
+            column = X[valid[:, i], i]
+            values, weights = self.sketches[i]
+            self.sketches[i] = _compress(
+                np.concatenate([values, column]), np.concatenate([weights, np.ones(len(column))]), self.sketch_size
+            )
+
+    def update_labels(self, codes, categories):
+        """Menambah jumlah per kategori dari kode label (kode negatif = label kosong)."""
+        codes = np.asarray(codes)
+        counts = np.bincount(codes[codes >= 0].astype(np.int64), minlength=len(categories))
+        for category, count in zip(categories, counts):
+            if count:
+                self.class_counts[str(category)] = self.class_counts.get(str(category), 0) + int(count)
+
+    def rescale(self, columns, ratio, shift):
+        """Transformasi affine x * ratio + shift (ratio > 0) untuk kolom dengan indeks `columns`."""
+        for i, a, b in zip(columns, ratio, shift):
+            self.mean[i] = self.mean[i] * a + b
+            self.m2[i] *= a * a
+            self.min[i] = self.min[i] * a + b
+            self.max[i] = self.max[i] * a + b
+            values, weights = self.sketches[i]
+            self.sketches[i] = (values * a + b, weights)
+
+    def quantile(self, i, q):
+        """Kuantil perkiraan kolom ke-i (interpolasi linear seperti pandas untuk data kecil)."""
+        values, weights = self.sketches[i]
+        if len(values) == 0:
+            return np.nan
+        if q <= 0:
+            return self.min[i]
+        if q >= 1:
+            return self.max[i]
+        # Posisi peringkat (berbasis 0) tengah setiap centroid; untuk bobot 1 sama dengan indeksnya
+        positions = np.cumsum(weights) - weights / 2 - 0.5
+        return float(np.clip(np.interp(q * (weights.sum() - 1), positions, values), self.min[i], self.max[i]))
+
+    def describe(self):
+        """Tabel seperti `DataFrame.describe().T` dari ringkasan (tanpa membaca data)."""
+        rows = {}
+        for i, column in enumerate(self.columns):
+            n = self.count[i]
+            rows[column] = {
+                'count': float(n),
+                'mean': self.mean[i] if n else np.nan,
+                'std': np.sqrt(self.m2[i] / (n - 1)) if n > 1 else np.nan,
+                'min': self.min[i] if n else np.nan,
+                **{f"{q:.0%}": self.quantile(i, q) for q in QUANTILES},
+                'max': self.max[i] if n else np.nan,
+            }
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def value_counts(self):
+        """Jumlah baris per kategori, terurut menurun seperti `Series.value_counts()`."""
+        return pd.Series(self.class_counts, dtype=np.int64).sort_values(ascending=False)
+
+    def to_dict(self):
+        return {
+            "content_hash": self.content_hash,
+            "sketch_size": self.sketch_size,
+            "columns": {
+                column: {
+                    "count": int(self.count[i]),
+                    "mean": float(self.mean[i]),
+                    "m2": float(self.m2[i]),
+                    "min": float(self.min[i]) if self.count[i] else None,
+                    "max": float(self.max[i]) if self.count[i] else None,
+                    "sketch_values": self.sketches[i][0].tolist(),
+                    "sketch_weights": self.sketches[i][1].tolist(),
+                }
+                for i, column in enumerate(self.columns)
+            },
+            "class_counts": self.class_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(list(data["columns"]), data.get("sketch_size", SKETCH_SIZE))
+        for i, column in enumerate(stats.columns):
+            entry = data["columns"][column]
+            stats.count[i] = entry["count"]
+            stats.mean[i] = entry["mean"]
+            stats.m2[i] = entry["m2"]
+            stats.min[i] = np.inf if entry["min"] is None else entry["min"]
+            stats.max[i] = -np.inf if entry["max"] is None else entry["max"]
+            stats.sketches[i] = (np.asarray(entry["sketch_values"], dtype=np.float64),
+                                 np.asarray(entry["sketch_weights"], dtype=np.float64))
+        stats.class_counts = dict(data["class_counts"])
+        stats.content_hash = data.get("content_hash")
+        return stats
+
+
+def save_stats(stats, store_dir=dataset_store.STORE_DIR):
+    path = os.path.join(dataset_store.current_dir(store_dir), STATS_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(stats.to_dict(), f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def load_stats(meta, store_dir=dataset_store.STORE_DIR):
+    """Statistik tersimpan untuk dataset `meta`; None jika belum ada atau milik versi dataset lain."""
+    path = os.path.join(dataset_store.current_dir(store_dir), STATS_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            stats = DatasetStats.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+    return stats if stats.content_hash == meta["content_hash"] else None
+
+
+def compute_stats(df, meta, chunksize=DEFAULT_CHUNKSIZE):
+    """Menghitung statistik dari DataFrame dataset dalam satu kali jalan per potongan."""
+    stats = DatasetStats(meta["feature_columns"])
+    features = df[meta["feature_columns"]]
+    labels = df[meta["label_column"]].array
+    for start in range(0, len(df), chunksize):
+        stats.update_features(features.iloc[start:start + chunksize].to_numpy(dtype=np.float64))
+        stats.update_labels(labels.codes[start:start + chunksize], labels.categories)
+    stats.content_hash = meta["content_hash"]
+    return stats
+
+
+def dataset_stats(df, meta, store_dir=dataset_store.STORE_DIR):
+    """
+    Statistik dataset dari `stats.json`. Dataset yang disimpan sebelum statistik ada
+    (atau yang ditulis tanpa statistik) dihitung sekali lalu disimpan.
+    """
+    stats = load_stats(meta, store_dir)
+    if stats is None:
+        stats = compute_stats(df, meta)
+        # Hanya disimpan jika data di disk masih versi yang sama dengan `df`
+        if dataset_store.dataset_exists(store_dir) and \
+                dataset_store.load_meta(store_dir)["content_hash"] == meta["content_hash"]:
+            save_stats(stats, store_dir)
+    return stats
@@ -0,0 +1,304 @@
+# core/dataset_store.py
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from core.schema import FEATURE_COLUMNS, LABEL_COLUMN
+
+# Dataset ternormalisasi disimpan sebagai array kolumnar biner + metadata JSON
+STORE_DIR = os.path.join("upload", "dataset")
+# Setiap kolom fitur disimpan di file sendiri; format lama (versi 1) memakai satu array n x 6
+FEATURE_FILE = "feature_{}.npy"
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "meta.json"
+# Hash per baris (nilai asli + label), terurut; dipakai untuk deduplikasi saat data ditambahkan
+KEYS_FILE = "row_keys.npy"
+KEY_DECIMALS = 3
+STORE_VERSION = 2
+# File kolom dialokasikan lebih panjang dari jumlah barisnya (sisa kapasitas tidak terlihat oleh
+# pembaca) agar data tambahan bisa ditulis ke ekor file tanpa menyalin baris lama
+MIN_CAPACITY = 1024
+# Setiap penulisan dataset lengkap membuat folder generasi baru; CURRENT berisi nama generasi aktif
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+
+def current_dir(store_dir=STORE_DIR):
+    """
+    Folder generasi dataset yang aktif. Penyimpanan lama tanpa CURRENT (file langsung
+    di `store_dir`) dan folder generasi itu sendiri dikembalikan apa adanya.
+    """
+    try:
+        with open(os.path.join(store_dir, CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return store_dir
+    return os.path.join(store_dir, name)
+
+
+def _path(store_dir, name):
+    return os.path.join(current_dir(store_dir), name)
+
+
+@contextlib.contextmanager
+def generation(store_dir=STORE_DIR):
+    """
+    Menyediakan folder generasi baru untuk ditulisi. Jika blok selesai tanpa error,
+    CURRENT dialihkan ke generasi ini secara atomik; jika gagal, generasi dibuang dan
+    dataset lama tetap utuh. Pembaca tidak pernah melihat dataset setengah jadi.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    gen_dir = tempfile.mkdtemp(prefix=GENERATION_PREFIX, dir=store_dir)
+    try:
+        yield gen_dir
+    except BaseException:
+        shutil.rmtree(gen_dir, ignore_errors=True)
+        raise
+    _switch_generation(store_dir, gen_dir)
+
+
+def _switch_generation(store_dir, gen_dir):
+    name = os.path.basename(gen_dir)
+    tmp_path = os.path.join(store_dir, CURRENT_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp_path, os.path.join(store_dir, CURRENT_FILE))
+
+    # Generasi lama dan file format lama dibersihkan; kegagalan (misalnya file masih
+    # di-memmap di Windows) diabaikan dan dicoba lagi pada penulisan berikutnya
+    for entry in os.listdir(store_dir):
+        path = os.path.join(store_dir, entry)
+        if entry.startswith(GENERATION_PREFIX) and entry != name:
+            shutil.rmtree(path, ignore_errors=True)
+        elif entry != CURRENT_FILE and os.path.isfile(path):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+def _save_npy(path, array):
+    # Ditulis ke file sementara lalu di-rename agar pembaca tidak melihat file setengah jadi
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def feature_file(index):
+    return FEATURE_FILE.format(index)
+
+
+def capacity_for(n_rows):
+    """Kapasitas file kolom untuk `n_rows` baris: pangkat dua berikutnya (minimal MIN_CAPACITY)."""
+    return max(MIN_CAPACITY, 1 << max(int(n_rows) - 1, 0).bit_length())
+
+
+def dataset_exists(store_dir=STORE_DIR):
+    return os.path.exists(_path(store_dir, META_FILE))
+
+
+def content_hash(features, codes, categories):
+    """Hash isi dataset; dipakai sebagai kunci cache oleh modul lain."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(features).tobytes())
+    digest.update(np.ascontiguousarray(codes).tobytes())
+    digest.update(json.dumps(list(categories)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_dataset(df_normalized, scaler=None, store_dir=STORE_DIR):
+    """
+    Menyimpan dataset ternormalisasi: satu kolom float32 per fitur dan label sebagai kode kategori.
+    Rentang min/max scaler ikut disimpan agar scaler bisa dibangun ulang saat data dimuat.
+    Dataset ditulis ke generasi baru lalu dialihkan sekaligus (lihat `generation`).
+    """
+    features = np.ascontiguousarray(df_normalized[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+    labels = pd.Categorical(df_normalized[LABEL_COLUMN])
+    codes = labels.codes.astype(np.int8 if len(labels.categories) < 128 else np.int16)
+    categories = [str(c) for c in labels.categories]
+
+    meta = build_meta(len(features), categories, content_hash(features, codes, categories), scaler)
+
+    # Hash baris tidak ikut ditulis; dibangun ulang dari generasi baru saat dibutuhkan
+    with generation(store_dir) as gen_dir:
+        for index in range(features.shape[1]):
+            save_column(gen_dir, feature_file(index), features[:, index])
+        save_column(gen_dir, LABELS_FILE, codes)
+        write_meta(meta, gen_dir)
+    return meta
+
+
+def build_meta(n_rows, categories, digest, scaler=None):
+    return {
+        "version": STORE_VERSION,
+        "n_rows": int(n_rows),
+        "feature_columns": FEATURE_COLUMNS,
+        "label_column": LABEL_COLUMN,
+        "label_categories": list(categories),
+        "content_hash": digest,
+        "data_min": None if scaler is None else np.asarray(scaler.data_min_).tolist(),
+        "data_max": None if scaler is None else np.asarray(scaler.data_max_).tolist(),
+    }
+
+
+def write_meta(meta, store_dir=STORE_DIR):
+    """Metadata ditulis terakhir: keberadaannya menandakan dataset sudah lengkap."""
+    tmp_meta = _path(store_dir, META_FILE) + ".tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_meta, _path(store_dir, META_FILE))
+
+
+def open_array(store_dir, name, shape, dtype):
+    """
+    Membuat file .npy baru (sementara) yang bisa diisi bertahap lewat memmap.
+    Panggil `commit_array` setelah selesai mengisi untuk memindahkannya ke nama akhir.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    return np.lib.format.open_memmap(_path(store_dir, name) + ".tmp", mode="w+", dtype=dtype, shape=shape)
+
+
+def commit_array(store_dir, name):
+    """Dipanggil setelah memmap dari `open_array` di-flush dan referensinya dilepas."""
+    os.replace(_path(store_dir, name) + ".tmp", _path(store_dir, name))
+
+
+def open_column(store_dir, name, n_rows, dtype):
+    """File kolom baru (lihat `open_array`) dengan kapasitas `capacity_for(n_rows)` baris."""
+    return open_array(store_dir, name, (capacity_for(n_rows),), dtype)
+
+
+def save_column(store_dir, name, values):
+    column = open_column(store_dir, name, len(values), values.dtype)
+    column[:len(values)] = values
+    column.flush()
+    del column
+    commit_array(store_dir, name)
+
+
+def link_column(source_dir, store_dir, name, n_rows):
+    """
+    Memakai ulang file kolom dari generasi `source_dir` di generasi baru `store_dir` lewat
+    hard link, jika kapasitasnya cukup untuk `n_rows` baris. Baris lama tidak pernah ditulis;
+    baris baru masuk ke sisa kapasitas yang berada di luar jumlah baris generasi lama, sehingga
+    isi generasi lama tetap sama. Mengembalikan memmap yang bisa ditulisi, atau None jika
+    kolom harus disalin ke file baru.
+    """
+    source, target = _path(source_dir, name), _path(store_dir, name)
+    try:
+        with open(source, "rb") as f:
+            np.lib.format.read_magic(f)
+            shape = np.lib.format.read_array_header_1_0(f)[0]
+        if shape[0] < n_rows:
+            return None
+        os.link(source, target)
+    except (OSError, ValueError):
+        return None
+    # Hanya generasi sumber dan generasi baru ini yang boleh memegang file: jika generasi lain
+    # (penambahan data yang berjalan bersamaan atau generasi lama yang belum terhapus) juga
+    # memegangnya, ekornya bisa ditulisi dua kali sehingga kolom disalin saja
+    if os.stat(target).st_nlink != 2:
+        os.remove(target)
+        return None
+    return np.load(target, mmap_mode="r+")
+
+
+def row_keys(features, labels):
+    """
+    Hash 64-bit per baris dari nilai fitur asli (dibulatkan KEY_DECIMALS) dan label.
+    Pembulatan membuat baris yang sama tetap cocok walau melewati konversi float32.
+    """
+    frame = pd.DataFrame(np.round(np.asarray(features, dtype=np.float64), KEY_DECIMALS))
+    frame["label"] = np.asarray(labels, dtype=object).astype(str)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+def save_row_keys(keys, store_dir=STORE_DIR):
+    _save_npy(_path(store_dir, KEYS_FILE), np.sort(keys))
+
+
+def load_row_keys(store_dir=STORE_DIR, chunksize=100_000):
+    """
+    Hash baris dataset (terurut). Untuk dataset lama yang belum punya file hash,
+    nilai asli direkonstruksi dari data ternormalisasi dan rentang scaler.
+    """
+    path = _path(store_dir, KEYS_FILE)
+    if os.path.exists(path):
+        return np.load(path)
+
+    df, meta = load_dataset(store_dir)
+    scaler = scaler_from_meta(meta)
+    if scaler is None:
+        raise ValueError("Rentang data asli tidak tersimpan; data tidak bisa ditambahkan.")
+    features = df[FEATURE_COLUMNS].to_numpy()
+    labels = df[LABEL_COLUMN].astype(object).to_numpy()
+    keys = np.concatenate([
+        row_keys(
+            (features[start:start + chunksize] - scaler.min_) / scaler.scale_,
+            labels[start:start + chunksize]
+        )
+        for start in range(0, len(df), chunksize)
+    ] or [np.empty(0, dtype=np.uint64)])
+    save_row_keys(keys, store_dir)
+    return np.sort(keys)
+
+
+def load_meta(store_dir=STORE_DIR):
+    with open(_path(store_dir, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_dataset(store_dir=STORE_DIR):
+    """
+    Memuat dataset secara memory-mapped (read-only). Halaman memori dibagi oleh
+    semua sesi/proses yang membuka file yang sama, tanpa parsing ulang.
+    Mengembalikan (DataFrame, metadata).
+    """
+    # Generasi ditentukan sekali agar metadata dan array berasal dari versi yang sama
+    gen_dir = current_dir(store_dir)
+    meta = load_meta(gen_dir)
+    n_rows = meta["n_rows"]
+    if meta.get("version", 1) < 2:
+        features = np.load(_path(gen_dir, FEATURES_FILE), mmap_mode="r")
+        df = pd.DataFrame(features, columns=meta["feature_columns"], copy=False)
+    else:
+        # Array dipotong pada jumlah baris generasi ini; sisa kapasitas file diabaikan
+        df = pd.DataFrame({
+            column: np.load(_path(gen_dir, feature_file(index)), mmap_mode="r")[:n_rows]
+            for index, column in enumerate(meta["feature_columns"])
+        }, copy=False)
+    codes = np.load(_path(gen_dir, LABELS_FILE), mmap_mode="r")[:n_rows]
+
+    df[meta["label_column"]] = pd.Categorical.from_codes(codes, categories=meta["label_categories"])
+    return df, meta
+
+
+def delete_dataset(store_dir=STORE_DIR):
+    if os.path.exists(store_dir):
+        shutil.rmtree(store_dir)
+
+
+def scaler_from_meta(meta):
+    """Membangun ulang MinMaxScaler dari rentang data asli yang tersimpan (None jika tidak ada)."""
+    if meta.get("data_min") is None or meta.get("data_max") is None:
+        return None
+    from sklearn.preprocessing import MinMaxScaler
+
+    bounds = pd.DataFrame([meta["data_min"], meta["data_max"]], columns=meta["feature_columns"])
+    return MinMaxScaler().fit(bounds)
+
+
+def migrate_csv(csv_path, scaler=None, store_dir=STORE_DIR):
+    """
+    Menyalin dataset lama (CSV ternormalisasi) ke penyimpanan kolumnar.
+    File CSV dibiarkan apa adanya (file ini ikut dilacak di repositori); migrasi hanya
+    dijalankan selama penyimpanan kolumnar belum ada.
+    """
+    df = pd.read_csv(csv_path)
+    return save_dataset(df, scaler, store_dir)
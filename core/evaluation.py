@@ -0,0 +1,113 @@
+# core/evaluation.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+from sklearn.model_selection import RepeatedStratifiedKFold
+
+from core.training import train_model
+
+def evaluate_model(model, feature_names, class_names, y_test, y_pred):
+    """
+    Menghitung semua metrik evaluasi sekali saat model dilatih.
+    Hasilnya disimpan bersama model agar halaman cukup menampilkannya.
+    """
+    labels = np.arange(len(class_names))
+    order = np.argsort(model.feature_importances_)[::-1]
+    return {
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'n_test': int(len(y_test)),
+        'report': classification_report(
+            y_test, y_pred, target_names=class_names, labels=labels, output_dict=True, zero_division=0
+        ),
+        'confusion_matrix': confusion_matrix(y_test, y_pred, labels=labels),
+        'feature_importance': {
+            'Fitur': [feature_names[i] for i in order],
+            'Kepentingan': model.feature_importances_[order].tolist(),
+        },
+    }
+
+
+# Matriks fitur bersama per proses worker (view read-only ke shared memory)
+_worker_data = {}
+
+
+def _init_cv_worker(shm_name, shape, dtype, y, params, n_classes):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    X = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    X.flags.writeable = False
+    # Referensi ke objek shm disimpan agar buffer tidak ditutup selama worker hidup
+    _worker_data.update(shm=shm, X=X, y=y, params=params, n_classes=n_classes)
+
+
+def _fold_task(fold):
+    train_idx, test_idx = fold
+    X, y = _worker_data['X'], _worker_data['y']
+    labels = np.arange(_worker_data['n_classes'])
+    model, train_time = train_model(_worker_data['params'], X[train_idx], y[train_idx])
+    y_pred = model.predict(X[test_idx])
+    y_true = y[test_idx]
+    return {
+        'accuracy': float((y_pred == y_true).mean()),
+        'f1': f1_score(y_true, y_pred, labels=labels, average=None, zero_division=0),
+        'confusion_matrix': confusion_matrix(y_true, y_pred, labels=labels),
+        'train_time': train_time,
+    }
+
+
+def cross_validate(params, X, y, n_splits=5, n_repeats=1, n_jobs=None, random_state=42):
+    """
+    Stratified k-fold (bisa diulang) dengan fold yang dilatih paralel.
+
+    Matriks fitur disalin sekali ke shared memory; setiap worker hanya
+    memetakan buffer yang sama secara read-only dan menerima indeks fold.
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+    y = np.asarray(y)
+    n_classes = int(y.max()) + 1
+    splitter = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    folds = list(splitter.split(X, y))
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        _worker_data.update(X=X, y=y, params=params, n_classes=n_classes)
+        try:
+            fold_results = [_fold_task(fold) for fold in folds]
+        finally:
+            # Salinan X tidak boleh tertahan di variabel modul setelah pemanggilan selesai
+            _worker_data.clear()
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+            with ProcessPoolExecutor(
+                max_workers=min(n_jobs, len(folds)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_cv_worker,
+                initargs=(shm.name, X.shape, X.dtype.str, y, params, n_classes),
+            ) as executor:
+                fold_results = list(executor.map(_fold_task, folds))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return summarize_folds(fold_results)
+
+
+def summarize_folds(fold_results):
+    """Rata-rata dan simpangan baku metrik antar fold, serta confusion matrix total."""
+    accuracies = np.array([r['accuracy'] for r in fold_results])
+    f1 = np.vstack([r['f1'] for r in fold_results])
+    return {
+        'n_folds': len(fold_results),
+        'accuracies': accuracies,
+        'accuracy_mean': float(accuracies.mean()),
+        'accuracy_std': float(accuracies.std(ddof=1)) if len(accuracies) > 1 else 0.0,
+        'f1_mean': f1.mean(axis=0),
+        'f1_std': f1.std(axis=0, ddof=1) if len(f1) > 1 else np.zeros(f1.shape[1]),
+        'confusion_matrix': sum(r['confusion_matrix'] for r in fold_results),
+        'train_time_total': float(sum(r['train_time'] for r in fold_results)),
+    }
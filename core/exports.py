@@ -0,0 +1,94 @@
+# core/exports.py
+"""
+Ekspor dataset ternormalisasi ke CSV terkompresi gzip dan Parquet.
+
+File ekspor hanya dibuat saat diminta (bukan di setiap rerun halaman) dan
+disimpan di folder `exports` di dalam penyimpanan dataset dengan nama berdasarkan
+hash isi dataset, sehingga permintaan berikutnya untuk data yang sama langsung
+memakai file yang sudah ada. Data ditulis per potongan baris agar memori tetap
+kecil untuk dataset besar; ekspor untuk hash lama dihapus saat ekspor baru dibuat.
+"""
+import glob
+import gzip
+import os
+import tempfile
+import threading
+
+from core.dataset_store import STORE_DIR
+
+EXPORT_SUBDIR = "exports"
+CHUNK_ROWS = 100_000
+HASH_LENGTH = 16
+
+# Format ekspor: ekstensi file -> MIME type
+FORMATS = {
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_lock = threading.Lock()
+
+
+def export_dir(store_dir=STORE_DIR):
+    return os.path.join(store_dir, EXPORT_SUBDIR)
+
+
+def export_path(content_hash, fmt, store_dir=STORE_DIR):
+    return os.path.join(export_dir(store_dir), f"{content_hash[:HASH_LENGTH]}.{fmt}")
+
+
+def _write_csv_gz(df, path, chunk_rows):
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        for start in range(0, len(df), chunk_rows):
+            df.iloc[start:start + chunk_rows].to_csv(f, index=False, header=(start == 0))
+
+
+def _write_parquet(df, path, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Satu row group per potongan: pembaca bisa memuat file sebagian tanpa membaca semuanya
+    with pq.ParquetWriter(path, pa.Schema.from_pandas(df, preserve_index=False), compression="zstd") as writer:
+        for start in range(0, len(df), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False))
+
+
+WRITERS = {"csv.gz": _write_csv_gz, "parquet": _write_parquet}
+
+
+def _prune(content_hash, store_dir):
+    """Menghapus file ekspor milik versi dataset sebelumnya."""
+    keep = content_hash[:HASH_LENGTH]
+    for path in glob.glob(os.path.join(export_dir(store_dir), "*.*")):
+        if not os.path.basename(path).startswith(keep):
+            os.remove(path)
+
+
+def build_export(df, content_hash, fmt, store_dir=STORE_DIR, chunk_rows=CHUNK_ROWS):
+    """
+    Mengembalikan path file ekspor untuk dataset dengan hash `content_hash`.
+    File dibuat (per potongan) hanya jika belum ada untuk hash tersebut.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+    path = export_path(content_hash, fmt, store_dir)
+    with _lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(export_dir(store_dir), exist_ok=True)
+        _prune(content_hash, store_dir)
+        fd, tmp_path = tempfile.mkstemp(prefix="ekspor_", suffix=".tmp", dir=export_dir(store_dir))
+        os.close(fd)
+        try:
+            WRITERS[fmt](df, tmp_path, chunk_rows)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return path
+
+
+def read_export(df, content_hash, fmt, store_dir=STORE_DIR):
+    """Isi file ekspor dalam bytes (dibuat terlebih dahulu jika belum ada)."""
+    with open(build_export(df, content_hash, fmt, store_dir), "rb") as f:
+        return f.read()
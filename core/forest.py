@@ -0,0 +1,202 @@
+# core/forest.py
+"""
+Ensemble pohon keputusan: bagging dan/atau random subspace dari pohon C4.5 (atau CART).
+
+Setiap pohon dilatih pada sampel bootstrap (sebagai bobot sampel, tanpa menyalin
+baris) dan/atau pada subset fitur acak, secara paralel di beberapa proses dengan
+matriks fitur yang dibagi lewat shared memory. Pohon yang dilatih pada subset
+fitur dipetakan kembali ke indeks fitur global sehingga semua pohon bisa
+dijalankan bersama oleh `CompiledForest` dalam satu lintasan tervektorisasi.
+
+Atribut `tree_` menunjuk ke pohon perwakilan (akurasi out-of-bag tertinggi, atau
+akurasi data latih jika tanpa bootstrap), sehingga tampilan aturan, gambar pohon,
+dan indeks aturan untuk satu pohon tetap bisa dipakai; `feature_importances_`
+adalah rata-rata kepentingan semua pohon.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+from core.c45 import TreeStructure
+
+DEFAULT_N_ESTIMATORS = 25
+
+
+def _global_structure(tree_, features, tree_classes, n_classes, n_features):
+    """Salinan struktur pohon dengan indeks fitur global dan kolom nilai untuk semua kelas."""
+    feature = np.asarray(tree_.feature, dtype=np.intp)
+    local_value = np.asarray(tree_.value)[:, 0, :]
+    totals = local_value.sum(axis=1, keepdims=True)
+    value = np.zeros((len(feature), 1, n_classes))
+    value[:, 0, tree_classes] = local_value / np.where(totals > 0, totals, 1)
+    missing_left = getattr(tree_, 'missing_go_to_left', None)
+    return TreeStructure(
+        feature=np.where(feature >= 0, features[np.maximum(feature, 0)], feature),
+        threshold=np.asarray(tree_.threshold, dtype=np.float64).copy(),
+        children_left=np.asarray(tree_.children_left, dtype=np.intp).copy(),
+        children_right=np.asarray(tree_.children_right, dtype=np.intp).copy(),
+        value=value,
+        n_node_samples=np.asarray(tree_.n_node_samples, dtype=np.intp).copy(),
+        weighted_n_node_samples=np.asarray(tree_.weighted_n_node_samples, dtype=np.float64).copy(),
+        impurity=np.asarray(tree_.impurity, dtype=np.float64).copy(),
+        missing_go_to_left=np.zeros(len(feature), dtype=bool) if missing_left is None
+        else np.asarray(missing_left, dtype=bool).copy(),
+        n_features=n_features,
+    )
+
+
+# Data latih per proses worker (view read-only ke shared memory)
+_worker_data = {}
+
+
+def _init_forest_worker(shm_name, shape, dtype, y, tree_params, n_classes, bootstrap, n_subspace):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    X = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    X.flags.writeable = False
+    # Referensi ke objek shm disimpan agar buffer tidak ditutup selama worker hidup
+    _worker_data.update(shm=shm, X=X, y=y, tree_params=tree_params, n_classes=n_classes,
+                        bootstrap=bootstrap, n_subspace=n_subspace)
+
+
+def _tree_task(seed):
+    """
+    Melatih satu pohon dari seed-nya. Mengembalikan (struktur global, kepentingan fitur, skor),
+    dengan skor = akurasi out-of-bag, atau akurasi data latih jika tanpa bootstrap.
+    """
+    from core.training import build_model
+
+    X, y = _worker_data['X'], _worker_data['y']
+    n, n_features = X.shape
+    rng = np.random.default_rng(seed)
+    features = np.arange(n_features)
+    if _worker_data['n_subspace'] < n_features:
+        features = np.sort(rng.choice(n_features, _worker_data['n_subspace'], replace=False))
+    if _worker_data['bootstrap']:
+        weights = np.bincount(rng.integers(0, n, n), minlength=n).astype(np.float64)
+    else:
+        weights = np.ones(n)
+
+    rows = np.flatnonzero(weights)
+    model = build_model(**_worker_data['tree_params'])
+    model.fit(X[np.ix_(rows, features)], y[rows], sample_weight=weights[rows])
+    structure = _global_structure(model.tree_, features, np.asarray(model.classes_), _worker_data['n_classes'],
+                                  n_features)
+
+    importances = np.zeros(n_features)
+    importances[features] = model.feature_importances_
+    from core.tree_engine import CompiledTree
+    scored = np.flatnonzero(weights == 0)
+    if len(scored) == 0:
+        scored = rows
+    leaf_class = structure.value[:, 0, :].argmax(axis=1)
+    compiled = CompiledTree(structure.feature, structure.threshold, structure.children_left,
+                            structure.children_right, leaf_class, structure.missing_go_to_left)
+    score = float((compiled.predict(X[scored]) == y[scored]).mean())
+    return structure, importances, score
+
+
+class C45Forest(ClassifierMixin, BaseEstimator):
+    """
+    Hutan pohon keputusan dengan bagging (`bootstrap`) dan/atau random subspace
+    (`max_features` < 1: fraksi fitur per pohon). Parameter pohon sama dengan
+    `core.training.build_model`. Prediksi memakai rata-rata probabilitas daun
+    (soft voting) dari semua pohon.
+    """
+
+    def __init__(self, n_estimators=DEFAULT_N_ESTIMATORS, criterion="gain_ratio", max_depth=None, min_samples_leaf=None,
+                 pruning=True, confidence_factor=0.25, bootstrap=True, max_features=1.0, n_jobs=None,
+                 random_state=42):
+        self.n_estimators = n_estimators
+        self.criterion = criterion
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.pruning = pruning
+        self.confidence_factor = confidence_factor
+        self.bootstrap = bootstrap
+        self.max_features = max_features
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        if hasattr(X, 'columns'):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        self.classes_, y_enc = np.unique(np.asarray(y), return_inverse=True)
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = X.shape[1]
+        self.n_outputs_ = 1
+
+        tree_params = {
+            'criterion': self.criterion, 'max_depth': self.max_depth, 'min_samples_leaf': self.min_samples_leaf,
+            'pruning': self.pruning, 'confidence_factor': self.confidence_factor,
+        }
+        n_subspace = max(1, int(round(self.max_features * self.n_features_in_)))
+        seeds = np.random.SeedSequence(self.random_state).generate_state(self.n_estimators).tolist()
+        initargs = (X, y_enc, tree_params, self.n_classes_, self.bootstrap, n_subspace)
+
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        # Di dalam proses worker lain (validasi silang, sweep) pohon dilatih berurutan
+        if n_jobs == 1 or self.n_estimators == 1 or multiprocessing.parent_process() is not None:
+            _worker_data.update(zip(('X', 'y', 'tree_params', 'n_classes', 'bootstrap', 'n_subspace'), initargs))
+            results = [_tree_task(seed) for seed in seeds]
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+            try:
+                np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+                with ProcessPoolExecutor(
+                    max_workers=min(n_jobs, self.n_estimators),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_forest_worker,
+                    initargs=(shm.name, X.shape, X.dtype.str, *initargs[1:]),
+                ) as executor:
+                    results = list(executor.map(_tree_task, seeds))
+            finally:
+                shm.close()
+                shm.unlink()
+        _worker_data.clear()
+
+        self.__dict__.pop('_engine', None)
+        self.trees_ = [structure for structure, _, _ in results]
+        self.tree_scores_ = [score for _, _, score in results]
+        importances = np.mean([imp for _, imp, _ in results], axis=0)
+        self.feature_importances_ = importances / importances.sum() if importances.sum() > 0 else importances
+        self.representative_ = int(np.argmax(self.tree_scores_))
+        return self
+
+    @property
+    def tree_(self):
+        """Pohon perwakilan untuk tampilan aturan dan gambar pohon."""
+        return self.trees_[self.representative_]
+
+    def _compiled(self):
+        # Mesin inferensi dibuat sekali per model dan tidak ikut disimpan ke file
+        engine = self.__dict__.get('_engine')
+        if engine is None:
+            from core.tree_engine import CompiledForest
+            engine = self._engine = CompiledForest.from_model(self)
+        return engine
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop('_engine', None)
+        return state
+
+    def predict_proba(self, X):
+        return self._compiled().predict_proba(X)
+
+    def predict(self, X):
+        return self._compiled().predict(X)
+
+    def apply(self, X):
+        """Id daun pohon perwakilan untuk setiap baris."""
+        return self._compiled().apply(X)
+
+    def get_depth(self):
+        return max(tree.max_depth for tree in self.trees_)
+
+    def get_n_leaves(self):
+        return sum(tree.n_leaves for tree in self.trees_)
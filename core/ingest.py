@@ -0,0 +1,352 @@
+# core/ingest.py
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from core import dataset_store
+from core.dataset_stats import DatasetStats, load_stats, save_stats
+from core.schema import FEATURE_COLUMNS, LABEL_COLUMN
+
+REQUIRED_COLUMNS = FEATURE_COLUMNS + [LABEL_COLUMN]
+# Tipe data sempit per kolom: fitur float32, label kategori
+INGEST_DTYPES = {**{col: np.float32 for col in FEATURE_COLUMNS}, LABEL_COLUMN: 'category'}
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class MissingColumnsError(ValueError):
+    """File CSV tidak memiliki semua kolom yang dibutuhkan."""
+
+    def __init__(self, missing):
+        self.missing = missing
+        super().__init__(f"Kolom yang hilang dari file: {', '.join(missing)}")
+
+
+def read_header(source):
+    """Membaca nama kolom saja, lalu mengembalikan posisi baca ke awal file."""
+    columns = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return columns
+
+
+def iter_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    """Membaca CSV per potongan dengan tipe data sempit dan hanya kolom yang dibutuhkan."""
+    columns = read_header(source)
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise MissingColumnsError(missing)
+    with pd.read_csv(source, usecols=REQUIRED_COLUMNS, dtype=INGEST_DTYPES, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def ingest_csv(source, store_dir=dataset_store.STORE_DIR, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Ingest CSV secara streaming ke penyimpanan dataset kolumnar.
+
+    Tahap 1: setiap potongan di-parse sekali, scaler diperbarui dengan `partial_fit`,
+    dan nilai mentah ditulis ke file sementara di disk.
+    Tahap 2: file sementara dibaca per potongan lewat memmap, dinormalisasi, lalu
+    ditulis langsung ke file .npy di generasi dataset baru yang baru diaktifkan setelah
+    semua file lengkap. Statistik ringkas dataset dihitung pada potongan yang sama.
+    Memori puncak ditentukan oleh `chunksize`.
+    Mengembalikan (metadata, scaler).
+    """
+    scaler = MinMaxScaler()
+    categories = []
+    category_index = {}
+    n_rows = 0
+
+    # File sementara diletakkan di samping dataset (disk yang sama, bukan RAM)
+    tmp_dir = os.path.dirname(os.path.abspath(store_dir))
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, raw_path = tempfile.mkstemp(prefix="ingest_", suffix=".raw", dir=tmp_dir)
+    codes_path = raw_path + ".codes"
+    keys_path = raw_path + ".keys"
+    try:
+        with os.fdopen(fd, "wb") as raw_file, open(codes_path, "wb") as codes_file, open(keys_path, "wb") as keys_file:
+            for chunk in iter_chunks(source, chunksize):
+                features = chunk[FEATURE_COLUMNS]
+                # Nilai sudah float32 sejak di-parse; upcast hanya agar atribut scaler bertipe float64
+                # seperti scaler yang dibangun ulang dari metadata
+                scaler.partial_fit(features.astype(np.float64))
+
+                # Kode kategori per potongan dipetakan ke daftar kategori global
+                labels = chunk[LABEL_COLUMN].cat
+                for category in labels.categories:
+                    if category not in category_index:
+                        category_index[category] = len(categories)
+                        categories.append(category)
+                lookup = np.array([category_index[c] for c in labels.categories] + [-1], dtype=np.int16)
+                codes = lookup[labels.codes]
+
+                raw_file.write(np.ascontiguousarray(features.to_numpy(dtype=np.float32)).tobytes())
+                codes_file.write(codes.astype(np.int16).tobytes())
+                keys_file.write(dataset_store.row_keys(features, chunk[LABEL_COLUMN]).tobytes())
+                n_rows += len(chunk)
+                if progress is not None:
+                    progress(n_rows)
+
+        if n_rows == 0:
+            raise ValueError("File CSV tidak berisi data.")
+
+        # Dataset lama tetap utuh dan terbaca sampai generasi baru selesai ditulis
+        with dataset_store.generation(store_dir) as gen_dir:
+            meta = _write_normalized(raw_path, codes_path, keys_path, n_rows, categories, scaler, gen_dir, chunksize)
+    finally:
+        for path in (raw_path, codes_path, keys_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return meta, scaler
+
+
+def _write_normalized(raw_path, codes_path, keys_path, n_rows, categories, scaler, store_dir, chunksize):
+    """Tahap 2: normalisasi per potongan dari file mentah ke folder generasi `store_dir`."""
+    n_features = len(FEATURE_COLUMNS)
+    raw = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(n_rows, n_features))
+    raw_codes = np.memmap(codes_path, dtype=np.int16, mode="r", shape=(n_rows,))
+
+    # Kategori diurutkan seperti LabelEncoder/pd.Categorical
+    sorted_categories = sorted(str(c) for c in categories)
+    remap = np.array([sorted_categories.index(str(c)) for c in categories] + [-1], dtype=np.int16)
+    code_dtype = np.int8 if len(sorted_categories) < 128 else np.int16
+
+    digest = hashlib.sha256()
+    stats = DatasetStats(FEATURE_COLUMNS)
+    columns = [dataset_store.open_column(store_dir, dataset_store.feature_file(i), n_rows, np.float32)
+               for i in range(n_features)]
+    for start in range(0, n_rows, chunksize):
+        block = np.asarray(raw[start:start + chunksize], dtype=np.float64)
+        block *= scaler.scale_
+        block += scaler.min_
+        block = block.astype(np.float32)
+        for i, column in enumerate(columns):
+            column[start:start + len(block)] = block[:, i]
+        digest.update(block.tobytes())
+        stats.update_features(block)
+    for column in columns:
+        column.flush()
+    del columns
+    for i in range(n_features):
+        dataset_store.commit_array(store_dir, dataset_store.feature_file(i))
+
+    labels = dataset_store.open_column(store_dir, dataset_store.LABELS_FILE, n_rows, code_dtype)
+    for start in range(0, n_rows, chunksize):
+        stop = min(start + chunksize, n_rows)
+        labels[start:stop] = remap[raw_codes[start:stop]]
+        digest.update(np.ascontiguousarray(labels[start:stop]).tobytes())
+        stats.update_labels(labels[start:stop], sorted_categories)
+    labels.flush()
+    del labels
+    dataset_store.commit_array(store_dir, dataset_store.LABELS_FILE)
+    del raw, raw_codes
+    dataset_store.save_row_keys(np.fromfile(keys_path, dtype=np.uint64), store_dir)
+
+    digest.update(json.dumps(sorted_categories).encode("utf-8"))
+    meta = dataset_store.build_meta(n_rows, sorted_categories, digest.hexdigest(), scaler)
+    stats.content_hash = meta["content_hash"]
+    save_stats(stats, store_dir)
+    dataset_store.write_meta(meta, store_dir)
+    return meta
+
+
+def append_csv(source, store_dir=dataset_store.STORE_DIR, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Menambahkan data baru ke dataset yang sudah ada tanpa memproses ulang riwayatnya.
+
+    Baris dengan nilai kosong dibuang, dan baris yang sudah ada (di dataset maupun
+    duplikat di dalam file baru) dilewati berdasarkan hash baris. Rentang scaler
+    diperbarui dari data baru; kolom lama hanya diskalakan ulang bila rentangnya
+    benar-benar berubah. Hasilnya ditulis ke generasi dataset baru (kolom yang tidak berubah
+    dipakai ulang, lihat `_append_rows`), sehingga kegagalan di tengah jalan tidak merusak
+    dataset yang ada.
+    Statistik dataset diperbarui tanpa memindai baris lama.
+    Mengembalikan (metadata, scaler, ringkasan).
+    """
+    # Generasi sumber ditentukan sekali; semua pembacaan data lama memakai folder ini
+    source_dir = dataset_store.current_dir(store_dir)
+    meta = dataset_store.load_meta(source_dir)
+    old_scaler = dataset_store.scaler_from_meta(meta)
+    if old_scaler is None:
+        raise ValueError("Rentang data asli tidak tersimpan; unggah ulang dataset lengkap.")
+    existing_keys = dataset_store.load_row_keys(source_dir)
+
+    summary = {'read': 0, 'invalid': 0, 'duplicates': 0, 'added': 0, 'rescaled_columns': []}
+    categories = list(meta["label_categories"])
+    category_index = {c: i for i, c in enumerate(categories)}
+    batch_min = np.full(len(FEATURE_COLUMNS), np.inf)
+    batch_max = np.full(len(FEATURE_COLUMNS), -np.inf)
+    n_candidates = 0
+
+    tmp_dir = os.path.dirname(os.path.abspath(store_dir))
+    fd, raw_path = tempfile.mkstemp(prefix="append_", suffix=".raw", dir=tmp_dir)
+    codes_path = raw_path + ".codes"
+    keys_path = raw_path + ".keys"
+    try:
+        with os.fdopen(fd, "wb") as raw_file, open(codes_path, "wb") as codes_file, open(keys_path, "wb") as keys_file:
+            for chunk in iter_chunks(source, chunksize):
+                summary['read'] += len(chunk)
+                if progress is not None:
+                    progress(summary['read'])
+                valid = chunk[REQUIRED_COLUMNS].notna().all(axis=1).to_numpy()
+                summary['invalid'] += int((~valid).sum())
+                chunk = chunk[valid]
+
+                features = chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+                labels = chunk[LABEL_COLUMN].astype(str).to_numpy()
+                keys = dataset_store.row_keys(features, labels)
+                is_new = ~np.isin(keys, existing_keys)
+                summary['duplicates'] += int((~is_new).sum())
+                features, labels, keys = features[is_new], labels[is_new], keys[is_new]
+                if len(features) == 0:
+                    continue
+
+                for category in np.unique(labels):
+                    if category not in category_index:
+                        category_index[category] = len(categories)
+                        categories.append(category)
+                codes = np.array([category_index[c] for c in labels], dtype=np.int16)
+
+                np.minimum(batch_min, features.min(axis=0), out=batch_min)
+                np.maximum(batch_max, features.max(axis=0), out=batch_max)
+                raw_file.write(np.ascontiguousarray(features).tobytes())
+                codes_file.write(codes.tobytes())
+                keys_file.write(keys.tobytes())
+                n_candidates += len(features)
+
+        # Duplikat di dalam file baru: hanya kemunculan pertama yang disimpan
+        candidate_keys = np.fromfile(keys_path, dtype=np.uint64)
+        _, first = np.unique(candidate_keys, return_index=True)
+        keep = np.sort(first)
+        summary['duplicates'] += n_candidates - len(keep)
+        summary['added'] = len(keep)
+        if len(keep) == 0:
+            return meta, old_scaler, summary
+
+        new_meta = {
+            **meta,
+            "data_min": np.minimum(old_scaler.data_min_, batch_min).tolist(),
+            "data_max": np.maximum(old_scaler.data_max_, batch_max).tolist(),
+        }
+        scaler = dataset_store.scaler_from_meta(new_meta)
+        changed = np.flatnonzero(
+            (scaler.data_min_ != old_scaler.data_min_) | (scaler.data_max_ != old_scaler.data_max_)
+        )
+        summary['rescaled_columns'] = [FEATURE_COLUMNS[i] for i in changed]
+
+        with dataset_store.generation(store_dir) as gen_dir:
+            meta = _append_rows(
+                raw_path, codes_path, n_candidates, keep, candidate_keys[keep], categories, meta,
+                old_scaler, scaler, changed, source_dir, gen_dir, chunksize
+            )
+            dataset_store.save_row_keys(np.concatenate([existing_keys, candidate_keys[keep]]), gen_dir)
+            dataset_store.write_meta(meta, gen_dir)
+    finally:
+        for path in (raw_path, codes_path, keys_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return meta, scaler, summary
+
+
+def _append_rows(raw_path, codes_path, n_candidates, keep, new_keys, categories, meta, old_scaler, scaler,
+                 changed, source_dir, gen_dir, chunksize):
+    """
+    Menyusun generasi baru `gen_dir` dari generasi `source_dir` ditambah baris baru.
+    Kolom yang rentangnya tidak berubah dipakai ulang (hard link) dan hanya baris barunya
+    yang ditulis; kolom yang rentangnya berubah, dataset format lama, dan kolom tanpa sisa
+    kapasitas disalin ke file baru (diskalakan ulang bila perlu).
+    """
+    n_old, n_new = meta["n_rows"], len(keep)
+    n_rows = n_old + n_new
+    # Statistik yang hilang/kedaluwarsa tidak diperbarui; akan dihitung ulang saat dibutuhkan
+    stats = load_stats(meta, source_dir)
+    n_features = len(FEATURE_COLUMNS)
+    raw = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(n_candidates, n_features))
+    raw_codes = np.memmap(codes_path, dtype=np.int16, mode="r", shape=(n_candidates,))
+    legacy = meta.get("version", 1) < 2
+    if legacy:
+        old_features = np.load(os.path.join(source_dir, dataset_store.FEATURES_FILE), mmap_mode="r")
+
+    rescale = {}
+    if len(changed):
+        # x_baru = x_lama * a + b, diturunkan dari transform x * scale_ + min_ scaler lama dan baru
+        ratio = scaler.scale_[changed] / old_scaler.scale_[changed]
+        shift = scaler.min_[changed] - old_scaler.min_[changed] * ratio
+        rescale = dict(zip(changed.tolist(), zip(ratio, shift)))
+        if stats is not None:
+            stats.rescale(changed, ratio, shift)
+    columns, copied = [], []
+    for i in range(n_features):
+        name = dataset_store.feature_file(i)
+        column = None if legacy or i in rescale else dataset_store.link_column(source_dir, gen_dir, name, n_rows)
+        if column is None:
+            column = dataset_store.open_column(gen_dir, name, n_rows, np.float32)
+            old_column = old_features[:, i] if legacy else np.load(os.path.join(source_dir, name), mmap_mode="r")
+            for start in range(0, n_old, chunksize):
+                values = old_column[start:min(start + chunksize, n_old)]
+                if i in rescale:
+                    a, b = rescale[i]
+                    values = values.astype(np.float64) * a + b
+                column[start:start + len(values)] = values
+            del old_column
+            copied.append(name)
+        columns.append(column)
+    if legacy:
+        del old_features
+
+    for start in range(0, n_new, chunksize):
+        rows = keep[start:start + chunksize]
+        block = (raw[rows].astype(np.float64) * scaler.scale_ + scaler.min_).astype(np.float32)
+        for i, column in enumerate(columns):
+            column[n_old + start:n_old + start + len(rows)] = block[:, i]
+        if stats is not None:
+            stats.update_features(block)
+    for column in columns:
+        column.flush()
+    del columns
+    # Kolom yang dipakai ulang sudah berada di nama akhirnya
+    for name in copied:
+        dataset_store.commit_array(gen_dir, name)
+
+    # Kategori baru disisipkan sesuai urutan abjad; kode lama dipetakan ulang bila urutannya bergeser
+    old_categories = meta["label_categories"]
+    sorted_categories = sorted(categories)
+    remap = np.array([sorted_categories.index(c) for c in categories] + [-1], dtype=np.int16)
+    if len(sorted_categories) > 127:
+        raise ValueError("Jumlah kategori label terlalu banyak.")
+    shifted = sorted_categories[:len(old_categories)] != old_categories
+    labels = None if legacy or shifted else dataset_store.link_column(
+        source_dir, gen_dir, dataset_store.LABELS_FILE, n_rows
+    )
+    linked = labels is not None
+    if not linked:
+        old_labels = np.load(os.path.join(source_dir, dataset_store.LABELS_FILE), mmap_mode="r")
+        labels = dataset_store.open_column(gen_dir, dataset_store.LABELS_FILE, n_rows, old_labels.dtype)
+        for start in range(0, n_old, chunksize):
+            stop = min(start + chunksize, n_old)
+            labels[start:stop] = remap[old_labels[start:stop]] if shifted else old_labels[start:stop]
+        del old_labels
+    for start in range(0, n_new, chunksize):
+        rows = keep[start:start + chunksize]
+        labels[n_old + start:n_old + start + len(rows)] = remap[raw_codes[rows]]
+        if stats is not None:
+            stats.update_labels(labels[n_old + start:n_old + start + len(rows)], sorted_categories)
+    labels.flush()
+    del labels, raw, raw_codes
+    if not linked:
+        dataset_store.commit_array(gen_dir, dataset_store.LABELS_FILE)
+
+    # Hash isi dirantai dari hash lama dan baris baru, tanpa membaca ulang seluruh dataset
+    digest = hashlib.sha256(meta["content_hash"].encode("utf-8"))
+    digest.update(np.asarray(new_keys, dtype=np.uint64).tobytes())
+    digest.update(np.asarray(scaler.data_min_).tobytes() + np.asarray(scaler.data_max_).tobytes())
+    digest.update(json.dumps(sorted_categories).encode("utf-8"))
+    new_meta = dataset_store.build_meta(n_rows, sorted_categories, digest.hexdigest(), scaler)
+    if stats is not None:
+        stats.content_hash = new_meta["content_hash"]
+        save_stats(stats, gen_dir)
+    return new_meta
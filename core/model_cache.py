@@ -0,0 +1,155 @@
+# core/model_cache.py
+import hashlib
+import os
+import threading
+
+import joblib
+
+from core import portable
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Menghitung hash SHA-256 isi file secara bertahap (per blok)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_mmap(path):
+    """Memuat file joblib dengan array numpy yang dipetakan (mmap) dari disk."""
+    return joblib.load(path, mmap_mode="r")
+
+
+def load_model_file(path):
+    """Memuat file model sesuai formatnya: file portabel (.npz) tanpa scikit-learn, selain itu joblib."""
+    if path.endswith(portable.EXTENSION):
+        return portable.load_portable(path)
+    return load_mmap(path)
+
+
+class ModelCache:
+    """
+    Cache model tingkat proses yang dibagi oleh semua sesi Streamlit.
+
+    File model hanya di-unpickle ulang jika mtime/ukuran file berubah DAN
+    hash isinya juga berbeda. Objek turunan (misalnya pohon yang dikompilasi)
+    ikut disimpan dan otomatis dibuang ketika model dimuat ulang.
+    """
+
+    def __init__(self, loader=load_model_file):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _stat_key(self, path):
+        st_ = os.stat(path)
+        return (st_.st_mtime_ns, st_.st_size)
+
+    def get(self, path):
+        """Mengembalikan isi file model dari cache, memuat ulang jika file berubah."""
+        path = os.path.abspath(path)
+        with self._lock:
+            stat_key = self._stat_key(path)
+            entry = self._entries.get(path)
+
+            if entry is not None and entry["stat"] == stat_key:
+                self.hits += 1
+                return entry["data"]
+
+            digest = file_digest(path)
+            if entry is not None and entry["digest"] == digest:
+                # File disentuh ulang tetapi isinya sama: tidak perlu unpickle
+                entry["stat"] = stat_key
+                self.hits += 1
+                return entry["data"]
+
+            data = self._loader(path)
+            if entry is not None:
+                self.reloads += 1
+            self.misses += 1
+            self._entries[path] = {
+                "stat": stat_key,
+                "digest": digest,
+                "data": data,
+                "derived": {},
+            }
+            return data
+
+    def digest(self, path):
+        """Hash isi file model yang sedang tersimpan di cache (None jika belum dimuat)."""
+        entry = self._entries.get(os.path.abspath(path))
+        return entry["digest"] if entry is not None else None
+
+    def derived(self, path, key, factory):
+        """
+        Mengambil objek turunan dari model (dibuat sekali per versi file).
+        `factory` dipanggil dengan isi file model jika objek belum ada.
+        """
+        data = self.get(path)
+        with self._lock:
+            entry = self._entries[os.path.abspath(path)]
+            if key not in entry["derived"]:
+                entry["derived"][key] = factory(data)
+            return entry["derived"][key]
+
+    def invalidate(self, path=None):
+        """Menghapus satu entri (atau semua entri) dari cache."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def retain(self, paths, directory):
+        """
+        Menghapus entri file di dalam `directory` yang tidak termasuk `paths`
+        (beserta objek turunannya). Entri di folder lain tidak disentuh.
+        """
+        keep = {os.path.abspath(path) for path in paths}
+        directory = os.path.join(os.path.abspath(directory), "")
+        with self._lock:
+            for path in list(self._entries):
+                if path.startswith(directory) and path not in keep:
+                    del self._entries[path]
+
+    def stats(self):
+        """Ringkasan jumlah hit/miss untuk memantau efektivitas cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# Satu instance untuk seluruh proses (dibagi antar sesi)
+_model_cache = ModelCache()
+
+
+def load_model_data(path):
+    """Memuat dict model/scaler/metadata melalui cache tingkat proses."""
+    return _model_cache.get(path)
+
+
+def get_derived(path, key, factory):
+    return _model_cache.derived(path, key, factory)
+
+
+def cache_stats():
+    return _model_cache.stats()
+
+
+def invalidate_cache(path=None):
+    _model_cache.invalidate(path)
+
+
+def retain_cache(paths, directory):
+    _model_cache.retain(paths, directory)
@@ -0,0 +1,270 @@
+# core/model_registry.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import joblib
+
+from core import portable
+from core.model_cache import retain_cache
+
+# Setiap versi model disimpan sebagai file tersendiri yang tidak pernah ditimpa.
+# manifest.json menunjuk versi aktif; pembaca selalu melihat versi yang utuh.
+# Di samping file joblib, setiap versi punya file portabel (.npz) untuk inferensi tanpa scikit-learn.
+REGISTRY_DIR = os.path.join("file", "models")
+MANIFEST_FILE = "manifest.json"
+# File model tunggal versi lama; disalin otomatis menjadi versi pertama (file aslinya tidak diubah)
+LEGACY_MODEL_FILE = os.path.join("file", "model_and_scaler_data.pkl")
+VERSION_LENGTH = 16
+
+_lock = threading.RLock()
+
+
+def _path(registry_dir, name):
+    return os.path.join(registry_dir, name)
+
+
+def model_path(version, registry_dir=REGISTRY_DIR):
+    return _path(registry_dir, f"{version}.joblib")
+
+
+def portable_path(version, registry_dir=REGISTRY_DIR):
+    return _path(registry_dir, f"{version}{portable.EXTENSION}")
+
+
+def _meta_path(version, registry_dir):
+    return _path(registry_dir, f"{version}.json")
+
+
+def _write_json(path, data):
+    # Ditulis ke file sementara lalu di-rename agar tidak pernah terbaca setengah jadi
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=_json_default)
+    os.replace(tmp_path, path)
+
+
+def _json_default(value):
+    # Skalar numpy (misalnya dari parameter slider) diubah ke tipe Python biasa
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def load_manifest(registry_dir=REGISTRY_DIR):
+    path = _path(registry_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"active": None, "history": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def register_model(payload, metadata, activate=True, registry_dir=REGISTRY_DIR):
+    """
+    Menyimpan payload model (dict model/scaler/metadata) sebagai versi baru.
+
+    Payload di-dump ke file sementara, versi diambil dari hash SHA-256 isinya,
+    lalu file di-rename ke nama akhir. Payload yang identik menghasilkan versi yang sama.
+    Mengembalikan id versi.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=registry_dir)
+    os.close(fd)
+    try:
+        joblib.dump(payload, tmp_path)
+        digest = hashlib.sha256()
+        with open(tmp_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        version = digest.hexdigest()[:VERSION_LENGTH]
+
+        if os.path.exists(model_path(version, registry_dir)):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, model_path(version, registry_dir))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _write_json(_meta_path(version, registry_dir), {
+        "version": version,
+        "created_at": time.time(),
+        "size_bytes": os.path.getsize(model_path(version, registry_dir)),
+        **metadata,
+    })
+    if activate:
+        activate_version(version, registry_dir)
+    return version
+
+
+def activate_version(version, registry_dir=REGISTRY_DIR):
+    """Menjadikan versi tertentu sebagai versi aktif (juga dipakai untuk rollback)."""
+    if not os.path.exists(model_path(version, registry_dir)):
+        raise ValueError(f"Versi model {version} tidak ditemukan.")
+    with _lock:
+        manifest = load_manifest(registry_dir)
+        history = [v for v in manifest["history"] if v != version] + [version]
+        _write_json(_path(registry_dir, MANIFEST_FILE), {"active": version, "history": history})
+    _evict_inactive(version, registry_dir)
+
+
+def rollback(registry_dir=REGISTRY_DIR):
+    """Mengaktifkan kembali versi yang aktif sebelum versi saat ini. Mengembalikan versi tersebut."""
+    # Manifest dibaca dan ditulis di dalam lock yang sama agar tidak menimpa aktivasi dari sesi lain
+    with _lock:
+        history = load_manifest(registry_dir)["history"]
+        if len(history) < 2:
+            raise ValueError("Tidak ada versi sebelumnya untuk rollback.")
+        previous = history[-2]
+        _write_json(_path(registry_dir, MANIFEST_FILE), {"active": previous, "history": history[:-1]})
+    _evict_inactive(previous, registry_dir)
+    return previous
+
+
+def _evict_inactive(version, registry_dir):
+    """
+    Model versi lain dibuang dari cache tingkat proses setelah versi aktif berganti.
+    Sesi yang masih memegang versi lama tetap memakai objeknya lewat core.shared_store.
+    """
+    retain_cache([model_path(version, registry_dir), portable_path(version, registry_dir)], registry_dir)
+
+
+def active_version(registry_dir=REGISTRY_DIR):
+    """Id versi aktif (None jika belum ada model). File model lama dimigrasikan lebih dulu."""
+    manifest = load_manifest(registry_dir)
+    if manifest["active"] is None and registry_dir == REGISTRY_DIR and os.path.exists(LEGACY_MODEL_FILE):
+        with _lock:
+            # Dicek ulang di dalam lock agar migrasi hanya dijalankan satu sesi
+            if load_manifest(registry_dir)["active"] is None:
+                return migrate_legacy(LEGACY_MODEL_FILE, registry_dir)
+        manifest = load_manifest(registry_dir)
+    return manifest["active"]
+
+
+def active_model_path(registry_dir=REGISTRY_DIR):
+    version = active_version(registry_dir)
+    return None if version is None else model_path(version, registry_dir)
+
+
+def version_metadata(version, registry_dir=REGISTRY_DIR):
+    with open(_meta_path(version, registry_dir), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Metadata semua versi, terbaru lebih dulu."""
+    if not os.path.isdir(registry_dir):
+        return []
+    versions = [
+        version_metadata(name[:-len(".json")], registry_dir)
+        for name in os.listdir(registry_dir)
+        if name.endswith(".json") and name != MANIFEST_FILE
+    ]
+    return sorted(versions, key=lambda meta: meta["created_at"], reverse=True)
+
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    """Memuat payload satu versi; array numpy dipetakan (mmap) langsung dari file."""
+    return joblib.load(model_path(version, registry_dir), mmap_mode="r")
+
+
+def _portable_metadata(version, payload):
+    return {
+        'version': version,
+        'params': payload.get('params'),
+        'metrics': summarize_metrics(payload.get('metrics')),
+        'test_size': payload.get('test_size'),
+        'train_time': payload.get('train_time'),
+        'data_hash': payload.get('data_hash'),
+    }
+
+
+def export_portable_version(version, payload, registry_dir=REGISTRY_DIR):
+    """Menulis file portabel untuk satu versi dari payload joblib-nya. Mengembalikan path file."""
+    return portable.export_portable(
+        payload['model'], payload.get('scaler'), payload['feature_names'], payload['class_names'],
+        portable_path(version, registry_dir), metadata=_portable_metadata(version, payload),
+    )
+
+
+def ensure_portable(version, registry_dir=REGISTRY_DIR):
+    """
+    Path file portabel satu versi. Versi yang disimpan sebelum format portabel ada
+    diekspor sekali dari file joblib-nya (satu-satunya saat scikit-learn perlu dimuat).
+    """
+    path = portable_path(version, registry_dir)
+    if not os.path.exists(path):
+        with _lock:
+            if not os.path.exists(path):
+                export_portable_version(version, load_version(version, registry_dir), registry_dir)
+    return path
+
+
+def runtime_model_path(version, registry_dir=REGISTRY_DIR):
+    """File yang dipakai untuk inferensi (halaman prediksi, layanan, CLI): file portabel versi tersebut."""
+    return ensure_portable(version, registry_dir)
+
+
+def load_portable_version(version, registry_dir=REGISTRY_DIR):
+    """Memuat payload inferensi satu versi dari file portabel (tanpa scikit-learn)."""
+    return portable.load_portable(runtime_model_path(version, registry_dir))
+
+
+def summarize_metrics(metrics):
+    """Ringkasan metrik yang cukup kecil untuk ditulis ke metadata JSON."""
+    if not metrics:
+        return {}
+    return {"accuracy": metrics["accuracy"], "n_test": metrics["n_test"]}
+
+
+def save_model(model, scaler, feature_names, class_names, params, metrics,
+               test_size=None, train_time=None, data_hash=None, activate=True, registry_dir=REGISTRY_DIR,
+               pruning=None):
+    """
+    Menyusun payload model (format yang dibaca halaman prediksi, layanan, dan CLI)
+    lalu menyimpannya sebagai versi baru. Mengembalikan id versi.
+    `pruning` (opsional) berisi pohon penuh dan jalur pemangkasannya (lihat core.pruning).
+    """
+    payload = {
+        'model': model,
+        'scaler': scaler,
+        'feature_names': list(feature_names),
+        'class_names': list(class_names),
+        'params': params,
+        'test_size': test_size,
+        'data_hash': data_hash,
+        'train_time': train_time,
+        'metrics': metrics,
+    }
+    if pruning is not None:
+        payload['pruning'] = pruning
+    version = register_model(payload, {
+        'data_hash': data_hash,
+        'params': params,
+        'metrics': summarize_metrics(metrics),
+        'train_time': train_time,
+        'criterion': (params or {}).get('criterion'),
+        'node_count': int(model.tree_.node_count),
+    }, activate=False, registry_dir=registry_dir)
+    # File portabel ditulis sebelum versi diaktifkan agar pembaca langsung menemukannya
+    export_portable_version(version, payload, registry_dir)
+    if activate:
+        activate_version(version, registry_dir)
+    return version
+
+
+def migrate_legacy(legacy_path=LEGACY_MODEL_FILE, registry_dir=REGISTRY_DIR):
+    """
+    Menyalin file model tunggal lama ke registry sebagai versi aktif. File lama tidak dihapus
+    (ikut dilacak di repositori); migrasi tidak diulang selama registry sudah punya versi aktif.
+    """
+    payload = joblib.load(legacy_path)
+    version = register_model(payload, {
+        "data_hash": payload.get("data_hash"),
+        "params": payload.get("params"),
+        "metrics": summarize_metrics(payload.get("metrics")),
+        "train_time": payload.get("train_time"),
+        "source": os.path.basename(legacy_path),
+    }, registry_dir=registry_dir)
+    return version
@@ -0,0 +1,220 @@
+# core/portable.py
+"""
+Format model portabel: file .npz berisi array pohon, parameter scaler, dan metadata JSON.
+
+Berbeda dengan payload joblib, file ini tidak berisi objek pickle sehingga bisa
+dimuat hanya dengan NumPy (`allow_pickle=False`), tanpa mengimpor scikit-learn dan
+tanpa terikat versi scikit-learn yang dipakai saat pelatihan.
+
+Isi file (semua pohon ensemble digabung berurutan, indeks anak lokal per pohon):
+    meta                 JSON: format, format_version, kind, feature_names, class_names,
+                         representative, clip, metadata tambahan
+    tree_sizes           jumlah node per pohon
+    feature, threshold, children_left, children_right, missing_go_to_left
+    value                distribusi kelas per node (n_node x n_kelas)
+    classes              label kelas model (indeks ke class_names)
+    scale, offset        parameter MinMaxScaler (x * scale + offset)
+    feature_range        rentang hasil normalisasi
+
+`load_portable` mengembalikan payload dengan kunci yang sama seperti payload joblib
+('model', 'scaler', 'feature_names', 'class_names', ...), dengan model dan scaler
+berupa objek ringan yang cukup untuk `compile_model`, `RuleIndex`, dan prediksi massal.
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+FORMAT_NAME = "c45-portable"
+FORMAT_VERSION = 1
+EXTENSION = ".npz"
+
+
+class PortableTree:
+    """Array satu pohon dengan atribut yang sama seperti `sklearn.tree._tree.Tree` (yang dipakai aplikasi)."""
+
+    def __init__(self, feature, threshold, children_left, children_right, value, missing_go_to_left):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.missing_go_to_left = missing_go_to_left
+        self.node_count = len(feature)
+        self.n_outputs = 1
+        self.n_leaves = int((feature < 0).sum())
+
+        depth = np.zeros(self.node_count, dtype=np.intp)
+        for node in range(self.node_count):
+            if feature[node] >= 0:
+                depth[children_left[node]] = depth[node] + 1
+                depth[children_right[node]] = depth[node] + 1
+        self.max_depth = int(depth.max()) if self.node_count else 0
+
+
+class PortableScaler:
+    """Pengganti MinMaxScaler untuk inferensi: transform/inverse_transform dari scale_ dan min_."""
+
+    def __init__(self, scale, offset, feature_range=(0.0, 1.0), clip=False):
+        self.scale_ = scale
+        self.min_ = offset
+        self.feature_range = tuple(feature_range)
+        self.clip = clip
+        self.n_features_in_ = len(scale)
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64) * self.scale_ + self.min_
+        if self.clip:
+            np.clip(X, self.feature_range[0], self.feature_range[1], out=X)
+        return X
+
+    def inverse_transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.min_) / self.scale_
+
+
+class PortableModel:
+    """
+    Model pohon (atau ensemble) hasil muat file portabel. Atribut `tree_`, `trees_`,
+    `classes_`, dan `representative_` mengikuti model asli; prediksi memakai mesin terkompilasi.
+    """
+
+    def __init__(self, trees, classes, representative=0, feature_names=None):
+        self.classes_ = classes
+        self.n_classes_ = len(classes)
+        self.representative_ = representative
+        if len(trees) > 1:
+            # Hanya ensemble yang punya `trees_` (compile_model memilih CompiledForest dari atribut ini)
+            self.trees_ = trees
+        self._trees = trees
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+            self.n_features_in_ = len(feature_names)
+        self._engine = None
+
+    @property
+    def tree_(self):
+        return self._trees[self.representative_]
+
+    def _compiled(self):
+        if self._engine is None:
+            from core.tree_engine import compile_model
+            self._engine = compile_model(self)
+        return self._engine
+
+    def predict(self, X):
+        return self._compiled().predict(X)
+
+    def apply(self, X):
+        return self._compiled().apply(X)
+
+    def get_depth(self):
+        return max(tree.max_depth for tree in self._trees)
+
+    def get_n_leaves(self):
+        return sum(tree.n_leaves for tree in self._trees)
+
+
+def _tree_arrays(tree_):
+    """Array satu pohon; kolom nilai mengikuti urutan `classes_` model (juga untuk pohon ensemble)."""
+    value = np.asarray(tree_.value, dtype=np.float64)[:, 0, :]
+    missing_left = getattr(tree_, 'missing_go_to_left', None)
+    return {
+        'feature': np.asarray(tree_.feature, dtype=np.int32),
+        'threshold': np.asarray(tree_.threshold, dtype=np.float64),
+        'children_left': np.asarray(tree_.children_left, dtype=np.int32),
+        'children_right': np.asarray(tree_.children_right, dtype=np.int32),
+        'missing_go_to_left': np.zeros(tree_.node_count, dtype=bool) if missing_left is None
+        else np.asarray(missing_left, dtype=bool),
+        'value': value,
+    }
+
+
+def export_portable(model, scaler, feature_names, class_names, path, metadata=None):
+    """
+    Menulis model (satu pohon atau ensemble) dan scaler ke file portabel `path`.
+    File ditulis ke file sementara lalu di-rename agar tidak pernah terbaca setengah jadi.
+    """
+    model_classes = np.asarray(model.classes_)
+    trees = getattr(model, 'trees_', None) or [model.tree_]
+    parts = [_tree_arrays(tree_) for tree_ in trees]
+    arrays = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+    clip = bool(getattr(scaler, 'clip', False)) if scaler is not None else False
+    meta = {
+        'format': FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'kind': 'forest' if len(trees) > 1 else 'tree',
+        'feature_names': list(feature_names),
+        'class_names': [str(name) for name in class_names],
+        'representative': int(getattr(model, 'representative_', 0)),
+        'clip': clip,
+        'metadata': metadata or {},
+    }
+    if scaler is not None:
+        arrays['scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+        arrays['offset'] = np.asarray(scaler.min_, dtype=np.float64)
+        arrays['feature_range'] = np.asarray(scaler.feature_range, dtype=np.float64)
+    # Label kelas non-numerik disimpan sebagai teks agar tetap bisa dimuat tanpa pickle
+    arrays['classes'] = model_classes if model_classes.dtype != object else model_classes.astype(str)
+    arrays['tree_sizes'] = np.array([part['feature'].shape[0] for part in parts], dtype=np.int64)
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(suffix=EXTENSION, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False, default=_json_default)), **arrays)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _json_default(value):
+    # Skalar numpy pada metadata (misalnya parameter) diubah ke tipe Python biasa
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def load_portable(path):
+    """
+    Memuat file portabel menjadi payload model (hanya NumPy). Memunculkan ValueError
+    jika file bukan format portabel atau versinya lebih baru dari yang didukung.
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {key: npz[key] for key in npz.files}
+    if 'meta' not in arrays:
+        raise ValueError(f"{path} bukan file model portabel.")
+    meta = json.loads(arrays['meta'].item())
+    if meta.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} bukan file model portabel.")
+    if meta['format_version'] > FORMAT_VERSION:
+        raise ValueError(f"Format model portabel versi {meta['format_version']} belum didukung "
+                         f"(maksimal versi {FORMAT_VERSION}).")
+
+    trees = []
+    start = 0
+    for size in arrays['tree_sizes'].tolist():
+        end = start + size
+        trees.append(PortableTree(
+            feature=arrays['feature'][start:end].astype(np.intp),
+            threshold=arrays['threshold'][start:end],
+            children_left=arrays['children_left'][start:end].astype(np.intp),
+            children_right=arrays['children_right'][start:end].astype(np.intp),
+            value=arrays['value'][start:end, np.newaxis, :],
+            missing_go_to_left=arrays['missing_go_to_left'][start:end],
+        ))
+        start = end
+
+    scaler = None
+    if 'scale' in arrays:
+        scaler = PortableScaler(arrays['scale'], arrays['offset'], arrays['feature_range'].tolist(), meta['clip'])
+    metadata = meta.get('metadata') or {}
+    return {
+        **metadata,
+        'model': PortableModel(trees, arrays['classes'], meta['representative'], meta['feature_names']),
+        'scaler': scaler,
+        'feature_names': meta['feature_names'],
+        'class_names': meta['class_names'],
+        'format_version': meta['format_version'],
+    }
@@ -0,0 +1,134 @@
+# core/profiling.py
+"""
+Pengukur waktu per tahap yang bisa dinyalakan/dimatikan saat aplikasi berjalan.
+
+Pemakaian di halaman:
+    with stage("Upload Data", "ingest CSV"):
+        ...
+
+Saat profiling mati, `stage()` mengembalikan satu objek context kosong yang sama,
+jadi jalur normal hanya membayar satu pengecekan boolean. Saat menyala, setiap
+tahap dicatat ke riwayat tingkat proses (untuk panel p50/p95) dan ditulis sebagai
+log JSON satu baris ke logger "kualitas_udara.profiling".
+
+Profiling juga bisa dinyalakan sejak awal dengan variabel lingkungan AQ_PROFILE=1;
+AQ_PROFILE_LOG=<path> menulis log ke file alih-alih stderr.
+"""
+import collections
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+ENV_VAR = "AQ_PROFILE"
+LOG_FILE_ENV_VAR = "AQ_PROFILE_LOG"
+HISTORY_PER_STAGE = 500
+RECENT_EVENTS = 50
+
+logger = logging.getLogger("kualitas_udara.profiling")
+
+_enabled = os.environ.get(ENV_VAR, "").lower() not in ("", "0", "false")
+_lock = threading.Lock()
+_timings = collections.defaultdict(lambda: collections.deque(maxlen=HISTORY_PER_STAGE))
+_recent = collections.deque(maxlen=RECENT_EVENTS)
+_NOOP = contextlib.nullcontext()
+
+
+def _ensure_handler():
+    if logger.handlers:
+        return
+    path = os.environ.get(LOG_FILE_ENV_VAR)
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Menyalakan/mematikan profiling untuk seluruh proses (semua sesi)."""
+    global _enabled
+    enabled = bool(enabled)
+    if enabled:
+        _ensure_handler()
+    _enabled = enabled
+
+
+class _Timer:
+    __slots__ = ("page", "name", "start")
+
+    def __init__(self, page, name):
+        self.page = page
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.page, self.name, time.perf_counter() - self.start, ok=exc_type is None)
+        return False
+
+
+def stage(page, name):
+    """Context manager pengukur waktu satu tahap pada halaman tertentu."""
+    if not _enabled:
+        return _NOOP
+    return _Timer(page, name)
+
+
+def record(page, name, seconds, **fields):
+    """Mencatat satu pengukuran ke riwayat dan ke log terstruktur."""
+    event = {"event": "stage", "ts": time.time(), "page": page, "stage": name, "ms": round(seconds * 1000, 3), **fields}
+    with _lock:
+        _timings[(page, name)].append(seconds)
+        _recent.append(event)
+    logger.info(json.dumps(event, ensure_ascii=False))
+
+
+def _percentile(sorted_values, q):
+    # Interpolasi linear seperti numpy.percentile, tanpa perlu mengimpor numpy
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summary():
+    """Ringkasan per tahap: jumlah, p50, p95, dan waktu terakhir (ms)."""
+    with _lock:
+        items = [(key, list(values)) for key, values in _timings.items()]
+    rows = []
+    for (page, name), values in items:
+        ordered = sorted(values)
+        rows.append({
+            "Halaman": page,
+            "Tahap": name,
+            "n": len(values),
+            "p50 (ms)": _percentile(ordered, 0.50) * 1000,
+            "p95 (ms)": _percentile(ordered, 0.95) * 1000,
+            "Terakhir (ms)": values[-1] * 1000,
+        })
+    return sorted(rows, key=lambda row: row["p95 (ms)"], reverse=True)
+
+
+def recent(n=RECENT_EVENTS):
+    """Pengukuran terbaru (paling baru di awal)."""
+    with _lock:
+        return list(_recent)[-n:][::-1]
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _recent.clear()
+
+
+if _enabled:
+    _ensure_handler()
@@ -0,0 +1,323 @@
+# core/pruning.py
+"""
+Jalur pemangkasan lengkap dari satu pohon yang ditumbuhkan penuh.
+
+Pohon dilatih sekali tanpa pemangkasan, lalu dihitung urutan pohon bersarang
+dari pohon penuh sampai pohon kecil:
+
+- cost-complexity (weakest link, `ccp_alpha`): pada setiap langkah node internal
+  dengan alpha efektif terkecil dijadikan daun, sama seperti
+  `cost_complexity_pruning_path` scikit-learn (impurity berbobot);
+- pessimistic error (C4.5): pemangkasan subtree replacement untuk confidence
+  factor yang makin kecil; node yang sudah dipangkas tetap dipangkas pada
+  langkah berikutnya agar urutannya bersarang.
+
+Setiap node menyimpan langkah pertama saat ia (atau leluhurnya) menjadi daun,
+sehingga ukuran pohon, akurasi data uji per langkah, dan pohon terpangkas untuk
+langkah mana pun didapat tanpa melatih ulang.
+"""
+import copy
+
+import numpy as np
+
+from core.c45 import add_errors, extract_subtree, impurity_importances
+
+# Metode jalur pemangkasan: kode -> label tampilan
+METHODS = {
+    "ccp": "Cost-Complexity (ccp_alpha)",
+    "pessimistic": "Pessimistic Error (C4.5)",
+}
+
+# Confidence factor untuk jalur pessimistic, dari pemangkasan paling ringan ke paling berat
+CONFIDENCE_FACTORS = (0.5, 0.4, 0.35, 0.3, 0.25, 0.2, 0.15, 0.1, 0.075, 0.05, 0.025, 0.01, 0.005, 0.001)
+
+
+def _topology(tree_):
+    """(parent, depth, preorder, ukuran subpohon) untuk setiap node."""
+    n = tree_.node_count
+    left, right = np.asarray(tree_.children_left), np.asarray(tree_.children_right)
+    parent = np.full(n, -1, dtype=np.intp)
+    depth = np.zeros(n, dtype=np.intp)
+    order, stack = [], [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if left[node] >= 0:
+            parent[left[node]] = parent[right[node]] = node
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+            stack.append(right[node])
+            stack.append(left[node])
+    order = np.array(order, dtype=np.intp)
+    size = np.ones(n, dtype=np.intp)
+    for node in order[::-1]:
+        if parent[node] >= 0:
+            size[parent[node]] += size[node]
+    return parent, depth, order, size
+
+
+def _class_weights(tree_):
+    """Bobot sampel latih per kelas di setiap node (dari proporsi atau jumlah pada `value`)."""
+    value = np.asarray(tree_.value, dtype=np.float64)[:, 0, :]
+    totals = value.sum(axis=1, keepdims=True)
+    return value / np.where(totals > 0, totals, 1) * np.asarray(tree_.weighted_n_node_samples)[:, None]
+
+
+class PruningPath:
+    """
+    Urutan pohon bersarang hasil pemangkasan satu pohon penuh.
+
+    `collapse[node]` adalah langkah pertama saat node menjadi daun karena
+    dirinya atau leluhurnya dipangkas (`n_steps` jika tidak pernah; 0 untuk daun
+    pohon penuh). Langkah 0 selalu pohon penuh. `params[step]` berisi ccp_alpha
+    atau confidence factor langkah tersebut (NaN untuk pohon penuh pada jalur pessimistic).
+    """
+
+    def __init__(self, tree_, method, params, pruned_at):
+        self.tree_ = tree_
+        self.method = method
+        self.params = np.asarray(params, dtype=np.float64)
+        self.n_steps = len(self.params)
+        self.parent, self.node_depth, _, _ = _topology(tree_)
+        self.majority = np.asarray(tree_.value)[:, 0, :].argmax(axis=1)
+
+        # Langkah efektif: node hilang/menjadi daun saat leluhur mana pun dipangkas
+        collapse = np.where(np.asarray(tree_.feature) < 0, 0, pruned_at).astype(np.intp)
+        for node in np.argsort(self.node_depth, kind="stable"):
+            if self.parent[node] >= 0:
+                collapse[node] = min(collapse[node], collapse[self.parent[node]])
+        self.collapse = collapse
+        self.parent_collapse = np.where(self.parent >= 0, collapse[np.maximum(self.parent, 0)], self.n_steps)
+
+        # Ukuran pohon per langkah: node ada selama induknya belum dipangkas
+        steps = np.arange(self.n_steps)
+        present = self.parent_collapse[None, :] > steps[:, None]
+        self.node_count = present.sum(axis=1)
+        self.n_leaves = (present & (self.collapse[None, :] <= steps[:, None])).sum(axis=1)
+        self.depth = np.where(present, self.node_depth[None, :], 0).max(axis=1)
+
+    def collapsed(self, step):
+        """Mask node internal yang dijadikan daun pada langkah `step`."""
+        return (self.collapse <= step) & (np.asarray(self.tree_.feature) >= 0)
+
+    def subtree(self, step):
+        """TreeStructure pohon terpangkas pada langkah `step` (id node dinomori ulang)."""
+        return extract_subtree(self.tree_, 0, self.collapsed(step))[0]
+
+    def step_for_alpha(self, alpha):
+        """Langkah terakhir dengan ccp_alpha <= `alpha` (aturan yang sama dengan scikit-learn)."""
+        return max(int(np.searchsorted(self.params, alpha, side="right")) - 1, 0)
+
+    def stop_nodes(self, leaves, step):
+        """Node tempat setiap baris berhenti pada langkah `step`, dari id daun pohon penuh."""
+        node = np.asarray(leaves, dtype=np.intp).copy()
+        while True:
+            parent = self.parent[node]
+            move = (parent >= 0) & (self.collapse[np.maximum(parent, 0)] <= step)
+            if not move.any():
+                return node
+            node[move] = parent[move]
+
+    def predict_leaves(self, leaves, step):
+        """Indeks kelas prediksi pada langkah `step` untuk baris dengan id daun pohon penuh `leaves`."""
+        return self.majority[self.stop_nodes(leaves, step)]
+
+    def accuracy(self, leaves, y):
+        """
+        Akurasi setiap langkah untuk data dengan id daun pohon penuh `leaves`
+        dan label `y` berupa indeks kelas (posisi pada `model.classes_`).
+        """
+        leaves, y = np.asarray(leaves, dtype=np.intp), np.asarray(y, dtype=np.intp)
+        n_nodes, n_classes = len(self.parent), np.asarray(self.tree_.value).shape[2]
+        counts = np.zeros((n_nodes, n_classes))
+        np.add.at(counts, (leaves, y), 1)
+        # Jumlah per kelas dijumlahkan dari daun ke akar, satu tingkat kedalaman per iterasi
+        for depth in range(self.node_depth.max(), 0, -1):
+            nodes = np.flatnonzero(self.node_depth == depth)
+            np.add.at(counts, self.parent[nodes], counts[nodes])
+        correct = counts[np.arange(n_nodes), self.majority]
+
+        # Node menjadi daun pada langkah [collapse, parent_collapse)
+        diff = np.zeros(self.n_steps + 1)
+        active = self.collapse < self.parent_collapse
+        np.add.at(diff, self.collapse[active], correct[active])
+        np.add.at(diff, self.parent_collapse[active], -correct[active])
+        return np.cumsum(diff)[:self.n_steps] / max(len(y), 1)
+
+    def best_step(self, accuracy):
+        """Langkah dengan akurasi tertinggi; jika seri, pohon terkecil."""
+        accuracy = np.asarray(accuracy)
+        return int(np.flatnonzero(accuracy >= accuracy.max() - 1e-12)[-1])
+
+    def step_params(self, step):
+        """Parameter pelatihan yang menghasilkan pohon langkah `step` jika dilatih ulang."""
+        if self.method == "ccp":
+            # Titik tengah antara alpha langkah ini dan berikutnya agar tidak jatuh tepat di batas
+            # (pohon penuh jalur ini dilatih tanpa pemangkasan pessimistic)
+            upper = self.params[step + 1] if step + 1 < self.n_steps else 2 * self.params[step]
+            return {'pruning': False, 'ccp_alpha': float((self.params[step] + upper) / 2)}
+        if step == 0:
+            return {'pruning': False}
+        return {'pruning': True, 'confidence_factor': float(self.params[step])}
+
+
+def cost_complexity_path(tree_):
+    """Jalur weakest-link pruning dengan R(t) = bobot sampel node / total * impurity node."""
+    parent, _, order, size = _topology(tree_)
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+    weighted = np.asarray(tree_.weighted_n_node_samples, dtype=np.float64)
+    r_node = weighted / weighted[0] * np.asarray(tree_.impurity, dtype=np.float64)
+
+    internal = np.asarray(tree_.feature) >= 0
+    r_branch = np.where(internal, 0.0, r_node)
+    n_leaves = (~internal).astype(np.intp)
+    for node in order[::-1]:
+        if parent[node] >= 0:
+            r_branch[parent[node]] += r_branch[node]
+            n_leaves[parent[node]] += n_leaves[node]
+
+    pruned_at = np.full(tree_.node_count, np.iinfo(np.intp).max, dtype=np.intp)
+    alphas = [0.0]
+    alive = internal.copy()
+    while alive[0]:
+        candidates = np.flatnonzero(alive)
+        g = (r_node[candidates] - r_branch[candidates]) / (n_leaves[candidates] - 1)
+        alpha = max(float(g.min()), alphas[-1])
+        step = len(alphas)
+        alphas.append(alpha)
+        # Semua node dengan alpha efektif minimum dipangkas bersamaan (leluhur lebih dulu)
+        weakest = candidates[g <= g.min() + 1e-12]
+        for node in weakest[np.argsort(position[weakest])]:
+            if not alive[node]:
+                continue
+            pruned_at[node] = step
+            subtree = order[position[node]:position[node] + size[node]]
+            alive[subtree] = False
+            removed_r, removed_leaves = r_branch[node] - r_node[node], n_leaves[node] - 1
+            ancestor = node
+            while ancestor >= 0:
+                r_branch[ancestor] -= removed_r
+                n_leaves[ancestor] -= removed_leaves
+                ancestor = parent[ancestor]
+    return PruningPath(tree_, "ccp", alphas, np.minimum(pruned_at, len(alphas)))
+
+
+def pessimistic_path(tree_, confidence_factors=CONFIDENCE_FACTORS):
+    """Jalur pessimistic error pruning C4.5 untuk confidence factor yang makin kecil."""
+    parent, _, order, _ = _topology(tree_)
+    dist = _class_weights(tree_)
+    n = dist.sum(axis=1)
+    errors = n - dist.max(axis=1)
+    left, right = np.asarray(tree_.children_left), np.asarray(tree_.children_right)
+    internal = np.asarray(tree_.feature) >= 0
+
+    pruned = np.zeros(tree_.node_count, dtype=bool)
+    pruned_at = np.full(tree_.node_count, np.iinfo(np.intp).max, dtype=np.intp)
+    params = [np.nan]
+    for cf in confidence_factors:
+        leaf_estimate = np.array([e + add_errors(m, e, cf) if m > 0 else 0.0 for m, e in zip(n, errors)])
+        estimate = np.zeros(tree_.node_count)
+        newly = np.zeros(tree_.node_count, dtype=bool)
+        # Bottom-up seperti C45Classifier._prune; node yang sudah dipangkas tetap daun
+        for node in order[::-1]:
+            if not internal[node] or pruned[node]:
+                estimate[node] = leaf_estimate[node]
+                continue
+            subtree_estimate = estimate[left[node]] + estimate[right[node]]
+            if leaf_estimate[node] <= subtree_estimate + 0.1:
+                newly[node] = True
+                estimate[node] = leaf_estimate[node]
+            else:
+                estimate[node] = subtree_estimate
+        # Node di bawah node yang sudah dipangkas tidak lagi ada di pohon
+        hidden = np.zeros(tree_.node_count, dtype=bool)
+        for node in order[1:]:
+            hidden[node] = hidden[parent[node]] or pruned[parent[node]]
+        newly &= ~hidden
+        if newly.any():
+            pruned_at[newly] = len(params)
+            pruned |= newly
+            params.append(cf)
+    return PruningPath(tree_, "pessimistic", params, np.minimum(pruned_at, len(params)))
+
+
+def pruning_path(tree_, method="ccp"):
+    if method == "ccp":
+        return cost_complexity_path(tree_)
+    if method == "pessimistic":
+        return pessimistic_path(tree_)
+    raise ValueError(f"Metode pemangkasan tidak dikenal: {method}")
+
+
+def _sklearn_tree(structure, template):
+    """Tree scikit-learn asli dari TreeStructure (lewat format pickle Tree), agar predict tetap cepat."""
+    from sklearn.tree._tree import NODE_DTYPE, Tree
+
+    nodes = np.zeros(structure.node_count, dtype=NODE_DTYPE)
+    nodes['left_child'] = structure.children_left
+    nodes['right_child'] = structure.children_right
+    nodes['feature'] = structure.feature
+    nodes['threshold'] = structure.threshold
+    nodes['impurity'] = structure.impurity
+    nodes['n_node_samples'] = structure.n_node_samples
+    nodes['weighted_n_node_samples'] = structure.weighted_n_node_samples
+    if 'missing_go_to_left' in NODE_DTYPE.names:
+        nodes['missing_go_to_left'] = structure.missing_go_to_left
+    tree_ = Tree(template.n_features, np.asarray(template.n_classes, dtype=np.intp), template.n_outputs)
+    tree_.__setstate__({
+        'max_depth': structure.max_depth,
+        'node_count': structure.node_count,
+        'nodes': nodes,
+        'values': np.ascontiguousarray(structure.value, dtype=np.float64),
+    })
+    return tree_
+
+
+def pruned_model(model, path, step):
+    """Salinan `model` (pohon penuh milik `path`) dengan pohon terpangkas pada langkah `step`."""
+    structure = path.subtree(step)
+    pruned = copy.deepcopy(model)
+    if hasattr(pruned, '_build_structure'):
+        # C45Classifier: pohon berupa TreeStructure yang bisa langsung dipasang
+        pruned.tree_ = structure
+        pruned.feature_importances_ = impurity_importances(structure, model.n_features_in_)
+    else:
+        pruned.tree_ = _sklearn_tree(structure, model.tree_)
+    pruned.set_params(**{k: v for k, v in path.step_params(step).items() if k in pruned.get_params()})
+    return pruned
+
+
+def train_with_path(params, method, X_train, y_train, X_test, y_test):
+    """
+    Menumbuhkan satu pohon penuh (tanpa pemangkasan) lalu menghitung jalur
+    pemangkasan dan akurasi data uji di setiap langkah. Mengembalikan (info, waktu latih);
+    info berisi pohon penuh, jalur, id daun data uji, indeks kelas data uji,
+    akurasi per langkah, dan langkah terpilih (akurasi tertinggi, pohon terkecil).
+    """
+    from core.training import train_model
+
+    full, train_time = train_model({**params, 'pruning': False, 'ccp_alpha': 0.0}, X_train, y_train)
+    path = pruning_path(full.tree_, method)
+    leaves = full.apply(X_test)
+    y_index = np.searchsorted(full.classes_, np.asarray(y_test))
+    accuracy = path.accuracy(leaves, y_index)
+    return {
+        'model': full,
+        'path': path,
+        'test_leaves': leaves,
+        'y_test': y_index,
+        'accuracy': accuracy,
+        'step': path.best_step(accuracy),
+    }, train_time
+
+
+def select_step(pruning, step):
+    """
+    Model terpangkas untuk langkah `step` dari info jalur, tanpa melatih ulang.
+    Mengembalikan (model, parameter yang diperbarui, info jalur baru, y_test, y_pred).
+    """
+    full, path = pruning['model'], pruning['path']
+    model = pruned_model(full, path, step)
+    y_test = full.classes_.take(pruning['y_test'])
+    y_pred = full.classes_.take(path.predict_leaves(pruning['test_leaves'], step))
+    return model, path.step_params(step), {**pruning, 'step': int(step)}, y_test, y_pred
@@ -0,0 +1,85 @@
+# core/rules.py
+import numpy as np
+
+
+class RuleIndex:
+    """
+    Indeks aturan pohon keputusan yang dibangun sekali per model tanpa rekursi.
+
+    Setiap node menyimpan induk dan arah cabangnya, sehingga kondisi sebuah
+    daun cukup dibaca dengan menelusuri induk sampai akar (maksimal sedalam pohon).
+    Urutan aturan sama dengan penelusuran kiri-dulu dari akar.
+    `classes` adalah label kelas per kolom nilai node (`model.classes_`); bawaan urutan kolom.
+    """
+
+    def __init__(self, tree_, feature_names, class_names, classes=None):
+        n_nodes = tree_.node_count
+        self.feature = np.asarray(tree_.feature)
+        self.threshold = np.asarray(tree_.threshold)
+        self.feature_names = list(feature_names)
+        self.parent = np.full(n_nodes, -1, dtype=np.int32)
+        self.is_left = np.zeros(n_nodes, dtype=bool)
+
+        leaves = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            left, right = tree_.children_left[node], tree_.children_right[node]
+            if self.feature[node] < 0:
+                leaves.append(node)
+                continue
+            self.parent[left] = self.parent[right] = node
+            self.is_left[left] = True
+            stack.append(right)
+            stack.append(left)
+
+        self.leaves = np.array(leaves, dtype=np.int32)
+        # Nomor aturan (mulai dari 1) untuk setiap id daun; 0 untuk node internal
+        self.rule_number = np.zeros(n_nodes, dtype=np.int32)
+        self.rule_number[self.leaves] = np.arange(1, len(leaves) + 1)
+        majority = np.asarray(tree_.value)[:, 0, :].argmax(axis=1)
+        if classes is not None:
+            majority = np.asarray(classes)[majority]
+        # Kelas mayoritas per node; untuk daun sama dengan hasil predict pohon tunggal
+        self.node_class = np.asarray(class_names, dtype=object)[majority]
+        self._texts = None
+
+    def __len__(self):
+        return len(self.leaves)
+
+    def conditions(self, leaf):
+        """Daftar (nama fitur, operator, threshold) dari akar sampai daun."""
+        steps = []
+        node = int(leaf)
+        while self.parent[node] >= 0:
+            parent = self.parent[node]
+            operator = '≤' if self.is_left[node] else '>'
+            steps.append((self.feature_names[self.feature[parent]], operator, float(self.threshold[parent])))
+            node = parent
+        steps.reverse()
+        return steps
+
+    def rule(self, leaf):
+        """Aturan untuk satu daun dalam format (langkah-langkah, kelas hasil)."""
+        path = [f"{name} {operator} {threshold:.2f}" for name, operator, threshold in self.conditions(leaf)]
+        return path, self.node_class[leaf]
+
+    def page(self, page, per_page=10):
+        """Aturan pada halaman tertentu (mulai dari 0): list (nomor aturan, langkah, kelas)."""
+        start = page * per_page
+        return [
+            (start + i + 1, *self.rule(leaf))
+            for i, leaf in enumerate(self.leaves[start:start + per_page])
+        ]
+
+    def n_pages(self, per_page=10):
+        return max(1, -(-len(self.leaves) // per_page))
+
+    def texts(self):
+        """Teks aturan per id node (dibuat sekali) untuk pencarian tervektorisasi pada prediksi batch."""
+        if self._texts is None:
+            texts = np.full(len(self.feature), "", dtype=object)
+            for leaf in self.leaves:
+                texts[leaf] = " DAN ".join(self.rule(leaf)[0]) or "(tanpa kondisi)"
+            self._texts = texts
+        return self._texts
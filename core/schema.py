@@ -0,0 +1,8 @@
+# core/schema.py
+# Nama kolom dataset kualitas udara yang dipakai bersama oleh halaman dan modul inti
+
+FEATURE_COLUMNS = ['CO (ppm)', 'PM10 (µg/m3)', 'NO2 (ppb)', 'Suhu (°C)', 'Kelembaban (%)', 'Kecepatan Angin (m/s)']
+LABEL_COLUMN = 'Kategori Kualitas Udara'
+PREDICTION_COLUMN = 'Prediksi Kategori Kualitas Udara'
+RULE_NUMBER_COLUMN = 'Nomor Aturan'
+RULE_COLUMN = 'Aturan Keputusan'
@@ -0,0 +1,304 @@
+# core/service.py
+"""
+Layanan HTTP prediksi tanpa Streamlit.
+
+Memuat versi model aktif dari registry yang sama dengan aplikasi, menerima satu
+atau beberapa pembacaan sensor dalam JSON, dan menggabungkan permintaan yang
+datang bersamaan menjadi micro-batch: satu transform + satu predict per batch.
+Model dimuat ulang otomatis ketika versi aktif di manifest berubah. Model dibaca dari
+file portabel (lihat core.portable), sehingga layanan tidak perlu mengimpor scikit-learn.
+
+Contoh:
+    python -m core.service --port 8000
+    curl -X POST localhost:8000/predict -d '{"CO (ppm)": 0.5, "PM10 (µg/m3)": 50, ...}'
+
+Endpoint:
+    POST /predict  satu objek, list objek, atau {"readings": [...]}
+    GET  /health   status dan versi model aktif
+    GET  /stats    jumlah permintaan, ukuran batch, latensi p50/p95
+"""
+import argparse
+import collections
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from core import model_registry
+from core.model_cache import get_derived, load_model_data
+from core.tree_engine import compile_model
+
+DEFAULT_MAX_BATCH = 1024
+DEFAULT_MAX_WAIT = 0.002
+RELOAD_INTERVAL = 1.0
+LATENCY_WINDOW = 10_000
+
+
+class ModelHandle:
+    """Versi model aktif beserta pohon terkompilasinya; dicek ulang ke manifest secara berkala."""
+
+    def __init__(self, reload_interval=RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self.version = None
+        self._checked_at = 0.0
+        self.reloads = 0
+
+    def current(self):
+        """Mengembalikan (versi, payload model, pohon terkompilasi) terbaru."""
+        now = time.monotonic()
+        if self.version is None or now - self._checked_at >= self.reload_interval:
+            version = model_registry.active_version()
+            if version is None:
+                raise LookupError("Model belum tersedia. Latih model terlebih dahulu.")
+            if self.version is not None and version != self.version:
+                self.reloads += 1
+            self.version = version
+            self._checked_at = now
+        path = model_registry.runtime_model_path(self.version)
+        data = load_model_data(path)
+        compiled = get_derived(path, 'compiled_tree', lambda d: compile_model(d['model'], d['scaler']))
+        return self.version, data, compiled
+
+
+class _Pending:
+    __slots__ = ("X", "done", "labels", "version", "batch_size", "error")
+
+    def __init__(self, X):
+        self.X = X
+        self.done = threading.Event()
+        self.labels = None
+        self.version = None
+        self.batch_size = 0
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Menggabungkan permintaan yang datang bersamaan menjadi satu prediksi tervektorisasi.
+
+    Satu thread worker menunggu permintaan pertama, lalu mengumpulkan permintaan lain
+    sampai `max_batch` baris atau `max_wait` detik, kemudian memanggil
+    `predict_raw` sekali untuk seluruh baris dan membagikan hasilnya kembali.
+    """
+
+    def __init__(self, handle, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT):
+        self.handle = handle
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def predict(self, X):
+        """Memasukkan baris mentah ke antrean dan menunggu hasilnya. Mengembalikan _Pending yang selesai."""
+        item = _Pending(X)
+        self._queue.put(item)
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        n_rows = len(batch[0].X)
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item.X)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                version, data, compiled = self.handle.current()
+                X = np.concatenate([item.X for item in batch])
+                labels = np.asarray(data['class_names'], dtype=object)[compiled.predict_raw(X)]
+                start = 0
+                for item in batch:
+                    item.labels = labels[start:start + len(item.X)].tolist()
+                    item.version = version
+                    item.batch_size = len(X)
+                    start += len(item.X)
+            except Exception as e:
+                for item in batch:
+                    item.error = e
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.rows += sum(len(item.X) for item in batch)
+            for item in batch:
+                item.done.set()
+
+    def stats(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            return {
+                "requests": self.requests,
+                "rows": self.rows,
+                "batches": self.batches,
+                "mean_batch_rows": (self.rows / self.batches) if self.batches else 0.0,
+                "queue_depth": self.queue_depth(),
+                "latency_ms_p50": float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+                "latency_ms_p95": float(np.percentile(latencies, 95) * 1000) if len(latencies) else None,
+                "model_version": self.handle.version,
+                "model_reloads": self.handle.reloads,
+            }
+
+
+def parse_readings(payload, feature_names):
+    """
+    Mengubah body JSON menjadi matriks fitur (n x jumlah fitur).
+    Mengembalikan (X, apakah permintaan berupa satu pembacaan).
+    """
+    single = isinstance(payload, dict) and "readings" not in payload
+    readings = [payload] if single else payload.get("readings") if isinstance(payload, dict) else payload
+    if not isinstance(readings, list) or not readings:
+        raise ValueError("Body harus berupa objek pembacaan, list pembacaan, atau {\"readings\": [...]}.")
+
+    X = np.empty((len(readings), len(feature_names)), dtype=np.float64)
+    for i, reading in enumerate(readings):
+        if not isinstance(reading, dict):
+            raise ValueError(f"Pembacaan ke-{i} harus berupa objek JSON.")
+        missing = [name for name in feature_names if name not in reading]
+        if missing:
+            raise ValueError(f"Pembacaan ke-{i}: kolom yang hilang: {', '.join(missing)}")
+        try:
+            X[i] = [float(reading[name]) for name in feature_names]
+        except (TypeError, ValueError):
+            raise ValueError(f"Pembacaan ke-{i}: semua nilai fitur harus berupa angka.")
+    if not np.isfinite(X).all():
+        raise ValueError("Nilai fitur tidak boleh NaN atau tak hingga.")
+    return X, single
+
+
+def make_handler(batcher):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, body, extra_headers=None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (extra_headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                try:
+                    version = batcher.handle.current()[0]
+                except LookupError as e:
+                    self._send_json(503, {"status": "no-model", "error": str(e)})
+                    return
+                self._send_json(200, {"status": "ok", "model_version": version, "queue_depth": batcher.queue_depth()})
+            elif self.path == "/stats":
+                self._send_json(200, batcher.stats())
+            else:
+                self._send_json(404, {"error": "Endpoint tidak ditemukan."})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "Endpoint tidak ditemukan."})
+                return
+            start = time.perf_counter()
+            queue_depth = batcher.queue_depth()
+            try:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                _, data, _ = batcher.handle.current()
+                X, single = parse_readings(json.loads(body), data['feature_names'])
+                result = batcher.predict(X)
+            except LookupError as e:
+                self._send_json(503, {"error": str(e)})
+                return
+            except ValueError as e:
+                # json.JSONDecodeError juga turunan ValueError
+                self._send_json(400, {"error": str(e)})
+                return
+
+            latency = time.perf_counter() - start
+            batcher.record_latency(latency)
+            response = {
+                "model_version": result.version,
+                "latency_ms": latency * 1000,
+                "queue_depth": queue_depth,
+                "batch_rows": result.batch_size,
+            }
+            if single:
+                response["prediction"] = result.labels[0]
+            else:
+                response["predictions"] = result.labels
+            self._send_json(200, response, {
+                "X-Latency-Ms": f"{latency * 1000:.3f}",
+                "X-Queue-Depth": str(queue_depth),
+            })
+
+        def log_message(self, format, *args):
+            # Log akses per permintaan dimatikan; gunakan /stats untuk latensi
+            pass
+
+    return PredictionHandler
+
+
+def create_server(host="127.0.0.1", port=8000, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT,
+                  reload_interval=RELOAD_INTERVAL):
+    """Membuat server HTTP (belum dijalankan). Memanggil `serve_forever()` untuk mulai melayani."""
+    batcher = MicroBatcher(ModelHandle(reload_interval), max_batch=max_batch, max_wait=max_wait)
+    try:
+        # Model dimuat di awal agar permintaan pertama tidak menanggung waktu muat
+        batcher.handle.current()
+    except LookupError:
+        pass
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    server.daemon_threads = True
+    server.batcher = batcher
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Baris maksimum per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1000,
+                        help="Waktu tunggu maksimum untuk mengumpulkan satu batch")
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL,
+                        help="Selang (detik) pengecekan versi model aktif")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.max_batch, args.max_wait_ms / 1000, args.reload_interval)
+    print(f"Layanan prediksi berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
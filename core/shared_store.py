@@ -0,0 +1,263 @@
+# core/shared_store.py
+"""
+Penyimpanan objek baca-saja tingkat proses yang dibagi oleh semua sesi Streamlit.
+
+Dataset dan model disimpan satu kali per hash isi. Sesi hanya memegang `SharedRef`
+(kunci kecil) di session_state; jumlah referensi bertambah saat sesi memperoleh
+entri dan berkurang ketika referensinya diganti atau sesi berakhir (objek
+session_state dibuang). Entri tanpa referensi dihapus dari penyimpanan.
+
+Data tidak pernah diubah di tempat, baik oleh sesi maupun oleh penulisan dataset:
+perubahan dataset ditulis ke generasi baru dan menghasilkan hash baru (entri baru).
+Sesi yang masih memegang entri lama tetap membaca memmap generasi lamanya sampai
+referensinya dilepas; `detach()` hanya menandai entri tersebut sebagai bukan
+dataset aktif lagi.
+"""
+import mmap
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from core.dataset_store import STORE_DIR, dataset_exists, load_dataset, load_meta, scaler_from_meta
+from core.schema import LABEL_COLUMN
+
+# Atribut array pada struktur pohon (scikit-learn maupun C4.5)
+TREE_ARRAYS = (
+    "feature", "threshold", "children_left", "children_right",
+    "value", "impurity", "n_node_samples", "weighted_n_node_samples",
+)
+
+
+def dataset_key(content_hash):
+    return f"dataset:{content_hash}"
+
+
+def model_key(version):
+    return f"model:{version}"
+
+
+def _is_mapped(array):
+    """True jika array merupakan view dari file memory-mapped."""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def _iter_arrays(obj, seen):
+    """Semua array numpy yang dijangkau dari obj (dict, list, DataFrame, estimator, pohon)."""
+    if id(obj) in seen or obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+        return
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        yield obj
+    elif isinstance(obj, pd.DataFrame):
+        for _, column in obj.items():
+            yield from _iter_arrays(column, seen)
+    elif isinstance(obj, pd.Series):
+        values = obj.array
+        if isinstance(values, pd.Categorical):
+            yield values.codes
+        else:
+            yield obj.to_numpy(copy=False)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _iter_arrays(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield from _iter_arrays(value, seen)
+    else:
+        tree_ = getattr(obj, "tree_", None)
+        if tree_ is not None:
+            for name in TREE_ARRAYS:
+                yield from _iter_arrays(getattr(tree_, name, None), seen)
+        if hasattr(obj, "__dict__"):
+            yield from _iter_arrays({k: v for k, v in vars(obj).items() if k != "tree_"}, seen)
+
+
+def estimate_memory(obj):
+    """
+    Perkiraan memori array numpy di dalam obj dalam byte: (di memori, dipetakan dari disk).
+    Array yang berbagi buffer yang sama hanya dihitung sekali.
+    """
+    resident = mapped = 0
+    buffers = set()
+    for array in _iter_arrays(obj, set()):
+        buffer = (array.__array_interface__["data"][0], array.nbytes)
+        if buffer in buffers:
+            continue
+        buffers.add(buffer)
+        if _is_mapped(array):
+            mapped += array.nbytes
+        else:
+            resident += array.nbytes
+    return resident, mapped
+
+
+class SharedRef:
+    """
+    Referensi sesi ke satu entri. Referensi dilepas otomatis saat objek ini dibuang
+    (misalnya diganti di session_state atau sesi berakhir), atau lewat `release()`.
+    """
+
+    __slots__ = ("store", "key", "_finalizer", "__weakref__")
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    @property
+    def value(self):
+        return self.store.get(self.key)
+
+    def derived(self, name, factory):
+        return self.store.derived(self.key, name, factory)
+
+    def release(self):
+        self._finalizer()
+
+    def __repr__(self):
+        return f"SharedRef({self.key!r})"
+
+
+class SharedStore:
+    """Entri baca-saja berkunci hash isi dengan penghitung referensi per entri."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, key, factory, kind="objek", on_release=None):
+        """
+        Mengembalikan SharedRef ke entri `key`. `factory()` dipanggil hanya jika entri
+        belum ada, sehingga banyak sesi yang membuka data yang sama memakai satu objek.
+        `on_release()` (opsional) dipanggil setelah referensi terakhir ke entri dilepas.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"kind": kind, "value": factory(), "refs": 0, "derived": {},
+                         "created": time.time(), "detached": False, "on_release": on_release}
+                self._entries[key] = entry
+                self.misses += 1
+            else:
+                self.hits += 1
+            entry["refs"] += 1
+            return SharedRef(self, key)
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            del self._entries[key]
+        if entry["on_release"] is not None:
+            entry["on_release"]()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries[key]["value"]
+
+    def derived(self, key, name, factory):
+        """Objek turunan dari entri (dibuat sekali dan dibagi semua pemegang entri)."""
+        with self._lock:
+            entry = self._entries[key]
+            if name not in entry["derived"]:
+                entry["derived"][name] = factory(entry["value"])
+            return entry["derived"][name]
+
+    def detach(self, key):
+        """
+        Menandai entri (jika masih ada pemegangnya) sebagai tidak lagi mewakili data tersimpan
+        saat ini. Isinya tidak disalin: file di balik memmap-nya tidak pernah diubah di tempat
+        dan tetap terbaca oleh pemegang lama sampai referensi terakhir dilepas.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["detached"]:
+                return False
+            entry["detached"] = True
+            return True
+
+    def stats(self):
+        """Satu baris per entri: jenis, jumlah referensi, dan perkiraan memori."""
+        with self._lock:
+            items = [(key, dict(entry)) for key, entry in self._entries.items()]
+        rows = []
+        for key, entry in items:
+            resident, mapped = estimate_memory([entry["value"], entry["derived"]])
+            rows.append({
+                "key": key,
+                "kind": entry["kind"],
+                "refs": entry["refs"],
+                "resident_bytes": resident,
+                "mapped_bytes": mapped,
+                "detached": entry["detached"],
+                "age_seconds": time.time() - entry["created"],
+            })
+        return sorted(rows, key=lambda row: row["resident_bytes"] + row["mapped_bytes"], reverse=True)
+
+    def counters(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Satu instance untuk seluruh proses (dibagi antar sesi)
+_store = SharedStore()
+
+
+def _load_dataset_entry(store_dir):
+    df, meta = load_dataset(store_dir)
+    scaler = scaler_from_meta(meta)
+    if scaler is None:
+        # Rentang data asli tidak diketahui: latih ulang scaler untuk data yang dimuat
+        from sklearn.preprocessing import MinMaxScaler
+        scaler = MinMaxScaler().fit(df.drop(LABEL_COLUMN, axis=1, errors='ignore'))
+    return {"data": df, "meta": meta, "scaler": scaler}
+
+
+def acquire_dataset(store_dir=STORE_DIR):
+    """SharedRef ke dataset tersimpan: dict berisi 'data' (DataFrame), 'meta', dan 'scaler'."""
+    key = dataset_key(load_meta(store_dir)["content_hash"])
+    return _store.acquire(key, lambda: _load_dataset_entry(store_dir), kind="dataset")
+
+
+def acquire_model(version):
+    """SharedRef ke isi satu versi model di registry (objek yang sama dengan cache model)."""
+    from core import model_registry
+    from core.model_cache import invalidate_cache, load_model_data
+
+    path = model_registry.model_path(version)
+
+    def release():
+        # Model versi aktif tetap di cache untuk pembaca lain; versi lama ikut dibuang dari cache
+        if model_registry.load_manifest()["active"] != version:
+            invalidate_cache(path)
+
+    return _store.acquire(model_key(version), lambda: load_model_data(path), kind="model", on_release=release)
+
+
+def detach_dataset(store_dir=STORE_DIR):
+    """Menandai dataset yang tersimpan saat ini sebagai lama, sebelum diganti atau dihapus."""
+    if not dataset_exists(store_dir):
+        return False
+    return _store.detach(dataset_key(load_meta(store_dir)["content_hash"]))
+
+
+def stats():
+    return _store.stats()
+
+
+def counters():
+    return _store.counters()
@@ -0,0 +1,428 @@
+# core/streaming.py
+"""
+Mode streaming: pembacaan sensor dari sumber lokal diprediksi terus-menerus.
+
+Sumber berupa async generator yang menghasilkan `Reading`:
+- `replay_source`: memutar ulang dataset tersimpan (atau upload/persistent_data.csv lama)
+  dengan laju tertentu, sebagai pembacaan mentah dari beberapa stasiun;
+- `tail_csv_source`: mengikuti baris baru yang ditambahkan ke file CSV (seperti `tail -f`),
+  secara bawaan hanya file di dalam folder upload/;
+- `socket_source`: server TCP yang menerima satu pembacaan JSON per baris, secara bawaan
+  hanya pada alamat loopback.
+
+`StreamProcessor` berjalan di event loop asyncio: satu task memindahkan pembacaan
+dari sumber ke antrean berkapasitas terbatas, task lain mengumpulkan micro-batch
+(sampai `max_batch` baris atau `max_wait` detik) lalu memprediksi seluruh batch
+sekali dengan pohon terkompilasi. Hasilnya memperbarui jumlah kategori per stasiun
+dalam jendela waktu bergulir, throughput, dan latensi end-to-end (dari pembacaan
+diterima sampai prediksinya selesai).
+
+`StreamRunner` menjalankan event loop tersebut di thread latar, sehingga halaman
+Streamlit cukup membaca `snapshot()` secara berkala.
+
+Contoh pembacaan untuk socket (satu objek JSON per baris):
+    {"Stasiun": "Stasiun 1", "CO (ppm)": 0.5, "PM10 (µg/m3)": 50, ...}
+"""
+import asyncio
+import collections
+import csv
+import json
+import os
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from core.service import parse_readings
+
+STATION_COLUMN = "Stasiun"
+REPLAY_FILE = os.path.join("upload", "persistent_data.csv")
+# Batas bawaan sumber: file yang diikuti harus di folder ini, server hanya mendengarkan loopback
+TAIL_DIR = "upload"
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+DEFAULT_RATE = 50.0
+DEFAULT_STATIONS = 3
+DEFAULT_WINDOW = 60.0
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 0.02
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_PORT = 9009
+LATENCY_WINDOW = 5_000
+THROUGHPUT_WINDOW = 5.0
+RECENT_PREDICTIONS = 20
+
+
+class Reading:
+    """Satu pembacaan sensor: stasiun, nilai fitur mentah (None jika tidak valid), dan waktu diterima."""
+
+    __slots__ = ("station", "values", "received")
+
+    def __init__(self, station, values, received):
+        self.station = station
+        self.values = values
+        self.received = received
+
+
+def parse_record(record, feature_names, default_station="Stasiun 1"):
+    """(stasiun, nilai fitur) dari satu objek pembacaan; ValueError jika tidak valid."""
+    X, _ = parse_readings([record], feature_names)
+    return str(record.get(STATION_COLUMN) or record.get("station") or default_station), X[0]
+
+
+def _replay_frame(path=None):
+    """
+    Data untuk replay (ternormalisasi): file `path` jika diberikan, jika tidak dataset
+    tersimpan, atau file CSV lama bila dataset belum pernah disimpan.
+    """
+    from core.dataset_store import dataset_exists, load_dataset
+
+    if path is None and dataset_exists():
+        return load_dataset()[0]
+    return pd.read_csv(path or REPLAY_FILE)
+
+
+def resolve_tail_path(path, base_dir=TAIL_DIR):
+    """Path absolut file yang diikuti; ValueError jika berada di luar `base_dir` (None = tanpa batas)."""
+    full_path = os.path.realpath(path)
+    if base_dir is not None:
+        base = os.path.realpath(base_dir)
+        if os.path.commonpath([base, full_path]) != base:
+            raise ValueError(f"File yang diikuti harus berada di dalam folder `{base_dir}`.")
+    return full_path
+
+
+def check_host(host, allow_remote=False):
+    """ValueError jika server akan mendengarkan alamat selain loopback tanpa izin eksplisit."""
+    if not allow_remote and host not in LOOPBACK_HOSTS:
+        raise ValueError(f"Host `{host}` bukan alamat loopback; server streaming hanya menerima koneksi lokal.")
+
+
+# --- Sumber pembacaan ---
+
+async def replay_source(feature_names, scaler=None, path=None, rate=DEFAULT_RATE,
+                        n_stations=DEFAULT_STATIONS, loop=True):
+    """
+    Memutar ulang data tersimpan sebanyak `rate` baris per detik. Data yang ternormalisasi
+    dikembalikan ke satuan asli dengan `scaler` agar setara dengan pembacaan sensor.
+    Tanpa kolom stasiun, baris dibagi bergiliran ke `n_stations` stasiun.
+    Waktu diterima = jadwal kirim, sehingga keterlambatan pemrosesan ikut terukur.
+    """
+    df = _replay_frame(path)
+    X = df[feature_names].to_numpy(dtype=np.float64)
+    if scaler is not None:
+        X = (X - scaler.min_) / scaler.scale_
+    if STATION_COLUMN in df.columns:
+        stations = df[STATION_COLUMN].astype(str).tolist()
+    else:
+        stations = [f"Stasiun {i % n_stations + 1}" for i in range(len(df))]
+    rows = X.tolist()
+
+    start = time.perf_counter()
+    sent = 0
+    while True:
+        for station, values in zip(stations, rows):
+            due = start + sent / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield Reading(station, values, due)
+            sent += 1
+        if not loop:
+            return
+
+
+async def tail_csv_source(feature_names, path, poll_interval=DEFAULT_POLL_INTERVAL, from_start=False,
+                          base_dir=TAIL_DIR):
+    """
+    Mengikuti file CSV di dalam `base_dir`: hanya baris yang ditambahkan setelah sumber dimulai
+    yang dibaca (atau seluruh isi jika `from_start`). Baris dengan nilai tidak valid dihasilkan
+    dengan values=None.
+    """
+    path = resolve_tail_path(path, base_dir)
+    with open(path, encoding="utf-8", newline="") as f:
+        header = next(csv.reader([f.readline()]), [])
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        buffer = ""
+        while True:
+            chunk = f.read()
+            if not chunk:
+                # File dipotong atau diganti: baca ulang dari awal (setelah header)
+                if os.path.getsize(path) < f.tell():
+                    f.seek(0)
+                    f.readline()
+                    buffer = ""
+                await asyncio.sleep(poll_interval)
+                continue
+            buffer += chunk
+            *lines, buffer = buffer.split("\n")
+            received = time.perf_counter()
+            for row in csv.reader(line for line in lines if line.strip()):
+                try:
+                    station, values = parse_record(dict(zip(header, row)), feature_names)
+                except ValueError:
+                    station, values = None, None
+                yield Reading(station, values, received)
+
+
+async def socket_source(feature_names, host="127.0.0.1", port=DEFAULT_PORT, max_pending=10_000,
+                        allow_remote=False):
+    """
+    Server TCP lokal; setiap klien mengirim satu objek JSON pembacaan per baris.
+    Alamat selain loopback hanya dipakai jika `allow_remote`.
+    """
+    check_host(host, allow_remote)
+    pending = asyncio.Queue(maxsize=max_pending)
+    writers = set()
+
+    async def handle(reader, writer):
+        writers.add(writer)
+        try:
+            while line := await reader.readline():
+                received = time.perf_counter()
+                try:
+                    station, values = parse_record(json.loads(line), feature_names)
+                except ValueError:
+                    station, values = None, None
+                await pending.put(Reading(station, values, received))
+        except (asyncio.CancelledError, ConnectionError):
+            # Handler yang dibatalkan saat event loop berhenti diakhiri normal; asyncio
+            # (Python 3.11) mencetak traceback untuk task handler yang berakhir dibatalkan
+            pass
+        finally:
+            writers.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    try:
+        while True:
+            yield await pending.get()
+    finally:
+        server.close()
+        # Koneksi klien ditutup agar handler selesai (readline mendapat EOF) dan
+        # wait_closed tidak menunggu koneksi yang masih terbuka
+        for writer in list(writers):
+            writer.close()
+        await server.wait_closed()
+
+
+SOURCES = {
+    "replay": replay_source,
+    "tail": tail_csv_source,
+    "socket": socket_source,
+}
+
+
+# --- Pemrosesan ---
+
+class RollingCounts:
+    """Jumlah kategori per stasiun untuk pembacaan dalam `window_seconds` terakhir."""
+
+    def __init__(self, n_classes, window_seconds=DEFAULT_WINDOW):
+        self.n_classes = n_classes
+        self.window_seconds = window_seconds
+        self._events = collections.defaultdict(collections.deque)
+        self._counts = collections.defaultdict(lambda: np.zeros(self.n_classes, dtype=np.int64))
+
+    def add(self, station, class_index, now):
+        self._events[station].append((now, class_index))
+        self._counts[station][class_index] += 1
+
+    def expire(self, now):
+        cutoff = now - self.window_seconds
+        for station, events in self._events.items():
+            counts = self._counts[station]
+            while events and events[0][0] < cutoff:
+                counts[events.popleft()[1]] -= 1
+
+    def table(self):
+        """{stasiun: array jumlah per kelas}, terurut nama stasiun."""
+        return {station: self._counts[station].copy() for station in sorted(self._counts)}
+
+
+class StreamProcessor:
+    """
+    Micro-batching asyncio untuk pembacaan streaming. `model_provider()` mengembalikan
+    (versi, payload model, pohon terkompilasi), misalnya `core.service.ModelHandle().current`,
+    sehingga versi model aktif yang baru langsung dipakai.
+    """
+
+    def __init__(self, model_provider, window_seconds=DEFAULT_WINDOW, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait=DEFAULT_MAX_WAIT):
+        self.model_provider = model_provider
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._completed = collections.deque()
+        self._recent = collections.deque(maxlen=RECENT_PREDICTIONS)
+        self._windows = None
+        self._queue = None
+        self.class_names = []
+        self.model_version = None
+        self.rows = 0
+        self.invalid = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.running = False
+        self.error = None
+
+    async def _produce(self, source, queue):
+        try:
+            async for reading in source:
+                await queue.put(reading)
+        finally:
+            await queue.put(None)
+
+    async def _collect(self, queue):
+        """Satu micro-batch; None jika sumber sudah habis dan antrean kosong."""
+        first = await queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                # Tanda akhir dikembalikan agar batch berikutnya berhenti
+                queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _score(self, batch):
+        valid = [reading for reading in batch if reading.values is not None]
+        labels = []
+        if valid:
+            version, data, compiled = self.model_provider()
+            labels = compiled.predict_raw(np.array([reading.values for reading in valid], dtype=np.float64))
+        done = time.perf_counter()
+        now = time.monotonic()
+
+        with self._lock:
+            if valid:
+                if self._windows is None or version != self.model_version:
+                    # Kelas bisa berbeda antar versi model: jendela dimulai ulang
+                    self.class_names = list(data['class_names'])
+                    self._windows = RollingCounts(len(self.class_names), self.window_seconds)
+                    self.model_version = version
+                for reading, label in zip(valid, labels.tolist()):
+                    self._windows.add(reading.station, label, now)
+                    self._latencies.append(done - reading.received)
+                self._recent.extendleft(
+                    (reading.station, self.class_names[label], (done - reading.received) * 1000)
+                    for reading, label in zip(valid[-RECENT_PREDICTIONS:], labels[-RECENT_PREDICTIONS:].tolist())
+                )
+            self.rows += len(valid)
+            self.invalid += len(batch) - len(valid)
+            self.batches += 1
+            self._completed.append((done, len(valid)))
+
+    async def run(self, source):
+        """Memproses `source` sampai habis atau task dibatalkan."""
+        self._queue = queue = asyncio.Queue(maxsize=self.max_batch * 4)
+        self.running = True
+        self.started = time.perf_counter()
+        producer = asyncio.create_task(self._produce(source, queue))
+        try:
+            while (batch := await self._collect(queue)) is not None:
+                self._score(batch)
+            await producer
+        finally:
+            producer.cancel()
+            self.running = False
+
+    def snapshot(self):
+        """Ringkasan kondisi saat ini untuk ditampilkan (aman dipanggil dari thread lain)."""
+        now = time.perf_counter()
+        with self._lock:
+            while self._completed and self._completed[0][0] < now - THROUGHPUT_WINDOW:
+                self._completed.popleft()
+            span = min(THROUGHPUT_WINDOW, max(now - self.started, 1e-9))
+            latencies = np.array(self._latencies)
+            if self._windows is not None:
+                self._windows.expire(time.monotonic())
+            return {
+                "running": self.running,
+                "error": self.error,
+                "rows": self.rows,
+                "invalid": self.invalid,
+                "batches": self.batches,
+                "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                "throughput": sum(n for _, n in self._completed) / span,
+                "latency_ms_p50": float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+                "latency_ms_p95": float(np.percentile(latencies, 95) * 1000) if len(latencies) else None,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "model_version": self.model_version,
+                "class_names": list(self.class_names),
+                "stations": self._windows.table() if self._windows is not None else {},
+                "recent": list(self._recent),
+            }
+
+
+def _run_loop(processor, source_factory, state):
+    async def main():
+        state["loop"] = asyncio.get_running_loop()
+        state["task"] = asyncio.current_task()
+        if state["stopped"]:
+            return
+        await processor.run(source_factory())
+
+    try:
+        asyncio.run(main())
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        processor.error = f"{type(e).__name__}: {e}"
+
+
+def _stop_loop(state):
+    state["stopped"] = True
+    loop, task = state.get("loop"), state.get("task")
+    if loop is not None and not loop.is_closed():
+        try:
+            loop.call_soon_threadsafe(task.cancel)
+        except RuntimeError:
+            # Event loop sudah berhenti
+            pass
+
+
+class StreamRunner:
+    """
+    Menjalankan StreamProcessor di event loop asyncio pada thread latar. Stream berhenti
+    lewat `stop()` atau otomatis ketika objek ini dibuang (misalnya sesi Streamlit berakhir).
+    """
+
+    def __init__(self, processor, source_factory):
+        self.processor = processor
+        self._state = {"loop": None, "task": None, "stopped": False}
+        # Thread tidak memegang referensi ke runner, sehingga finalizer tetap bisa berjalan
+        self._thread = threading.Thread(target=_run_loop, args=(processor, source_factory, self._state),
+                                        name="sensor-stream", daemon=True)
+        self._finalizer = weakref.finalize(self, _stop_loop, self._state)
+        self._thread.start()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def stop(self, timeout=None):
+        self._finalizer()
+        if timeout is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self):
+        return self.processor.snapshot()
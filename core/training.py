@@ -0,0 +1,181 @@
+# core/training.py
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from core import model_registry
+from core.c45 import C45Classifier
+from core.model_cache import load_model_data
+from core.pruning import select_step, train_with_path
+from core.schema import LABEL_COLUMN
+
+# Kriteria split yang didukung: gain ratio = C4.5 asli, sisanya pohon CART scikit-learn
+CRITERIA = ["gain_ratio", "entropy", "gini"]
+# Minimum sampel per daun bawaan: 2 seperti C4.5, 1 (bawaan scikit-learn) untuk kriteria CART
+DEFAULT_MIN_SAMPLES_LEAF = {"gain_ratio": 2, "entropy": 1, "gini": 1}
+
+
+def default_min_samples_leaf(criterion):
+    return DEFAULT_MIN_SAMPLES_LEAF.get(criterion, 1)
+
+
+def build_model(criterion="gain_ratio", max_depth=None, min_samples_leaf=None, pruning=True, confidence_factor=0.25,
+                n_estimators=1, bootstrap=True, max_features=1.0, ccp_alpha=0.0):
+    """
+    Membuat estimator pohon keputusan sesuai kriteria yang dipilih.
+    Jika `n_estimators` > 1, dibuat ensemble (bagging / random subspace) dari pohon yang sama.
+    `ccp_alpha` > 0 menambahkan pemangkasan cost-complexity (lihat core.pruning).
+    Tanpa `min_samples_leaf`, dipakai bawaan per kriteria (DEFAULT_MIN_SAMPLES_LEAF).
+    """
+    if min_samples_leaf is None:
+        min_samples_leaf = default_min_samples_leaf(criterion)
+    if n_estimators and n_estimators > 1:
+        from core.forest import C45Forest
+        return C45Forest(
+            n_estimators=n_estimators, criterion=criterion, max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf, pruning=pruning, confidence_factor=confidence_factor,
+            bootstrap=bootstrap, max_features=max_features
+        )
+    if criterion == "gain_ratio":
+        return C45Classifier(
+            max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf,
+            pruning=pruning,
+            confidence_factor=confidence_factor,
+            ccp_alpha=ccp_alpha
+        )
+    return DecisionTreeClassifier(
+        criterion=criterion,
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        ccp_alpha=ccp_alpha,
+        random_state=42
+    )
+
+
+def prepare_data(df):
+    """Memisahkan fitur dan target lalu mengubah label menjadi numerik."""
+    X = df.drop(LABEL_COLUMN, axis=1)
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(df[LABEL_COLUMN])
+    return X, y_encoded, label_encoder
+
+
+def split_data(X, y_encoded, test_size):
+    return train_test_split(X, y_encoded, test_size=test_size, random_state=42, stratify=y_encoded)
+
+
+def train_model(params, X_train, y_train):
+    """Melatih satu model dan mengembalikan (model, waktu latih dalam detik)."""
+    model = build_model(**params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    return model, time.perf_counter() - start
+
+
+def param_grid(max_depths, min_samples_leafs, criteria, pruning=True, confidence_factor=0.25):
+    """Semua kombinasi parameter untuk sweep."""
+    return [
+        {
+            'criterion': criterion,
+            'max_depth': int(depth),
+            'min_samples_leaf': int(leaf),
+            'pruning': bool(pruning) and criterion == "gain_ratio",
+            'confidence_factor': confidence_factor,
+        }
+        for criterion, depth, leaf in itertools.product(criteria, max_depths, min_samples_leafs)
+    ]
+
+
+# Data latih/uji per proses worker, dikirim sekali lewat initializer (bukan per tugas)
+_worker_data = {}
+
+
+def _init_sweep_worker(X_train, X_test, y_train, y_test):
+    _worker_data.update(X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test)
+
+
+def _sweep_task(params):
+    model, train_time = train_model(params, _worker_data['X_train'], _worker_data['y_train'])
+    accuracy = float((model.predict(_worker_data['X_test']) == _worker_data['y_test']).mean())
+    return {
+        **params,
+        'accuracy': accuracy,
+        'node_count': int(model.tree_.node_count),
+        'n_leaves': int(model.get_n_leaves()),
+        'depth': int(model.get_depth()),
+        'train_time': train_time,
+        'model': model,
+    }
+
+
+def run_sweep(grid, X_train, X_test, y_train, y_test, n_jobs=None):
+    """
+    Melatih semua kombinasi parameter secara paralel di beberapa proses.
+    Hasil dikembalikan dalam urutan `grid`, lengkap dengan model terlatih.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(grid) == 1:
+        _init_sweep_worker(X_train, X_test, y_train, y_test)
+        return [_sweep_task(params) for params in grid]
+
+    # 'spawn' aman dipakai dari proses server yang memiliki banyak thread
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=min(n_jobs, len(grid)),
+        mp_context=context,
+        initializer=_init_sweep_worker,
+        initargs=(X_train, X_test, y_train, y_test),
+    ) as executor:
+        return list(executor.map(_sweep_task, grid))
+
+
+def best_result(results):
+    """Akurasi tertinggi; jika seri, pilih pohon paling kecil lalu paling cepat dilatih."""
+    return max(results, key=lambda r: (r['accuracy'], -r['node_count'], -r['train_time']))
+
+
+def saved_model_params():
+    """Parameter pelatihan model aktif; None jika belum ada model atau model lama tanpa parameter."""
+    if model_registry.active_version() is None:
+        return None
+    try:
+        return load_model_data(model_registry.active_model_path()).get('params') or None
+    except Exception:
+        return None
+
+
+def retrain_saved_model(df_normalized, scaler, data_hash):
+    """
+    Melatih ulang model aktif dengan parameter tersimpannya (parameter bawaan `build_model`
+    untuk model lama tanpa parameter) pada `df_normalized`. Hasilnya disimpan sebagai versi baru
+    bersama `scaler` dan `data_hash` milik dataset tersebut; mengembalikan id versi.
+    """
+    # Diimpor di sini karena core.evaluation sendiri mengimpor modul ini
+    from core.evaluation import evaluate_model
+
+    model_data = load_model_data(model_registry.active_model_path())
+    test_size = model_data.get('test_size') or 0.2
+    X, y_encoded, label_encoder = prepare_data(df_normalized)
+    X_train, X_test, y_train, y_test = split_data(X, y_encoded, test_size)
+    params, pruning = model_data.get('params') or {}, model_data.get('pruning')
+    if pruning is not None:
+        # Model dari jalur pemangkasan: jalurnya dihitung ulang dan langkah terbaik dipilih kembali
+        pruning, train_time = train_with_path(params, pruning['path'].method, X_train, y_train, X_test, y_test)
+        model, step_params, pruning, y_test, y_pred = select_step(pruning, pruning['step'])
+        params = {**params, **step_params}
+    else:
+        model, train_time = train_model(params, X_train, y_train)
+        y_pred = model.predict(X_test)
+    feature_names, class_names = X.columns.tolist(), label_encoder.classes_.tolist()
+    metrics = evaluate_model(model, feature_names, class_names, y_test, y_pred)
+    return model_registry.save_model(
+        model, scaler, feature_names, class_names, params, metrics,
+        test_size=test_size, train_time=train_time, data_hash=data_hash, pruning=pruning
+    )
@@ -0,0 +1,320 @@
+# core/tree_engine.py
+import hashlib
+
+import numpy as np
+
+
+def tree_fingerprint(model):
+    """
+    Hash isi struktur pohon; sama untuk model yang identik meskipun objeknya berbeda.
+    Untuk ensemble, semua pohon ikut di-hash (bukan hanya pohon perwakilan).
+    """
+    digest = hashlib.sha1()
+    for tree_ in getattr(model, 'trees_', None) or [model.tree_]:
+        for array in (tree_.feature, tree_.threshold, tree_.children_left, tree_.children_right, tree_.value):
+            digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(repr(np.asarray(model.classes_).tolist()).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _scaler_params(scaler):
+    """(scale, offset, clip_range) dari MinMaxScaler, atau None semua jika tanpa scaler."""
+    if scaler is None:
+        return None, None, None
+    clip_range = tuple(scaler.feature_range) if getattr(scaler, 'clip', False) else None
+    return scaler.scale_, scaler.min_, clip_range
+
+
+def compile_model(model, scaler=None):
+    """Mesin inferensi yang sesuai untuk model: CompiledForest untuk ensemble, CompiledTree untuk satu pohon."""
+    if getattr(model, 'trees_', None) is not None:
+        return CompiledForest.from_model(model, scaler)
+    return CompiledTree.from_model(model, scaler)
+
+
+class CompiledTree:
+    """
+    Mesin inferensi pohon keputusan yang dibangun dari `model.tree_`.
+
+    Struktur pohon diratakan menjadi array NumPy ringkas sehingga prediksi
+    tidak lagi melewati validasi input scikit-learn. Tersedia jalur cepat
+    satu baris (loop Python biasa) dan jalur batch tervektorisasi.
+    Hasilnya identik dengan `model.predict`: input dibulatkan ke float32
+    seperti yang dilakukan scikit-learn sebelum dibandingkan dengan threshold.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, leaf_label,
+                 missing_go_to_left=None, scale=None, offset=None, clip_range=None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children_left = np.asarray(children_left, dtype=np.intp)
+        self.children_right = np.asarray(children_right, dtype=np.intp)
+        self.leaf_label = np.asarray(leaf_label)
+        if missing_go_to_left is None:
+            missing_go_to_left = np.zeros(len(self.feature), dtype=bool)
+        self.missing_go_to_left = np.asarray(missing_go_to_left, dtype=bool)
+
+        # Parameter MinMaxScaler opsional agar input mentah bisa langsung diprediksi
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.offset = None if offset is None else np.asarray(offset, dtype=np.float64)
+        self.clip_range = clip_range
+
+        self.node_count = len(self.feature)
+        self.max_depth = self._compute_depth()
+
+        # Salinan list Python untuk jalur satu baris (akses list lebih cepat dari ndarray)
+        self._feature_list = self.feature.tolist()
+        self._threshold_list = self.threshold.tolist()
+        self._left_list = self.children_left.tolist()
+        self._right_list = self.children_right.tolist()
+        self._missing_left_list = self.missing_go_to_left.tolist()
+        self._label_list = self.leaf_label.tolist()
+        self._scale_list = None if self.scale is None else self.scale.tolist()
+        self._offset_list = None if self.offset is None else self.offset.tolist()
+
+    @classmethod
+    def from_model(cls, model, scaler=None):
+        """Membangun CompiledTree dari model pohon terlatih (dan MinMaxScaler opsional)."""
+        tree_ = model.tree_
+        leaf_label = np.asarray(model.classes_).take(tree_.value[:, 0, :].argmax(axis=1))
+        missing_go_to_left = getattr(tree_, 'missing_go_to_left', None)
+        scale, offset, clip_range = _scaler_params(scaler)
+        return cls(
+            tree_.feature, tree_.threshold, tree_.children_left, tree_.children_right,
+            leaf_label, missing_go_to_left, scale, offset, clip_range
+        )
+
+    def _compute_depth(self):
+        depth = np.zeros(self.node_count, dtype=np.intp)
+        for node in range(self.node_count):
+            if self.feature[node] >= 0:
+                depth[self.children_left[node]] = depth[node] + 1
+                depth[self.children_right[node]] = depth[node] + 1
+        return int(depth.max()) if self.node_count else 0
+
+    # --- Jalur satu baris ---
+
+    def apply_row(self, row):
+        """Mengembalikan id daun untuk satu baris yang sudah dinormalisasi."""
+        x = np.asarray(row, dtype=np.float32).tolist()
+        feature = self._feature_list
+        threshold = self._threshold_list
+        left = self._left_list
+        right = self._right_list
+        node = 0
+        f = feature[0]
+        while f >= 0:
+            value = x[f]
+            if value <= threshold[node]:
+                node = left[node]
+            elif value != value:
+                node = left[node] if self._missing_left_list[node] else right[node]
+            else:
+                node = right[node]
+            f = feature[node]
+        return node
+
+    def predict_row(self, row):
+        """Prediksi satu baris yang sudah dinormalisasi."""
+        return self._label_list[self.apply_row(row)]
+
+    def transform_row(self, row):
+        """Normalisasi satu baris mentah dengan parameter scaler yang dilipat ke mesin ini."""
+        values = [v * s + o for v, s, o in zip(row, self._scale_list, self._offset_list)]
+        if self.clip_range is not None:
+            low, high = self.clip_range
+            values = [min(max(v, low), high) for v in values]
+        return values
+
+    def predict_raw_row(self, row):
+        """Prediksi satu baris mentah (belum dinormalisasi)."""
+        return self.predict_row(self.transform_row(row))
+
+    # --- Jalur batch tervektorisasi ---
+
+    def apply(self, X):
+        """Mengembalikan id daun untuk setiap baris pada matriks X yang sudah dinormalisasi."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        active = np.nonzero(self.feature[node] >= 0)[0]
+
+        # Setiap iterasi memajukan semua baris yang belum mencapai daun satu tingkat
+        while active.size:
+            current = node[active]
+            f = self.feature[current]
+            values = X[active, f]
+            go_left = values <= self.threshold[current]
+            missing = np.isnan(values)
+            if missing.any():
+                go_left |= missing & self.missing_go_to_left[current]
+            nxt = np.where(go_left, self.children_left[current], self.children_right[current])
+            node[active] = nxt
+            active = active[self.feature[nxt] >= 0]
+        return node
+
+    def predict(self, X):
+        """Prediksi batch untuk matriks X yang sudah dinormalisasi."""
+        return self.leaf_label[self.apply(X)]
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64) * self.scale
+        X += self.offset
+        if self.clip_range is not None:
+            np.clip(X, self.clip_range[0], self.clip_range[1], out=X)
+        return X
+
+    def predict_raw(self, X):
+        """Prediksi batch untuk data mentah (belum dinormalisasi)."""
+        return self.predict(self.transform(X))
+
+
+class CompiledForest:
+    """
+    Mesin inferensi untuk ensemble pohon (`C45Forest`).
+
+    Node semua pohon digabung menjadi satu set array dengan offset per pohon,
+    lalu semua pasangan (baris, pohon) ditelusuri bersama: satu iterasi NumPy per
+    tingkat kedalaman, bukan loop Python per pohon. Daun menunjuk ke dirinya
+    sendiri sehingga setiap iterasi tidak perlu memilah pasangan yang sudah
+    selesai. Probabilitas daun dirata-rata (soft voting). Aturan dan id daun
+    (`apply`) diambil dari pohon perwakilan agar tampilan aturan satu pohon tetap berlaku.
+    """
+
+    # Jumlah pasangan (baris, pohon) per potongan pada jalur batch
+    BLOCK_PAIRS = 1 << 18
+
+    def __init__(self, trees, classes, representative=0, scale=None, offset=None, clip_range=None):
+        sizes = np.array([tree.node_count for tree in trees], dtype=np.intp)
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        shift = np.repeat(offsets, sizes)
+
+        feature = np.concatenate([np.asarray(t.feature, dtype=np.intp) for t in trees])
+        left = np.concatenate([np.asarray(t.children_left, dtype=np.intp) for t in trees])
+        right = np.concatenate([np.asarray(t.children_right, dtype=np.intp) for t in trees])
+        is_leaf = feature < 0
+        nodes = np.arange(len(feature), dtype=np.intp)
+        # Daun: fitur 0 dengan kedua anak menunjuk ke daun itu sendiri
+        self.feature = np.where(is_leaf, 0, feature)
+        self.threshold = np.concatenate([np.asarray(t.threshold, dtype=np.float64) for t in trees])
+        self.children_left = np.where(is_leaf, nodes, left + shift)
+        self.children_right = np.where(is_leaf, nodes, right + shift)
+        self.missing_go_to_left = np.concatenate([
+            np.zeros(t.node_count, dtype=bool) if getattr(t, 'missing_go_to_left', None) is None
+            else np.asarray(t.missing_go_to_left, dtype=bool)
+            for t in trees
+        ])
+        self.value = np.concatenate([np.asarray(t.value)[:, 0, :] for t in trees])
+        self.roots = offsets
+        self.classes = np.asarray(classes)
+        self.n_trees = len(trees)
+        self.node_count = int(sizes.sum())
+
+        rep = trees[representative]
+        self.representative = CompiledTree(
+            rep.feature, rep.threshold, rep.children_left, rep.children_right,
+            self.classes.take(np.asarray(rep.value)[:, 0, :].argmax(axis=1)),
+            getattr(rep, 'missing_go_to_left', None), scale, offset, clip_range
+        )
+        self.max_depth = max(
+            CompiledTree(t.feature, t.threshold, t.children_left, t.children_right, np.zeros(t.node_count)).max_depth
+            for t in trees
+        )
+
+        # Salinan list Python untuk jalur satu baris
+        self._feature_list = np.where(is_leaf, -1, feature).tolist()
+        self._threshold_list = self.threshold.tolist()
+        self._left_list = self.children_left.tolist()
+        self._right_list = self.children_right.tolist()
+        self._missing_left_list = self.missing_go_to_left.tolist()
+        self._root_list = self.roots.tolist()
+        self._class_list = self.classes.tolist()
+
+    @classmethod
+    def from_model(cls, model, scaler=None):
+        """Membangun CompiledForest dari C45Forest terlatih (dan MinMaxScaler opsional)."""
+        return cls(model.trees_, model.classes_, model.representative_, *_scaler_params(scaler))
+
+    # --- Jalur satu baris ---
+
+    def apply_all_row(self, row):
+        """Id daun (indeks global) setiap pohon untuk satu baris yang sudah dinormalisasi."""
+        x = np.asarray(row, dtype=np.float32).tolist()
+        feature = self._feature_list
+        threshold = self._threshold_list
+        left = self._left_list
+        right = self._right_list
+        leaves = []
+        for node in self._root_list:
+            f = feature[node]
+            while f >= 0:
+                value = x[f]
+                if value <= threshold[node]:
+                    node = left[node]
+                elif value != value:
+                    node = left[node] if self._missing_left_list[node] else right[node]
+                else:
+                    node = right[node]
+                f = feature[node]
+            leaves.append(node)
+        return leaves
+
+    def predict_row(self, row):
+        """Prediksi satu baris yang sudah dinormalisasi (suara gabungan semua pohon)."""
+        return self._class_list[int(self.value[self.apply_all_row(row)].sum(axis=0).argmax())]
+
+    def apply_row(self, row):
+        """Id daun pohon perwakilan untuk satu baris (untuk aturan yang dipakai)."""
+        return self.representative.apply_row(row)
+
+    def transform_row(self, row):
+        return self.representative.transform_row(row)
+
+    def predict_raw_row(self, row):
+        return self.predict_row(self.transform_row(row))
+
+    # --- Jalur batch tervektorisasi ---
+
+    def _apply_block(self, X):
+        n, n_features = X.shape
+        flat = X.ravel()
+        base = np.repeat(np.arange(n, dtype=np.intp) * n_features, self.n_trees)
+        node = np.tile(self.roots, n)
+        has_missing = np.isnan(flat).any()
+        # Jumlah iterasi tetap (kedalaman maksimum); pasangan yang sudah di daun tetap di tempat
+        for _ in range(self.max_depth):
+            values = flat.take(base + self.feature.take(node))
+            go_left = values <= self.threshold.take(node)
+            if has_missing:
+                go_left |= np.isnan(values) & self.missing_go_to_left.take(node)
+            node = np.where(go_left, self.children_left.take(node), self.children_right.take(node))
+        return node.reshape(n, self.n_trees)
+
+    def apply_all(self, X):
+        """Id daun (indeks global) untuk setiap pasangan baris x pohon, bentuk (n_baris, n_pohon)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        block = max(1, self.BLOCK_PAIRS // self.n_trees)
+        if len(X) <= block:
+            return self._apply_block(X)
+        return np.concatenate([self._apply_block(X[start:start + block]) for start in range(0, len(X), block)])
+
+    def predict_proba(self, X):
+        """Rata-rata probabilitas daun semua pohon untuk matriks X yang sudah dinormalisasi."""
+        return self.value[self.apply_all(X)].mean(axis=1)
+
+    def predict(self, X):
+        """Prediksi batch (suara gabungan semua pohon) untuk X yang sudah dinormalisasi."""
+        return self.classes.take(self.predict_proba(X).argmax(axis=1))
+
+    def apply(self, X):
+        """Id daun pohon perwakilan (untuk nomor/teks aturan)."""
+        return self.representative.apply(X)
+
+    def transform(self, X):
+        return self.representative.transform(X)
+
+    def predict_raw(self, X):
+        return self.predict(self.transform(X))
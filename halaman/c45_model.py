@@ -2,74 +2,174 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-from sklearn import tree
+from sklearn.tree import DecisionTreeClassifier, plot_tree
 import base64
 from io import BytesIO
-import matplotlib as mpl
-import seaborn as sns
-import joblib
 import os
 import time
+from core.training import (CRITERIA, prepare_data, split_data, train_model, param_grid, run_sweep, best_result,
+                           default_min_samples_leaf, saved_model_params, retrain_saved_model)
+from core.evaluation import cross_validate, evaluate_model
+from core.model_cache import load_model_data
+from core.c45 import extract_subtree
+from core.pruning import METHODS as PRUNING_METHODS, select_step, train_with_path
+from core.tree_engine import tree_fingerprint
+from core.rules import RuleIndex
+from core.dataset_store import dataset_exists, load_meta
+from core import model_registry
+from core.shared_store import acquire_model, model_key
+from core.profiling import stage
 
-# Nama file tempat model, scaler, dan metadata akan disimpan
-MODEL_SAVE_FILE = "file/model_and_scaler_data.pkl"
+# Nama halaman pada log profiling
+PAGE = "Penerapan Algoritma C4.5"
 
-def get_tree_image(model, feature_names, class_names):
+# Pilihan algoritma pelatihan pada halaman ini (label -> kriteria split)
+ALGORITHMS = {
+    "C4.5 (Gain Ratio)": "gain_ratio",
+    "Decision Tree Entropy (scikit-learn)": "entropy",
+    "Decision Tree Gini (scikit-learn)": "gini",
+}
+CRITERION_LABELS = {criterion: label for label, criterion in ALGORITHMS.items()}
+
+# Metode ensemble (label -> (bootstrap, fraksi fitur per pohon))
+ENSEMBLE_METHODS = {
+    "Bagging (sampel bootstrap)": (True, 1.0),
+    "Random Subspace (subset fitur)": (False, 0.6),
+    "Bagging + Random Subspace": (True, 0.6),
+}
+
+# Warna kotak node berdasarkan kelas mayoritas
+TREE_COLOR_MAP = {
+    'Baik': '#8bc34a',
+    'Sedang': '#ffb300',
+    'Tidak Sehat': '#e53935',
+    'Sangat Tidak Sehat': '#7b1fa2',
+    'Berbahaya': '#212121'
+}
+
+# Pohon yang lebih dalam dari ini tidak pernah digambar utuh dalam satu gambar
+FULL_TREE_MAX_DEPTH = 8
+PREVIEW_DPI = 80
+DOWNLOAD_DPI = 300
+
+def tree_view(tree_, criterion, n_features_in_):
+    """
+    Pembungkus struktur `tree_` (pohon utuh, subpohon, atau pohon perwakilan ensemble, termasuk C4.5)
+    sebagai DecisionTreeClassifier agar bisa digambar dengan `plot_tree` milik scikit-learn.
+    """
+    view = DecisionTreeClassifier(criterion=criterion)
+    view.tree_ = tree_
+    view.n_features_in_ = n_features_in_
+    return view
+
+def drawn_nodes(tree_, max_depth=None):
+    """
+    Nomor node sesuai urutan kotak yang digambar `plot_tree` (preorder);
+    None untuk kotak "(...)" di bawah batas kedalaman.
+    """
+    order = []
+    stack = [(0, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if max_depth is not None and depth > max_depth:
+            order.append(None)
+            continue
+        order.append(node)
+        if tree_.children_left[node] != tree_.children_right[node]:
+            stack.append((tree_.children_right[node], depth + 1))
+            stack.append((tree_.children_left[node], depth + 1))
+    return order
+
+def get_tree_image(model, feature_names, class_names, max_depth=None, root=0, dpi=DOWNLOAD_DPI):
     """
     Fungsi untuk membuat visualisasi pohon keputusan dengan warna kustom
     dan mengembalikannya dalam format base64.
+    `max_depth` membatasi kedalaman yang digambar dan `root` memilih subpohon.
     """
-    color_map = {
-        'Baik': '#8bc34a',
-        'Sedang': '#ffb300',
-        'Tidak Sehat': '#e53935',
-        'Sangat Tidak Sehat': '#7b1fa2',
-        'Berbahaya': '#212121'
-    }
+    import matplotlib.pyplot as plt
+
+    tree_ = model.tree_
+    if root != 0:
+        tree_, _ = extract_subtree(model.tree_, root)
+
+    # Nilai node bisa berupa proporsi kelas, jadi cukup ambil argmax tanpa konversi ke int
+    majority = tree_.value[:, 0, :].argmax(axis=1)
+    node_colors = [TREE_COLOR_MAP.get(class_names[i], '#cccccc') for i in majority]
 
     plt.style.use('seaborn-v0_8-whitegrid')
     fig, ax = plt.subplots(figsize=(20, 12))
 
-    tree.plot_tree(
-        model,
+    annotations = plot_tree(
+        tree_view(tree_, model.criterion, model.n_features_in_),
+        max_depth=max_depth,
         feature_names=feature_names,
         class_names=class_names,
         filled=True,
         rounded=True,
         fontsize=10,
         proportion=True,
-        node_ids=True,
+        # Nomor node pada subpohon adalah nomor lokal, jadi hanya ditampilkan untuk pohon utuh
+        node_ids=(root == 0),
         impurity=False,
         label='root',
         ax=ax
     )
-    
-    all_objects = ax.get_children()
-    node_values = model.tree_.value.squeeze().astype(int)
-
-    node_counter = 0
-    for obj in all_objects:
-        if isinstance(obj, mpl.patches.FancyBboxPatch):
-            if node_counter < len(node_values):
-                class_index = node_values[node_counter].argmax()
-                class_name = class_names[class_index]
-                color = color_map.get(class_name, '#cccccc')
-                
-                obj.set_facecolor(color)
-                node_counter += 1
-            
+    # Kotak node diwarnai ulang sesuai kelas mayoritas; anotasi tanpa kotak (label True/False) dilewati
+    boxes = [ann.get_bbox_patch() for ann in annotations if ann.get_bbox_patch() is not None]
+    for box, node in zip(boxes, drawn_nodes(tree_, max_depth)):
+        if node is not None:
+            box.set_facecolor(node_colors[node])
+
     buf = BytesIO()
-    plt.savefig(buf, format="png", bbox_inches='tight', dpi=300)
+    plt.savefig(buf, format="png", bbox_inches='tight', dpi=dpi)
     plt.close(fig)
     
     img_base64 = base64.b64encode(buf.getvalue()).decode("utf-8")
     return img_base64
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_tree_image(fingerprint, _model, feature_names, class_names, max_depth=None, root=0, dpi=DOWNLOAD_DPI):
+    """Gambar pohon di-cache berdasarkan fingerprint model dan opsi tampilan."""
+    return get_tree_image(_model, list(feature_names), list(class_names), max_depth, root, dpi)
+
+def show_tree_visual(model, feature_names, class_names):
+    """Menampilkan pratinjau pohon (ringan) dan menyiapkan PNG resolusi tinggi hanya saat diunduh."""
+    fingerprint = tree_fingerprint(model)
+    # Untuk ensemble, yang digambar adalah pohon perwakilan
+    depth = model.tree_.max_depth
+    feature_names, class_names = tuple(feature_names), tuple(class_names)
+
+    views = ["Kedalaman Terbatas", "Subpohon"]
+    if depth <= FULL_TREE_MAX_DEPTH:
+        views.insert(0, "Pohon Lengkap")
+    view = st.radio("Tampilan Pohon", views, horizontal=True, key="tree_view")
+
+    max_depth, root = None, 0
+    if view != "Pohon Lengkap":
+        if view == "Subpohon":
+            internal_nodes = np.nonzero(model.tree_.feature >= 0)[0].tolist()
+            root = st.selectbox("Akar Subpohon (nomor node)", internal_nodes or [0], key="tree_root")
+        if depth > 1:
+            max_depth = st.slider("Tampilkan Sampai Kedalaman", 1, min(depth, FULL_TREE_MAX_DEPTH),
+                                  min(3, depth), 1, key="tree_depth")
+        else:
+            max_depth = 1
+        st.caption(f"Pohon memiliki kedalaman {depth} dan {model.tree_.node_count} node. "
+                   "Cabang yang tidak digambar ditandai dengan (...).")
+
+    with stage(PAGE, "render pohon"):
+        preview = render_tree_image(fingerprint, model, feature_names, class_names, max_depth, root, PREVIEW_DPI)
+    st.image(f"data:image/png;base64,{preview}", use_container_width=True)
+    st.download_button(
+        label="💾 Unduh Pohon Keputusan (PNG)",
+        # Gambar resolusi tinggi baru dibuat ketika tombol diklik
+        data=lambda: base64.b64decode(
+            render_tree_image(fingerprint, model, feature_names, class_names, max_depth, root, DOWNLOAD_DPI)
+        ),
+        file_name="pohon_keputusan_c45.png",
+        mime="image/png"
+    )
+
 def explain_tree_visual(class_names):
     """Fungsi untuk menampilkan penjelasan visual pohon keputusan."""
     st.markdown("#### 📖 Cara Membaca Pohon Keputusan (Seperti Flowchart!)")
@@ -103,38 +203,16 @@ def explain_tree_visual(class_names):
             </div>
             """, unsafe_allow_html=True)
 
-def get_rules_list(model, feature_names, class_names):
-    """Mengambil semua aturan dari pohon dan mengembalikannya dalam format yang mudah dibaca."""
-    tree_ = model.tree_
-    
-    feature_name = [
-        feature_names[i] if i != -2 else "Tidak ada"
-        for i in tree_.feature
-    ]
-    
-    rules = []
-    
-    def get_rule_paths(node_idx, path):
-        if tree_.feature[node_idx] == -2:
-            class_index = tree_.value[node_idx].argmax()
-            class_name = class_names[class_index]
-            rules.append((path, class_name))
-        else:
-            left_child = tree_.children_left[node_idx]
-            threshold = tree_.threshold[node_idx]
-            new_path_left = path + [f"{feature_name[node_idx]} ≤ {threshold:.2f}"]
-            get_rule_paths(left_child, new_path_left)
-
-            right_child = tree_.children_right[node_idx]
-            threshold = tree_.threshold[node_idx]
-            new_path_right = path + [f"{feature_name[node_idx]} > {threshold:.2f}"]
-            get_rule_paths(right_child, new_path_right)
-    
-    get_rule_paths(0, [])
-    return rules
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_rule_index(fingerprint, _model, feature_names, class_names):
+    """Indeks aturan dibuat sekali per model (berdasarkan fingerprint) dan dibagi antar sesi."""
+    return RuleIndex(_model.tree_, feature_names, class_names, _model.classes_)
 
 def display_attractive_rules(rules):
-    """Menampilkan aturan model dalam format alur yang menarik dengan card."""
+    """
+    Menampilkan aturan model dalam format alur yang menarik dengan card.
+    `rules` berisi (nomor aturan, langkah-langkah, hasil).
+    """
     color_map = {
         'Baik': {'bg': '#e8f5e9', 'border': '#4caf50', 'text': '#1b5e20'},
         'Sedang': {'bg': '#fff3e0', 'border': '#ff9800', 'text': '#e65100'},
@@ -143,11 +221,11 @@ def display_attractive_rules(rules):
         'Berbahaya': {'bg': '#e0e0e0', 'border': '#212121', 'text': '#212121'}
     }
     
-    for i, (path, result) in enumerate(rules[:10]):
+    for number, path, result in rules:
         colors = color_map.get(result, {'bg': '#f0f2f6', 'border': '#ccc', 'text': '#333'})
         
         with st.expander(
-            f"Alur Keputusan #{i+1} - Prediksi: **{result}**"
+            f"Alur Keputusan #{number} - Prediksi: **{result}**"
         ):
             st.markdown(
                 f'<div style="background-color: {colors["bg"]}; border-left: 5px solid {colors["border"]}; padding: 10px; border-radius: 5px; color: {colors["text"]};">'
@@ -173,9 +251,346 @@ def display_attractive_rules(rules):
             """, unsafe_allow_html=True)
             
             st.markdown("</div>", unsafe_allow_html=True)
-            
-    if len(rules) > 10:
-        st.info(f"Masih ada {len(rules) - 10} alur keputusan lainnya. Model ini sangat detail!")
+
+def show_rule_pages(rule_index, per_page=10):
+    """Menampilkan semua aturan per halaman; hanya aturan pada halaman aktif yang diformat."""
+    n_pages = rule_index.n_pages(per_page)
+    if n_pages > 1:
+        st.caption(f"Model ini memiliki {len(rule_index)} alur keputusan yang dibagi menjadi {n_pages} halaman.")
+        page = st.number_input("Halaman Aturan", min_value=1, max_value=n_pages, value=1, step=1, key="rule_page") - 1
+    else:
+        page = 0
+    display_attractive_rules(rule_index.page(page, per_page))
+
+def current_data_hash():
+    """Hash isi dataset yang tersimpan (None jika belum ada dataset)."""
+    return load_meta()['content_hash'] if dataset_exists() else None
+
+def saved_model_exists():
+    return model_registry.active_version() is not None
+
+def load_active_model():
+    """Isi versi model aktif dari registry (melalui cache tingkat proses)."""
+    return load_model_data(model_registry.active_model_path())
+
+def save_trained_model(model, params, feature_names, class_names, y_test, y_pred, test_size=None, train_time=None,
+                       pruning=None, data_hash=None, scaler=None):
+    """
+    Menyimpan model sebagai versi baru di registry; sesi saat ini memegang referensi ke versi tersebut.
+    Metrik evaluasi dihitung di sini sekali dan ikut disimpan di file model,
+    bersama hash dataset agar model yang tertinggal dari datanya bisa dikenali.
+    `scaler` dan `data_hash` harus milik data tempat model dilatih; tanpa keduanya dipakai
+    dataset saat ini (hanya untuk model yang baru dilatih pada rerun ini).
+    """
+    metrics = evaluate_model(model, feature_names, class_names, y_test, y_pred)
+    data_hash = data_hash or current_data_hash()
+    if scaler is None:
+        scaler = st.session_state.dataset_ref.value['scaler']
+
+    # Simpan SEMUA objek penting ke satu versi model untuk persistensi
+    version = model_registry.save_model(
+        model, scaler, feature_names, class_names, params, metrics,
+        test_size=test_size, train_time=train_time, data_hash=data_hash, pruning=pruning
+    )
+
+    # Sesi hanya menyimpan referensi; isi model dibagi dengan sesi lain yang memakai versi yang sama
+    st.session_state.model_ref = acquire_model(version)
+
+def show_stale_model_notice(dataset):
+    """Peringatan jika dataset berubah sejak model tersimpan dilatih, dengan opsi latih ulang."""
+    if not saved_model_exists():
+        return
+    try:
+        saved_hash = load_active_model().get('data_hash')
+    except Exception:
+        return
+    if saved_hash is None or saved_hash == dataset['meta']['content_hash']:
+        return
+    st.warning("⚠️ Dataset telah berubah sejak model terakhir dilatih.")
+    can_retrain = saved_model_params() is not None
+    if st.button("🔁 Latih Ulang dengan Parameter Terakhir", use_container_width=True, disabled=not can_retrain):
+        try:
+            with st.spinner('⏳ Melatih ulang model dengan data terbaru...'):
+                version = retrain_saved_model(dataset['data'], dataset['scaler'], dataset['meta']['content_hash'])
+            st.session_state.model_ref = acquire_model(version)
+        except Exception as e:
+            st.error(f"❌ Terjadi kesalahan saat melatih ulang model: {str(e)}")
+            return
+        st.rerun()
+
+def algorithm_label(params):
+    label = CRITERION_LABELS.get(params.get('criterion'), '-')
+    n_estimators = params.get('n_estimators', 1)
+    return f"{label} × {n_estimators} pohon" if n_estimators > 1 else label
+
+def show_pruning_path(model_data, fingerprint):
+    """
+    Akurasi data uji terhadap ukuran pohon di sepanjang jalur pemangkasan.
+    Ukuran pohon lain dihitung dari jalur tersimpan dan bisa disimpan tanpa melatih ulang.
+    """
+    pruning = model_data.get('pruning')
+    if pruning is None:
+        return
+    path, accuracy, current = pruning['path'], pruning['accuracy'], pruning['step']
+    param_label = "ccp_alpha" if path.method == "ccp" else "Confidence Factor"
+
+    st.markdown("---")
+    st.subheader("✂️ Jalur Pemangkasan")
+    st.info(f"Pohon penuh ({path.node_count[0]} node) ditumbuhkan sekali lalu dipangkas bertahap dengan metode "
+            f"{PRUNING_METHODS[path.method]}. Geser untuk melihat ukuran pohon lain beserta akurasinya tanpa melatih ulang.")
+    table = pd.DataFrame({
+        'Jumlah Node': path.node_count,
+        'Jumlah Daun': path.n_leaves,
+        'Kedalaman': path.depth,
+        'Akurasi': accuracy,
+        param_label: path.params,
+    })
+    st.line_chart(table, x='Jumlah Node', y='Akurasi')
+
+    node_count = path.node_count
+    step = st.select_slider("Ukuran Pohon", options=list(range(path.n_steps)), value=current,
+                            format_func=lambda s: f"{node_count[s]} node", key=f"pruning_step_{fingerprint}")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Jumlah Node", int(node_count[step]), delta=int(node_count[step] - node_count[current]) or None,
+                delta_color="inverse")
+    col2.metric("Kedalaman", int(path.depth[step]))
+    col3.metric("Akurasi Data Uji", f"{accuracy[step]*100:.2f}%",
+                delta=f"{(accuracy[step] - accuracy[current])*100:+.2f}%" if step != current else None)
+    col4.metric(param_label, "-" if np.isnan(path.params[step]) else f"{path.params[step]:.4g}")
+
+    if st.button("💾 Simpan Pohon Ukuran Ini sebagai Versi Baru", use_container_width=True, disabled=step == current):
+        with stage(PAGE, "simpan pohon terpangkas"):
+            model, step_params, pruning, y_test, y_pred = select_step(pruning, step)
+            save_trained_model(model, {**model_data['params'], **step_params}, model_data['feature_names'],
+                               model_data['class_names'], y_test, y_pred, model_data.get('test_size'),
+                               model_data.get('train_time'), pruning, model_data.get('data_hash'),
+                               scaler=model_data['scaler'])
+        st.rerun()
+
+def portable_model_file(version):
+    """
+    Fungsi pembuat isi tombol unduh: file portabel dibuat (jika belum ada) dan dibaca
+    hanya saat tombol diklik, bukan di setiap rerun.
+    """
+    def generate():
+        with stage(PAGE, "ekspor model portabel"):
+            with open(model_registry.ensure_portable(version), "rb") as f:
+                return f.read()
+    return generate
+
+def show_model_versions():
+    """Riwayat versi model di registry, dengan opsi mengaktifkan versi lain (rollback)."""
+    versions = model_registry.list_versions()
+    if not versions:
+        return
+    active = model_registry.active_version()
+    with st.expander(f"🗂️ Riwayat Versi Model ({len(versions)} versi)", expanded=False):
+        table = pd.DataFrame([{
+            'Versi': v['version'],
+            'Aktif': '✅' if v['version'] == active else '',
+            'Dibuat': pd.to_datetime(v['created_at'], unit='s').strftime('%Y-%m-%d %H:%M:%S'),
+            'Algoritma': algorithm_label(v.get('params') or {}),
+            'Akurasi': (v.get('metrics') or {}).get('accuracy'),
+            'Jumlah Node': v.get('node_count'),
+            'Waktu Latih (s)': v.get('train_time'),
+        } for v in versions])
+        st.dataframe(table, use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            selected = st.selectbox("Pilih versi", table['Versi'].tolist(), key="model_version_select")
+            if st.button("↩️ Aktifkan Versi Ini", use_container_width=True, disabled=selected == active):
+                model_registry.activate_version(selected)
+                st.session_state.model_ref = None
+                st.rerun()
+            # File portabel: array pohon + parameter scaler, dapat dimuat hanya dengan NumPy (lihat core.portable)
+            st.download_button(
+                label="💾 Unduh Model Portabel (.npz)",
+                data=portable_model_file(selected),
+                file_name=f"model_{selected}.npz",
+                mime="application/octet-stream",
+                on_click="ignore",
+                use_container_width=True
+            )
+        with col2:
+            st.caption("Kembali ke versi yang aktif sebelum versi saat ini.")
+            if st.button("⏪ Rollback ke Versi Sebelumnya", use_container_width=True,
+                         disabled=len(model_registry.load_manifest()['history']) < 2):
+                model_registry.rollback()
+                st.session_state.model_ref = None
+                st.rerun()
+
+def restore_saved_model():
+    """
+    Memulihkan model aktif dari registry agar hasil tetap tampil setelah aplikasi dimulai ulang
+    atau setelah versi aktif diganti.
+    """
+    version = model_registry.active_version()
+    if version is None:
+        return
+    current = st.session_state.get('model_ref')
+    if current is not None and current.key == model_key(version):
+        return
+    try:
+        with stage(PAGE, "muat model"):
+            ref = acquire_model(version)
+    except Exception:
+        return
+    if ref.value.get('metrics') is None or ref.value.get('model') is None:
+        ref.release()
+        return
+    st.session_state.model_ref = ref
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_confusion_matrix(cm, class_names, title='Confusion Matrix'):
+    """
+    Heatmap confusion matrix di-cache sebagai PNG berdasarkan isi matriksnya, sehingga
+    model yang sama dengan data uji berbeda tidak memakai gambar lama.
+    """
+    import matplotlib.pyplot as plt
+
+    fig = plot_confusion_matrix(cm, list(class_names), title)
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches='tight', dpi=100)
+    plt.close(fig)
+    return buf.getvalue()
+
+def plot_confusion_matrix(cm, class_names, title='Confusion Matrix'):
+    """Membuat heatmap confusion matrix."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=class_names, yticklabels=class_names, ax=ax)
+    ax.set_xlabel('Prediksi')
+    ax.set_ylabel('Aktual')
+    ax.set_title(title)
+    return fig
+
+def show_cross_validation(X, y, label_encoder, params):
+    """Evaluasi stratified k-fold paralel untuk konfigurasi model yang sedang dipilih."""
+    with st.expander("🔁 Validasi Silang Stratified K-Fold (Paralel)", expanded=False):
+        st.info("""
+        Satu pembagian data uji bisa menghasilkan akurasi yang kebetulan tinggi atau rendah.
+        Validasi silang melatih model pada beberapa fold berbeda (dijalankan paralel) dengan konfigurasi
+        di atas, lalu melaporkan rata-rata dan simpangan baku metriknya.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            n_splits = st.number_input("Jumlah Fold (k)", min_value=2, max_value=20, value=5, step=1)
+        with col2:
+            n_repeats = st.number_input("Jumlah Pengulangan", min_value=1, max_value=10, value=1, step=1)
+
+        if st.button("🔁 Jalankan Validasi Silang", use_container_width=True):
+            min_class = int(np.bincount(y).min())
+            if min_class < n_splits:
+                st.error(f"❌ Kelas terkecil hanya memiliki {min_class} data, kurangi jumlah fold menjadi paling banyak {min_class}.")
+                return
+            with st.spinner(f"⏳ Melatih {int(n_splits) * int(n_repeats)} fold secara paralel..."):
+                with stage(PAGE, "validasi silang"):
+                    st.session_state.cv_result = cross_validate(params, X, y, int(n_splits), int(n_repeats))
+                st.session_state.cv_params = params
+
+        result = st.session_state.get('cv_result')
+        if result is None:
+            return
+        if st.session_state.get('cv_params') != params:
+            st.caption("ℹ️ Hasil di bawah berasal dari konfigurasi sebelumnya. Jalankan ulang untuk konfigurasi saat ini.")
+
+        class_names = label_encoder.classes_.tolist()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rata-rata Akurasi", f"{result['accuracy_mean']*100:.2f}%")
+        col2.metric("Simpangan Baku", f"± {result['accuracy_std']*100:.2f}%")
+        col3.metric("Jumlah Fold", result['n_folds'])
+
+        st.markdown("**F1-score per Kategori**")
+        st.dataframe(pd.DataFrame({
+            'Kategori': class_names,
+            'F1 Rata-rata': result['f1_mean'],
+            'Simpangan Baku': result['f1_std'],
+        }).set_index('Kategori'))
+
+        st.markdown("**Confusion Matrix Gabungan Semua Fold**")
+        import matplotlib.pyplot as plt
+
+        fig = plot_confusion_matrix(result['confusion_matrix'], class_names, 'Confusion Matrix (Total K-Fold)')
+        st.pyplot(fig)
+        # Figure dilepas agar tidak menumpuk di pyplot setiap rerun
+        plt.close(fig)
+
+def show_parameter_sweep(X, y, label_encoder, test_size):
+    """Melatih banyak kombinasi parameter sekaligus secara paralel dan membandingkan hasilnya."""
+    with st.expander("🔬 Pencarian Parameter Terbaik (Paralel)", expanded=False):
+        st.info(f"""
+        Semua kombinasi kedalaman pohon, minimum sampel per daun, dan kriteria split dilatih sekaligus
+        di {os.cpu_count() or 1} inti CPU. Setiap kombinasi dievaluasi pada data uji yang sama.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            depth_range = st.slider("Rentang Kedalaman Pohon", 1, 20, (2, 12), 1)
+            leaf_options = st.multiselect("Minimum Sampel per Daun", [1, 2, 5, 10, 20], default=[1, 2, 5])
+        with col2:
+            criteria = st.multiselect(
+                "Kriteria Split", CRITERIA, default=CRITERIA,
+                format_func=lambda c: CRITERION_LABELS[c]
+            )
+
+        grid = param_grid(range(depth_range[0], depth_range[1] + 1), leaf_options, criteria)
+        st.caption(f"Total kombinasi yang akan dilatih: {len(grid)}")
+
+        if st.button("⚡ Jalankan Pencarian Parameter", use_container_width=True, disabled=not grid):
+            with st.spinner(f"⏳ Melatih {len(grid)} model secara paralel..."):
+                X_train, X_test, y_train, y_test = split_data(X, y, test_size)
+                start = time.perf_counter()
+                with stage(PAGE, "pencarian parameter"):
+                    results = run_sweep(grid, X_train, X_test, y_train, y_test)
+                elapsed = time.perf_counter() - start
+            st.session_state.sweep_results = results
+            dataset = st.session_state.dataset_ref.value
+            st.session_state.sweep_context = {
+                'X_test': X_test, 'y_test': y_test, 'label_encoder': label_encoder, 'test_size': test_size,
+                'data_hash': dataset['meta']['content_hash'], 'scaler': dataset['scaler'],
+            }
+            st.success(f"✅ {len(results)} model selesai dilatih dalam {elapsed:.2f} detik.")
+
+        results = st.session_state.get('sweep_results')
+        if not results:
+            return
+        # Hasil pencarian dari dataset sebelumnya (setelah unggah/tambah/hapus data) tidak boleh dipakai lagi
+        if st.session_state.sweep_context['data_hash'] != st.session_state.dataset_ref.value['meta']['content_hash']:
+            st.session_state.sweep_results = None
+            st.session_state.sweep_context = None
+            st.info("ℹ️ Dataset telah berubah sejak pencarian parameter terakhir. Jalankan ulang pencarian.")
+            return
+
+        table = pd.DataFrame([{k: v for k, v in r.items() if k != 'model'} for r in results])
+        table['criterion'] = table['criterion'].map(CRITERION_LABELS)
+        table = table.rename(columns={
+            'criterion': 'Kriteria', 'max_depth': 'Kedalaman Maks', 'min_samples_leaf': 'Min Sampel Daun',
+            'accuracy': 'Akurasi', 'node_count': 'Jumlah Node', 'n_leaves': 'Jumlah Daun',
+            'depth': 'Kedalaman Aktual', 'train_time': 'Waktu Latih (s)'
+        }).drop(columns=['pruning', 'confidence_factor'])
+        st.dataframe(table.sort_values(['Akurasi', 'Jumlah Node'], ascending=[False, True]), use_container_width=True)
+
+        chart = table.pivot_table(index='Kedalaman Maks', columns='Kriteria', values='Akurasi', aggfunc='max')
+        st.markdown("**Akurasi Terbaik per Kedalaman Pohon**")
+        st.line_chart(chart)
+
+        best = best_result(results)
+        st.markdown(
+            f"**Model terbaik:** {CRITERION_LABELS[best['criterion']]}, kedalaman maks {best['max_depth']}, "
+            f"min sampel daun {best['min_samples_leaf']} — akurasi {best['accuracy']*100:.2f}% "
+            f"dengan {best['node_count']} node."
+        )
+        if st.button("🏆 Gunakan Model Terbaik", use_container_width=True):
+            context = st.session_state.sweep_context
+            params = {k: best[k] for k in ('criterion', 'max_depth', 'min_samples_leaf', 'pruning', 'confidence_factor')}
+            y_pred = best['model'].predict(context['X_test'])
+            save_trained_model(best['model'], params, X.columns.tolist(), context['label_encoder'].classes_.tolist(),
+                               context['y_test'], y_pred, context['test_size'], best['train_time'],
+                               data_hash=context['data_hash'], scaler=context['scaler'])
+            st.success("🎉 Model terbaik berhasil disimpan dan siap digunakan untuk prediksi.")
+            st.rerun()
 
 def show():
     st.title("🌳 Penerapan Algoritma C4.5")
@@ -187,20 +602,22 @@ def show():
     """, unsafe_allow_html=True)
     
     # --- PENTING: Periksa ketersediaan data sebelum memulai ---
-    if 'normalized_data' not in st.session_state or st.session_state.normalized_data is None:
+    dataset_ref = st.session_state.get('dataset_ref')
+    if dataset_ref is None:
         st.warning("⚠️ Data yang dinormalisasi tidak ditemukan. Silakan unggah dan normalisasi data terlebih dahulu di halaman **'Upload Data'**.")
         return
-    if 'scaler' not in st.session_state or st.session_state.scaler is None:
+    if dataset_ref.value['scaler'] is None:
         st.warning("⚠️ Objek scaler tidak ditemukan. Pastikan Anda telah menormalisasi data di halaman **'Upload Data'**.")
         return
     
-    # Ambil data dari session state
-    df_normalized = st.session_state.normalized_data
+    # Ambil data dari penyimpanan bersama (satu salinan untuk semua sesi)
+    df_normalized = dataset_ref.value['data']
     
-    # Memisahkan fitur (X) dan target (y)
+    # Memisahkan fitur (X) dan target (y) yang sudah diubah menjadi numerik;
+    # hasilnya juga dibagi antar sesi yang memegang dataset yang sama
     try:
-        X = df_normalized.drop('Kategori Kualitas Udara', axis=1)
-        y = df_normalized['Kategori Kualitas Udara']
+        with stage(PAGE, "siapkan data"):
+            X, y_encoded, label_encoder = dataset_ref.derived('prepared', lambda d: prepare_data(d['data']))
     except KeyError:
         st.error("❌ Kolom 'Kategori Kualitas Udara' tidak ditemukan dalam data.")
         return
@@ -211,91 +628,112 @@ def show():
         st.dataframe(df_normalized.head(10))
         st.info(f"Menampilkan 10 dari {len(df_normalized)} baris data")
     
+    show_stale_model_notice(dataset_ref.value)
+
     st.markdown("---")
     st.subheader("⚙️ Konfigurasi Model & Pelatihan")
     
     col1, col2 = st.columns([1, 2])
     with col1:
+        algorithm_label = st.selectbox("Algoritma", list(ALGORITHMS.keys()))
+        criterion = ALGORITHMS[algorithm_label]
         test_size = st.slider("Ukuran Data Uji (%)", 10, 50, 20, 5) / 100
         max_depth = st.slider("Kedalaman Maksimum Pohon", 1, 20, 7, 1)
+        # Nilai bawaan mengikuti kriteria: 2 untuk C4.5, 1 (bawaan scikit-learn) untuk entropy/gini
+        min_samples_leaf = st.number_input("Minimum Sampel per Daun", min_value=1, max_value=50,
+                                           value=default_min_samples_leaf(criterion), step=1,
+                                           key=f"min_samples_leaf_{criterion}")
+        if criterion == "gain_ratio":
+            pruning = st.checkbox("Pangkas pohon (pessimistic error pruning)", value=True)
+            confidence_factor = st.slider("Confidence Factor Pemangkasan", 0.05, 0.50, 0.25, 0.05,
+                                          disabled=not pruning)
+        else:
+            pruning, confidence_factor = False, 0.25
+        ensemble = st.checkbox("🌲 Mode Ensemble (banyak pohon)", value=False,
+                               help="Melatih banyak pohon secara paralel dan menggabungkan suaranya.")
+        if ensemble:
+            n_estimators = st.slider("Jumlah Pohon", 5, 100, 25, 5)
+            bootstrap, max_features = ENSEMBLE_METHODS[st.selectbox("Metode Ensemble", list(ENSEMBLE_METHODS.keys()))]
+        pruning_method = None
+        if not ensemble and st.checkbox("✂️ Hitung Jalur Pemangkasan", value=False,
+                                        help="Pohon ditumbuhkan penuh sekali; ukuran pohon bisa dipilih setelahnya "
+                                             "tanpa melatih ulang. Kedalaman maksimum menjadi batas atas."):
+            methods = list(PRUNING_METHODS) if criterion == "gain_ratio" else ["ccp"]
+            pruning_method = st.selectbox("Metode Pemangkasan", methods, format_func=PRUNING_METHODS.get)
+
+    params = {
+        'criterion': criterion,
+        'max_depth': max_depth,
+        'min_samples_leaf': int(min_samples_leaf),
+        'pruning': pruning,
+        'confidence_factor': confidence_factor,
+    }
+    if ensemble:
+        params.update(n_estimators=int(n_estimators), bootstrap=bootstrap, max_features=max_features)
+
+    with col2:
+        show_parameter_sweep(X, y_encoded, label_encoder, test_size)
+        show_cross_validation(X, y_encoded, label_encoder, params)
 
     if st.button("🚀 Latih dan Evaluasi Model C4.5", use_container_width=True):
         with st.spinner('⏳ Sedang melatih dan mengevaluasi model...'):
-            time.sleep(1) 
-            
-            # Mengubah label target menjadi numerik
-            label_encoder = LabelEncoder()
-            y_encoded = label_encoder.fit_transform(y)
-            
             # Membagi data menjadi data latih dan data uji
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y_encoded, test_size=test_size, random_state=42, stratify=y_encoded
-            )
+            X_train, X_test, y_train, y_test = split_data(X, y_encoded, test_size)
 
-            # Inisialisasi dan latih model Decision Tree
-            model = DecisionTreeClassifier(
-                criterion='entropy', 
-                max_depth=max_depth,
-                random_state=42
-            )
-            model.fit(X_train, y_train)
+            pruning = None
+            if pruning_method is not None:
+                # Pohon penuh sekali, lalu langkah terbaik dari jalur pemangkasan yang disimpan
+                with stage(PAGE, "latih pohon penuh & jalur pemangkasan"):
+                    pruning, train_time = train_with_path(params, pruning_method, X_train, y_train, X_test, y_test)
+                    model, step_params, pruning, y_test, y_pred = select_step(pruning, pruning['step'])
+                    params = {**params, **step_params}
+            else:
+                # Inisialisasi dan latih model Decision Tree
+                with stage(PAGE, "latih model"):
+                    model, train_time = train_model(params, X_train, y_train)
 
-            # Melakukan prediksi pada data uji
-            y_pred = model.predict(X_test)
-            
-            # Simpan SEMUA objek penting ke file tunggal untuk persistensi
-            if not os.path.exists("file"):
-                os.makedirs("file")
-            
-            model_and_metadata = {
-                'model': model,
-                'scaler': st.session_state.scaler, # Ambil scaler dari session state
-                'feature_names': X.columns.tolist(),
-                'class_names': label_encoder.classes_.tolist()
-            }
-            joblib.dump(model_and_metadata, MODEL_SAVE_FILE)
+                # Melakukan prediksi pada data uji
+                with stage(PAGE, "prediksi data uji"):
+                    y_pred = model.predict(X_test)
             
-            # Simpan model dan data penting ke session state untuk sesi saat ini
-            st.session_state.model = model
-            st.session_state.feature_names = X.columns.tolist()
-            st.session_state.label_encoder = label_encoder
-            st.session_state.class_names = label_encoder.classes_.tolist()
-            st.session_state.model_trained = True
-            st.session_state.y_test = y_test
-            st.session_state.y_pred = y_pred
+            with stage(PAGE, "evaluasi & simpan model"):
+                save_trained_model(model, params, X.columns.tolist(), label_encoder.classes_.tolist(), y_test, y_pred,
+                                   test_size, train_time, pruning)
             
-            st.success(f"🎉 Model dan Scaler berhasil dilatih, dievaluasi, dan disimpan dalam satu file! Model siap digunakan untuk prediksi.")
+            st.success(f"🎉 Model dan Scaler berhasil dilatih, dievaluasi, dan disimpan sebagai versi baru! Model siap digunakan untuk prediksi.")
             st.balloons()
             st.rerun()
 
-    if st.session_state.get('model_trained', False) and st.session_state.get('y_test') is not None:
-        model = st.session_state.model
-        feature_names = st.session_state.feature_names
-        class_names = st.session_state.class_names
-        y_test = st.session_state.y_test
-        y_pred = st.session_state.y_pred
+    show_model_versions()
+    restore_saved_model()
 
-        # Hitung metrik evaluasi
-        accuracy = accuracy_score(y_test, y_pred)
-        
-        report = classification_report(y_test, y_pred, target_names=class_names, labels=np.arange(len(class_names)), output_dict=True)
-        cm = confusion_matrix(y_test, y_pred)
+    if st.session_state.get('model_ref') is not None:
+        model_data = st.session_state.model_ref.value
+        model = model_data['model']
+        feature_names = model_data['feature_names']
+        class_names = model_data['class_names']
+        fingerprint = tree_fingerprint(model)
+
+        # Metrik sudah dihitung saat pelatihan, di sini hanya ditampilkan
+        metrics = model_data['metrics']
+        accuracy = metrics['accuracy']
+        report = metrics['report']
+        cm = metrics['confusion_matrix']
         
+        show_pruning_path(model_data, fingerprint)
+
         st.markdown("---")
         st.subheader("🌿 Visualisasi Pohon Keputusan")
         st.info("Pohon ini adalah hasil 'belajar' dari data yang Anda unggah. Gunakan penjelasan di samping untuk membacanya.")
+        if hasattr(model, 'trees_'):
+            st.caption(f"Model ensemble dengan {len(model.trees_)} pohon: gambar dan aturan di bawah berasal dari "
+                       f"pohon perwakilan (#{model.representative_ + 1}), sedangkan prediksi dan tingkat kepentingan "
+                       "fitur merupakan gabungan semua pohon.")
         
         col1, col2 = st.columns([2, 1])
         with col1:
             try:
-                tree_img = get_tree_image(model, feature_names, class_names)
-                st.image(f"data:image/png;base64,{tree_img}", use_container_width=True)
-                st.download_button(
-                    label="💾 Unduh Pohon Keputusan (PNG)",
-                    data=base64.b64decode(tree_img),
-                    file_name="pohon_keputusan_c45.png",
-                    mime="image/png"
-                )
+                show_tree_visual(model, feature_names, class_names)
             except Exception as e:
                 st.error(f"❌ Terjadi kesalahan saat membuat visualisasi pohon: {e}")
         with col2:
@@ -306,8 +744,9 @@ def show():
         Model C4.5 mengambil keputusan berdasarkan serangkaian aturan. Klik pada setiap alur keputusan di bawah untuk melihat detail langkahnya.
         """)
         
-        rules = get_rules_list(model, feature_names, class_names)
-        display_attractive_rules(rules)
+        with stage(PAGE, "indeks aturan"):
+            rule_index = get_rule_index(fingerprint, model, tuple(feature_names), tuple(class_names))
+        show_rule_pages(rule_index)
         
         st.subheader("📊 Tingkat Kepentingan Fitur")
         st.info("""
@@ -316,10 +755,7 @@ def show():
         """)
         
         with st.expander("Klik untuk melihat Detail Feature Importance", expanded=True):
-            feature_importance = pd.DataFrame({
-                'Fitur': feature_names,
-                'Kepentingan': model.feature_importances_
-            }).sort_values('Kepentingan', ascending=False)
+            feature_importance = pd.DataFrame(metrics['feature_importance'])
             
             st.dataframe(feature_importance)
             st.bar_chart(feature_importance.set_index('Fitur'))
@@ -331,7 +767,7 @@ def show():
         with col1:
             st.metric(label="Akurasi Model pada Data Uji", value=f"{accuracy*100:.2f}%")
         with col2:
-            st.metric(label="Jumlah Data Uji", value=len(y_test))
+            st.metric(label="Jumlah Data Uji", value=metrics['n_test'])
 
         st.markdown("#### Laporan Klasifikasi")
         st.info("Tabel di bawah ini menampilkan metrik evaluasi utama seperti precision, recall, dan f1-score untuk setiap kategori.")
@@ -344,11 +780,8 @@ def show():
 
         conf_matrix_col1, conf_matrix_col2, conf_matrix_col3 = st.columns([1, 2, 1])
         with conf_matrix_col2:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=class_names, yticklabels=class_names, ax=ax)
-            ax.set_xlabel('Prediksi')
-            ax.set_ylabel('Aktual')
-            ax.set_title('Confusion Matrix')
-            st.pyplot(fig, use_container_width=True)
+            with stage(PAGE, "heatmap confusion matrix"):
+                heatmap = render_confusion_matrix(np.asarray(cm), tuple(class_names))
+            st.image(heatmap, use_container_width=True)
     else:
         st.info("ℹ️ Silakan klik tombol '🚀 Latih dan Evaluasi Model C4.5' di atas untuk memulai pelatihan menggunakan data yang telah diunggah.")
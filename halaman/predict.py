@@ -1,12 +1,27 @@
 # pages/predict.py
 import streamlit as st
 import pandas as pd
-import joblib
 import os
-import time
+import tempfile
+from core.model_cache import load_model_data, get_derived, cache_stats
+from core.batch_predict import predict_csv, DEFAULT_CHUNKSIZE
+from core.tree_engine import compile_model
+from core.rules import RuleIndex
+from core import model_registry
+from core import streaming
+from core.service import ModelHandle
+from core.profiling import stage
 
-# Nama file tempat model dan metadata disimpan
-MODEL_SAVE_FILE = "file/model_and_scaler_data.pkl"
+# Nama halaman pada log profiling
+PAGE = "Prediksi Kualitas Udara"
+
+# Interval (detik) pembaruan tampilan streaming tanpa menjalankan ulang seluruh halaman
+STREAM_REFRESH_SECONDS = 1.0
+STREAM_SOURCES = {
+    "Replay Data Tersimpan": "replay",
+    "Ikuti File CSV (tail)": "tail",
+    "Socket TCP (JSON per baris)": "socket",
+}
 
 def get_form_values():
     """
@@ -21,6 +36,213 @@ def get_form_values():
     kecepatan_angin = st.session_state.get('last_kecepatan_angin', 2.0)
     return co, pm10, no2, suhu, kelembaban, kecepatan_angin
 
+def get_compiled_tree(model_path):
+    """Pohon (atau ensemble) terkompilasi dibuat sekali per versi model dan dibagi antar sesi."""
+    return get_derived(
+        model_path, 'compiled_tree',
+        lambda data: compile_model(data['model'], data['scaler'])
+    )
+
+def get_rule_index(model_path):
+    """Indeks aturan dibuat sekali per versi model untuk menampilkan aturan yang dipakai."""
+    return get_derived(
+        model_path, 'rule_index',
+        lambda data: RuleIndex(data['model'].tree_, data['feature_names'], data['class_names'],
+                               data['model'].classes_)
+    )
+
+def show_fired_rule(rule_index, leaf, normalized_values, feature_names, n_trees=None):
+    """Menampilkan aturan (jalur keputusan) yang menghasilkan prediksi untuk input ini."""
+    st.subheader(f"🧭 Aturan yang Digunakan (Alur Keputusan #{rule_index.rule_number[leaf]})")
+    if n_trees:
+        st.caption(f"Model ensemble: aturan berikut berasal dari pohon perwakilan, sedangkan prediksi di atas "
+                   f"adalah suara gabungan {n_trees} pohon.")
+    values = dict(zip(feature_names, normalized_values))
+    steps = rule_index.conditions(leaf)
+    if not steps:
+        st.info("Model hanya memiliki satu daun, sehingga semua input menghasilkan kategori yang sama.")
+        return
+    for step_num, (feature_name, operator, threshold) in enumerate(steps):
+        operator_text = 'kurang dari atau sama dengan' if operator == '≤' else 'lebih dari'
+        st.markdown(
+            f"➡️ **Langkah {step_num+1}:** **{feature_name}** {operator_text} {threshold:.2f} "
+            f"(nilai ternormalisasi Anda: {values[feature_name]:.2f})"
+        )
+
+def read_result(path):
+    """Fungsi pembuat isi tombol unduh: file hasil baru dibaca saat tombol diklik, bukan di setiap rerun."""
+    def generate():
+        with open(path, "rb") as f:
+            return f.read()
+    return generate
+
+def show_batch_prediction(model_path, model, scaler, feature_names, class_names):
+    """Mode prediksi massal: unggah CSV, prediksi per potongan, lalu unduh hasilnya."""
+    st.subheader("📦 Prediksi Massal dari File CSV")
+    st.info(f"""
+    Unggah file CSV yang berisi kolom berikut: `{', '.join(feature_names)}`.
+    File diproses per potongan sehingga file berukuran besar tetap dapat diprediksi.
+    Baris dengan nilai kosong atau bukan angka akan dilewati (kolom prediksi dikosongkan).
+    """)
+
+    uploaded_file = st.file_uploader("Pilih file CSV data pemantauan", type="csv", key="batch_uploader")
+    chunksize = st.number_input("Jumlah baris per potongan", min_value=1_000, max_value=1_000_000,
+                                value=DEFAULT_CHUNKSIZE, step=10_000)
+
+    if uploaded_file is not None and st.button("🔍 Prediksi Semua Data", use_container_width=True):
+        progress_text = st.empty()
+        # Hasil ditulis ke file sementara di disk, bukan disimpan di memori
+        output = tempfile.NamedTemporaryFile(prefix="prediksi_", suffix=".csv", delete=False)
+        output.close()
+        try:
+            with st.spinner("⏳ Sedang memprediksi data..."), stage(PAGE, "prediksi massal"):
+                summary = predict_csv(
+                    uploaded_file, output.name, model, scaler, feature_names, class_names,
+                    chunksize=int(chunksize), predict_fn=get_compiled_tree(model_path).predict,
+                    rule_index=get_rule_index(model_path), apply_fn=get_compiled_tree(model_path).apply,
+                    progress=lambda n: progress_text.text(f"{n} baris telah diproses...")
+                )
+        except Exception as e:
+            os.remove(output.name)
+            st.error(f"❌ Terjadi kesalahan saat memproses file: {e}")
+            return
+
+        old_path = st.session_state.get('batch_result_path')
+        if old_path and os.path.exists(old_path):
+            os.remove(old_path)
+        st.session_state['batch_result_path'] = output.name
+        st.session_state['batch_summary'] = summary
+
+    summary = st.session_state.get('batch_summary')
+    result_path = st.session_state.get('batch_result_path')
+    if summary is not None and result_path and os.path.exists(result_path):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Jumlah Baris", summary['rows'])
+        col2.metric("Berhasil Diprediksi", summary['valid'])
+        col3.metric("Dilewati", summary['invalid'])
+
+        st.markdown("**Distribusi Hasil Prediksi**")
+        st.bar_chart(pd.Series(summary['counts'], name="Jumlah"))
+
+        st.download_button(
+            label="💾 Unduh Hasil Prediksi (CSV)",
+            data=read_result(result_path),
+            file_name="hasil_prediksi.csv",
+            mime="text/csv",
+            on_click="ignore",
+            use_container_width=True
+        )
+
+def start_stream(source, options, window_seconds, max_batch, max_wait, feature_names, scaler):
+    """Menghentikan stream lama (jika ada) lalu memulai stream baru di thread latar."""
+    stop_stream()
+    factory = {
+        "replay": lambda: streaming.replay_source(feature_names, scaler, rate=options['rate'],
+                                                  n_stations=options['stations'], loop=options['loop']),
+        "tail": lambda: streaming.tail_csv_source(feature_names, options['path'], from_start=options['from_start']),
+        "socket": lambda: streaming.socket_source(feature_names, options['host'], options['port']),
+    }[source]
+    processor = streaming.StreamProcessor(ModelHandle().current, window_seconds=window_seconds,
+                                          max_batch=max_batch, max_wait=max_wait)
+    st.session_state['stream_runner'] = streaming.StreamRunner(processor, factory)
+
+def stop_stream():
+    runner = st.session_state.pop('stream_runner', None)
+    if runner is not None:
+        runner.stop()
+
+@st.fragment(run_every=STREAM_REFRESH_SECONDS)
+def show_stream_live():
+    """Tampilan live: hanya fragmen ini yang dijalankan ulang setiap interval."""
+    runner = st.session_state.get('stream_runner')
+    if runner is None:
+        st.info("ℹ️ Stream belum berjalan. Atur sumber data lalu tekan **Mulai Stream**.")
+        return
+    snapshot = runner.snapshot()
+    if snapshot['error']:
+        st.error(f"❌ Stream berhenti karena kesalahan: {snapshot['error']}")
+    elif not runner.running:
+        st.warning("⏹️ Stream selesai atau dihentikan.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Throughput", f"{snapshot['throughput']:,.0f} baris/s")
+    p50, p95 = snapshot['latency_ms_p50'], snapshot['latency_ms_p95']
+    col2.metric("Latensi p50", f"{p50:.1f} ms" if p50 is not None else "-")
+    col3.metric("Latensi p95", f"{p95:.1f} ms" if p95 is not None else "-")
+    col4.metric("Total Diprediksi", f"{snapshot['rows']:,}")
+    st.caption(f"{snapshot['batches']:,} micro-batch (rata-rata {snapshot['mean_batch_rows']:.1f} baris), "
+               f"{snapshot['invalid']:,} pembacaan tidak valid dilewati, antrean: {snapshot['queue_depth']}. "
+               f"Versi model: `{snapshot['model_version']}`")
+
+    if snapshot['stations']:
+        counts = pd.DataFrame.from_dict(snapshot['stations'], orient='index', columns=snapshot['class_names'])
+        counts.index.name = streaming.STATION_COLUMN
+        st.markdown("**Jumlah Kategori per Stasiun (jendela bergulir)**")
+        st.bar_chart(counts)
+        st.dataframe(counts, use_container_width=True)
+    if snapshot['recent']:
+        st.markdown("**Prediksi Terbaru**")
+        st.dataframe(pd.DataFrame(snapshot['recent'], columns=[streaming.STATION_COLUMN, "Prediksi", "Latensi (ms)"]),
+                     use_container_width=True, hide_index=True)
+
+def show_streaming(feature_names, scaler):
+    """Mode streaming: pembacaan sensor dari sumber lokal diprediksi terus-menerus per micro-batch."""
+    st.subheader("📡 Prediksi Streaming Data Sensor")
+    st.info(f"""
+    Pembacaan sensor dari sumber lokal diprediksi terus-menerus dalam micro-batch.
+    File CSV dan socket menerima kolom `{', '.join(feature_names)}` (nilai asli, belum dinormalisasi)
+    serta kolom opsional `{streaming.STATION_COLUMN}`. Socket menerima satu objek JSON per baris.
+    """)
+
+    source_label = st.selectbox("Sumber Data", list(STREAM_SOURCES))
+    source = STREAM_SOURCES[source_label]
+    options = {}
+    if source == "replay":
+        col1, col2 = st.columns(2)
+        options['rate'] = col1.number_input("Laju (pembacaan/detik)", min_value=1.0, max_value=100_000.0,
+                                            value=streaming.DEFAULT_RATE, step=10.0)
+        options['stations'] = col2.number_input("Jumlah Stasiun", min_value=1, max_value=50,
+                                                value=streaming.DEFAULT_STATIONS)
+        options['loop'] = st.checkbox("Ulangi data setelah selesai", value=True)
+        st.caption("Data tersimpan dikembalikan ke satuan asli dengan scaler model lalu dibagi bergiliran ke setiap stasiun.")
+    elif source == "tail":
+        options['path'] = st.text_input("Path File CSV", value=os.path.join(streaming.TAIL_DIR, "sensor_stream.csv"),
+                                        help=f"File harus berada di dalam folder `{streaming.TAIL_DIR}`.")
+        options['from_start'] = st.checkbox("Baca juga isi file yang sudah ada", value=False)
+    else:
+        col1, col2 = st.columns(2)
+        options['host'] = col1.text_input("Host", value="127.0.0.1", help="Hanya alamat loopback (koneksi lokal).")
+        options['port'] = int(col2.number_input("Port", min_value=1, max_value=65535, value=streaming.DEFAULT_PORT))
+
+    with st.expander("⚙️ Pengaturan Micro-batch dan Jendela", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        window_seconds = col1.number_input("Jendela Bergulir (detik)", min_value=1.0, max_value=3600.0,
+                                           value=streaming.DEFAULT_WINDOW, step=10.0)
+        max_batch = col2.number_input("Maks. Baris per Batch", min_value=1, max_value=100_000,
+                                      value=streaming.DEFAULT_MAX_BATCH, step=64)
+        max_wait_ms = col3.number_input("Maks. Tunggu Batch (ms)", min_value=0.0, max_value=1000.0,
+                                        value=streaming.DEFAULT_MAX_WAIT * 1000, step=5.0)
+
+    col1, col2 = st.columns(2)
+    if col1.button("▶️ Mulai Stream", use_container_width=True):
+        try:
+            # Batas sumber diperiksa di sini agar kesalahannya tampil sebelum thread stream dimulai
+            if source == "tail":
+                streaming.resolve_tail_path(options['path'])
+            elif source == "socket":
+                streaming.check_host(options['host'])
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            if source == "tail" and not os.path.exists(options['path']):
+                st.error(f"❌ File `{options['path']}` tidak ditemukan.")
+            else:
+                start_stream(source, options, window_seconds, int(max_batch), max_wait_ms / 1000, feature_names, scaler)
+    if col2.button("⏹️ Hentikan Stream", use_container_width=True):
+        stop_stream()
+
+    show_stream_live()
+
 def show():
     st.title("🔮 Prediksi Kualitas Udara")
     st.markdown("""
@@ -31,17 +253,21 @@ def show():
     </div>
     """, unsafe_allow_html=True)
     
-    # --- PENTING: Pemuatan model dari file tunggal ---
+    # --- PENTING: Pemuatan model versi aktif dari registry ---
     
-    # Cek apakah file model_and_scaler_data.pkl sudah ada
-    if not os.path.exists(MODEL_SAVE_FILE):
+    # Versi model aktif dibaca dari manifest registry; file versi tidak pernah ditimpa
+    version = model_registry.active_version()
+    if version is None:
         st.warning("⚠️ Model prediksi belum tersedia. Silakan latih model terlebih dahulu di halaman **'Penerapan Algoritma C4.5'**.")
         return
         
     # Muat model dan scaler dari file
     try:
         with st.spinner("⏳ Memuat model dan scaler dari file..."):
-            model_data = joblib.load(MODEL_SAVE_FILE)
+            # Model dimuat sekali per proses dan dibagi antar sesi, dari file portabel (tanpa unpickle scikit-learn)
+            model_path = model_registry.runtime_model_path(version)
+            with stage(PAGE, "muat model"):
+                model_data = load_model_data(model_path)
             model = model_data.get('model')
             scaler = model_data.get('scaler')
             feature_names = model_data.get('feature_names')
@@ -53,6 +279,15 @@ def show():
             return
 
         st.success("✅ Model dan Scaler berhasil dimuat dari file. Anda bisa melakukan prediksi.")
+        st.caption(f"Versi model aktif: `{version}`")
+
+        with st.expander("🗄️ Statistik Cache Model", expanded=False):
+            stats = cache_stats()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Cache Hit", stats['hits'])
+            col2.metric("Cache Miss", stats['misses'])
+            col3.metric("Hit Rate", f"{stats['hit_rate']*100:.1f}%")
+            st.caption(f"Model dimuat ulang {stats['reloads']} kali karena file model berubah.")
         
     except Exception as e:
         st.error(f"❌ Terjadi kesalahan saat memuat model dari file: {e}")
@@ -61,6 +296,14 @@ def show():
         
     # --- AKHIR LOGIKA PEMUATAN ---
 
+    mode = st.radio("Mode Prediksi", ["Satu Data", "Massal (CSV)", "Streaming Sensor"], horizontal=True)
+    if mode == "Massal (CSV)":
+        show_batch_prediction(model_path, model, scaler, feature_names, class_names)
+        return
+    if mode == "Streaming Sensor":
+        show_streaming(feature_names, scaler)
+        return
+
     # Ambil nilai awal untuk form
     co_val, pm10_val, no2_val, suhu_val, kelembaban_val, kecepatan_angin_val = get_form_values()
     
@@ -107,11 +350,12 @@ def show():
         # Buat dataframe input dengan nama kolom yang dimuat dari file
         input_data = pd.DataFrame([[co, pm10, no2, suhu, kelembaban, kecepatan_angin]], columns=feature_names) 
         
-        # Normalize input menggunakan scaler yang sudah dimuat
-        input_normalized = scaler.transform(input_data)
-        
-        # Make prediction
-        prediction_index = model.predict(input_normalized)[0]
+        # Normalisasi dan prediksi lewat pohon terkompilasi (hasil identik dengan scaler.transform + model.predict)
+        with stage(PAGE, "prediksi satu data"):
+            compiled = get_compiled_tree(model_path)
+            input_normalized = compiled.transform_row(input_values)
+            leaf = compiled.apply_row(input_normalized)
+            prediction_index = compiled.predict_row(input_normalized)
         prediction_label = class_names[prediction_index]
         
         # Show prediction result
@@ -160,6 +404,9 @@ def show():
         </div>
         """, unsafe_allow_html=True)
         
+        show_fired_rule(get_rule_index(model_path), leaf, input_normalized, feature_names,
+                        getattr(compiled, 'n_trees', None))
+
         # Show input parameters
         st.subheader("⚙️ Parameter Input yang Digunakan")
         st.dataframe(input_data.style.format("{:.2f}"))
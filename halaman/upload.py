@@ -1,28 +1,131 @@
 # pages/upload.py
 import streamlit as st
-import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-import time
 import os
 import joblib
-import io
+from core.dataset_store import dataset_exists, delete_dataset, migrate_csv
+from core.shared_store import acquire_dataset, acquire_model, detach_dataset
+from core.exports import read_export, FORMATS as EXPORT_FORMATS
+from core.dataset_stats import dataset_stats
+from core.ingest import ingest_csv, append_csv, MissingColumnsError, REQUIRED_COLUMNS
+from core.training import saved_model_params, retrain_saved_model
+from core.profiling import stage
+
+# Nama halaman pada log profiling
+PAGE = "Upload Data"
 
 # Folder untuk menyimpan file
 UPLOAD_DIR = "upload"
 FILE_DIR = "file"
+# File CSV lama; jika penyimpanan kolumnar belum ada, isinya disalin otomatis ke STORE_DIR
 DATA_FILE = os.path.join(UPLOAD_DIR, "persistent_data.csv")
 SCALER_FILE = os.path.join(FILE_DIR, "scaler.pkl")
 
-def normalize_data(df):
-    """Melakukan normalisasi data menggunakan MinMaxScaler."""
-    scaler = MinMaxScaler()
-    numeric_cols = ['CO (ppm)', 'PM10 (µg/m3)', 'NO2 (ppb)', 'Suhu (°C)', 'Kelembaban (%)', 'Kecepatan Angin (m/s)']
-    df_normalized = df.copy()
-    
-    # Memastikan hanya kolom numerik yang dinormalisasi
-    df_normalized[numeric_cols] = scaler.fit_transform(df[numeric_cols])
-    
-    return df_normalized, scaler
+def load_legacy_scaler():
+    """Scaler yang tersimpan di SCALER_FILE (dipakai saat migrasi dari CSV lama)."""
+    if not os.path.exists(SCALER_FILE):
+        return None
+    try:
+        return joblib.load(SCALER_FILE)
+    except Exception:
+        return None
+
+def load_persistent_data():
+    """
+    Memuat dataset ternormalisasi dari penyimpanan kolumnar (memory-mapped).
+    Dataset CSV lama dimigrasikan terlebih dahulu jika masih ada.
+    Mengembalikan SharedRef ke dataset bersama (dict berisi 'data', 'meta', dan 'scaler').
+    """
+    if not dataset_exists() and os.path.exists(DATA_FILE):
+        migrate_csv(DATA_FILE, load_legacy_scaler())
+    return acquire_dataset()
+
+def release_dataset():
+    """
+    Melepas referensi sesi ini ke dataset sebelum dataset diganti. Sesi lain yang masih
+    memegang dataset lama tetap membaca generasi lamanya sampai referensinya dilepas.
+    """
+    ref = st.session_state.get('dataset_ref')
+    st.session_state.dataset_ref = None
+    if ref is not None:
+        ref.release()
+    detach_dataset()
+
+def save_scaler(scaler):
+    if not os.path.exists(FILE_DIR):
+        os.makedirs(FILE_DIR)
+    joblib.dump(scaler, SCALER_FILE)
+
+def export_data(dataset, fmt):
+    """
+    Fungsi pembuat isi tombol unduh. Dijalankan hanya saat tombol diklik; file ekspor
+    di-cache berdasarkan hash dataset sehingga klik berikutnya tidak membuat ulang.
+    """
+    def generate():
+        with stage(PAGE, f"ekspor {fmt}"):
+            return read_export(dataset['data'], dataset['meta']['content_hash'], fmt)
+    return generate
+
+def show_append_data():
+    """Menambahkan data baru ke dataset yang ada (validasi, deduplikasi, lalu latih ulang opsional)."""
+
+    with st.expander("➕ Tambah Data Baru", expanded=False):
+        st.markdown("Unggah data pemantauan terbaru dengan kolom yang sama. Baris yang sudah ada atau tidak lengkap akan dilewati.")
+        append_file = st.file_uploader("Pilih file CSV tambahan", type="csv", key="append_uploader")
+        # Model lama (sebelum parameter ikut disimpan) tidak bisa dilatih ulang otomatis
+        can_retrain = saved_model_params() is not None
+        retrain = st.checkbox(
+            "🔁 Latih ulang model dengan parameter terakhir setelah data ditambahkan",
+            value=can_retrain, disabled=not can_retrain,
+            help=None if can_retrain else "Model tersimpan tidak memiliki parameter pelatihan. "
+                                          "Latih model di halaman 'Penerapan Algoritma C4.5'."
+        )
+        if append_file is None or not st.button("Tambahkan Data", use_container_width=True):
+            return
+        try:
+            # Lepas referensi ke dataset lama (memory-mapped) sebelum dataset diganti
+            release_dataset()
+            with st.spinner('🔄 Sedang memvalidasi dan menambahkan data...'):
+                with stage(PAGE, "tambah data"):
+                    _, scaler, summary = append_csv(append_file)
+            st.session_state.dataset_ref = acquire_dataset()
+            save_scaler(scaler)
+        except MissingColumnsError as e:
+            st.session_state.dataset_ref = acquire_dataset()
+            st.error(f"""
+                ❌ File CSV tidak memiliki kolom yang sesuai.
+                Kolom yang harus diunggah: `{', '.join(REQUIRED_COLUMNS)}`
+                Kolom yang hilang dari file Anda: `{', '.join(e.missing)}`
+            """)
+            return
+        except Exception as e:
+            st.session_state.dataset_ref = acquire_dataset()
+            st.error(f"❌ Terjadi kesalahan saat menambahkan data: {str(e)}")
+            return
+
+        st.success(
+            f"🎉 **{summary['added']} baris** baru ditambahkan dari {summary['read']} baris "
+            f"({summary['duplicates']} duplikat, {summary['invalid']} tidak lengkap dilewati)."
+        )
+        if summary['rescaled_columns']:
+            st.info(f"📏 Rentang normalisasi diperbarui untuk: {', '.join(summary['rescaled_columns'])}")
+        if summary['added'] == 0:
+            return
+        if retrain and can_retrain:
+            try:
+                with st.spinner('⏳ Melatih ulang model dengan data terbaru...'):
+                    with stage(PAGE, "latih ulang model"):
+                        dataset = st.session_state.dataset_ref.value
+                        version = retrain_saved_model(dataset['data'], dataset['scaler'], dataset['meta']['content_hash'])
+                st.session_state.model_ref = acquire_model(version)
+                accuracy = st.session_state.model_ref.value['metrics']['accuracy']
+            except Exception as e:
+                st.session_state.model_ref = None
+                st.error(f"❌ Data berhasil ditambahkan, tetapi terjadi kesalahan saat melatih ulang model: {str(e)}")
+                return
+            st.success(f"✅ Model dilatih ulang. Akurasi pada data uji: {accuracy*100:.2f}%")
+        else:
+            st.session_state.model_ref = None
+            st.info("ℹ️ Model akan ditandai perlu dilatih ulang di halaman **'Penerapan Algoritma C4.5'**.")
 
 def show():
     st.title("📤 Upload dan Normalisasi Data")
@@ -45,124 +148,126 @@ def show():
     """, unsafe_allow_html=True)
     
     # Inisialisasi session state jika belum ada
-    if 'normalized_data' not in st.session_state:
-        st.session_state.normalized_data = None
-    if 'scaler' not in st.session_state:
-        st.session_state.scaler = None
-    if 'model_trained' not in st.session_state:
-        st.session_state.model_trained = False
+    if 'dataset_ref' not in st.session_state:
+        st.session_state.dataset_ref = None
+    if 'model_ref' not in st.session_state:
+        st.session_state.model_ref = None
 
     # Logika baru: Muat data dari file jika ada dan session state kosong
-    if st.session_state.normalized_data is None and os.path.exists(DATA_FILE):
+    if st.session_state.dataset_ref is None and (dataset_exists() or os.path.exists(DATA_FILE)):
         st.info("✅ Data ditemukan di server. Memuat data secara otomatis...")
         try:
-            df_loaded = pd.read_csv(DATA_FILE)
-            st.session_state.normalized_data = df_loaded
-            
-            # Latih ulang scaler untuk data yang dimuat
-            X_loaded = df_loaded.drop('Kategori Kualitas Udara', axis=1, errors='ignore')
-            scaler = MinMaxScaler()
-            scaler.fit(X_loaded)
-            st.session_state.scaler = scaler
+            with stage(PAGE, "muat dataset"):
+                st.session_state.dataset_ref = load_persistent_data()
 
             st.success("🎉 Data berhasil dimuat dari file! Anda bisa melanjutkan ke halaman lain.")
         except Exception as e:
             st.error(f"❌ Terjadi kesalahan saat memuat data dari file: {e}")
-            st.session_state.normalized_data = None
+            st.session_state.dataset_ref = None
     
-    if st.session_state.normalized_data is None:
+    if st.session_state.dataset_ref is None:
         uploaded_file = st.file_uploader("Pilih file CSV", type="csv", key="uploader")
         
         if uploaded_file is not None:
             try:
-                # --- LOGIKA PERBAIKAN: Membaca file langsung dari buffer tanpa menyimpan file asli ---
-                df = pd.read_csv(io.BytesIO(uploaded_file.getbuffer()))
-
-                required_cols = ['CO (ppm)', 'PM10 (µg/m3)', 'NO2 (ppb)', 'Suhu (°C)', 
-                                 'Kelembaban (%)', 'Kecepatan Angin (m/s)', 'Kategori Kualitas Udara']
-                
-                if all(col in df.columns for col in required_cols):
-                    with st.spinner('🔄 Sedang memproses dan menormalisasi data...'):
-                        time.sleep(1) 
-                        df_normalized, scaler = normalize_data(df)
-                        
-                        st.session_state.normalized_data = df_normalized
-                        st.session_state.scaler = scaler
-                        st.session_state.model_trained = False
-                        
-                        # Simpan data yang dinormalisasi ke file persistent
-                        if not os.path.exists(UPLOAD_DIR):
-                            os.makedirs(UPLOAD_DIR)
-                        df_normalized.to_csv(DATA_FILE, index=False)
-                        
-                        # Simpan scaler ke file
-                        if not os.path.exists(FILE_DIR):
-                            os.makedirs(FILE_DIR)
-                        joblib.dump(scaler, SCALER_FILE)
-                        st.success("✅ Scaler telah disimpan ke file!")
-                        
-                    st.success(f"🎉 Data berhasil diunggah dan disimpan! **{len(df_normalized)} baris** data siap dianalisis.")
-                    st.rerun() 
-
-                else:
-                    missing_cols = [col for col in required_cols if col not in df.columns]
-                    st.error(f"""
-                        ❌ File CSV tidak memiliki kolom yang sesuai.
-                        Kolom yang harus diunggah: `{', '.join(required_cols)}`
-                        Kolom yang hilang dari file Anda: `{', '.join(missing_cols)}`
-                    """)
+                with st.spinner('🔄 Sedang memproses dan menormalisasi data...'):
+                    progress_text = st.empty()
+                    # File dibaca per potongan dan langsung ditulis ke penyimpanan persistent,
+                    # sehingga memori tidak bergantung pada ukuran file
+                    with stage(PAGE, "ingest CSV"):
+                        detach_dataset()
+                        _, scaler = ingest_csv(
+                            uploaded_file,
+                            progress=lambda n: progress_text.text(f"{n} baris telah diproses...")
+                        )
+                        st.session_state.dataset_ref = acquire_dataset()
+
+                    st.session_state.model_ref = None
+                    
+                    # Simpan scaler ke file
+                    save_scaler(scaler)
+                    st.success("✅ Scaler telah disimpan ke file!")
                     
+                n_rows = len(st.session_state.dataset_ref.value['data'])
+                st.success(f"🎉 Data berhasil diunggah dan disimpan! **{n_rows} baris** data siap dianalisis.")
+                st.rerun() 
+
+            except MissingColumnsError as e:
+                st.error(f"""
+                    ❌ File CSV tidak memiliki kolom yang sesuai.
+                    Kolom yang harus diunggah: `{', '.join(REQUIRED_COLUMNS)}`
+                    Kolom yang hilang dari file Anda: `{', '.join(e.missing)}`
+                """)
             except Exception as e:
                 st.error(f"❌ Terjadi kesalahan: {str(e)}")
     
-    if st.session_state.normalized_data is not None:
+    if st.session_state.dataset_ref is not None:
         st.markdown("---")
         
+        show_append_data()
+        dataset = st.session_state.dataset_ref.value
+        df_normalized = dataset['data']
+        n_rows = dataset['meta']['n_rows']
+
         with st.expander("🔍 Lihat Data yang Sudah Diunggah", expanded=False):
-            st.dataframe(st.session_state.normalized_data.head(10))
-            st.info(f"Menampilkan 10 dari {len(st.session_state.normalized_data)} baris data")
+            st.dataframe(df_normalized.head(10))
+            st.info(f"Menampilkan 10 dari {n_rows} baris data")
         
         col1, col2 = st.columns(2)
         with col1:
-            csv = st.session_state.normalized_data.to_csv(index=False).encode('utf-8')
             st.download_button(
-                label="💾 Unduh Data Ternormalisasi",
-                data=csv,
-                file_name='data_normalisasi.csv',
-                mime='text/csv',
+                label="💾 Unduh Data Ternormalisasi (CSV gzip)",
+                data=export_data(dataset, "csv.gz"),
+                file_name='data_normalisasi.csv.gz',
+                mime=EXPORT_FORMATS["csv.gz"],
+                on_click="ignore",
+                use_container_width=True
+            )
+            st.download_button(
+                label="💾 Unduh Data Ternormalisasi (Parquet)",
+                data=export_data(dataset, "parquet"),
+                file_name='data_normalisasi.parquet',
+                mime=EXPORT_FORMATS["parquet"],
+                on_click="ignore",
                 use_container_width=True
             )
         with col2:
             if st.button("🗑️ Hapus Semua Data", use_container_width=True):
                 # Hapus file data dan reset session state
+                release_dataset()
+                delete_dataset()
                 if os.path.exists(DATA_FILE):
                     os.remove(DATA_FILE)
                 if os.path.exists(SCALER_FILE):
                     os.remove(SCALER_FILE)
-                for key in ['normalized_data', 'scaler', 'model', 'label_encoder', 'model_trained']:
+                for key in ['dataset_ref', 'model_ref']:
                     if key in st.session_state:
                         del st.session_state[key]
                 st.success("Data dan model berhasil dihapus!")
                 st.rerun()
 
         st.subheader("📈 Statistik Data")
+        # Ringkasan dihitung saat data diunggah/ditambahkan dan dibagi antar sesi;
+        # halaman hanya membaca ringkasan kecil ini tanpa memindai ulang semua baris
+        with stage(PAGE, "statistik dataset"):
+            stats = st.session_state.dataset_ref.derived('stats', lambda d: dataset_stats(d['data'], d['meta']))
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("**Distribusi Kategori Kualitas Udara**")
-            category_counts = st.session_state.normalized_data['Kategori Kualitas Udara'].value_counts()
-            st.bar_chart(category_counts)
+            st.bar_chart(stats.value_counts())
         
         with col2:
             st.markdown("**Statistik Deskriptif**")
-            st.dataframe(st.session_state.normalized_data.describe().T)
+            st.dataframe(stats.describe())
+            st.caption("Kuartil (25%, 50%, 75%) adalah perkiraan dari sketch kuantil untuk dataset besar.")
         
         st.markdown(f"""
         <div class="primary-box">
             <h4>Informasi Data:</h4>
             <ul>
-                <li><strong>Jumlah sampel:</strong> {len(st.session_state.normalized_data)}</li>
-                <li><strong>Jumlah fitur:</strong> {len(st.session_state.normalized_data.columns)-1}</li>
+                <li><strong>Jumlah sampel:</strong> {n_rows}</li>
+                <li><strong>Jumlah fitur:</strong> {len(df_normalized.columns)-1}</li>
             </ul>
         </div>
         """, unsafe_allow_html=True)